@@ -4,27 +4,115 @@ DIREX - O Cérebro Estratégico da Operação
 Agente estratégico para transformar ideias em resultados através de planejamento estruturado.
 """
 
+import argparse
 import json
 import os
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 import sys
 
+import direx_metrics
+from direx_metrics import command, instrumented
+from direx_priority import priority_level, priority_score
+
+# Os demais módulos (templates, persistência, agendamento...) são importados
+# por quem os usa, para que a CLI e o cliente do daemon subam sem carregá-los
+if TYPE_CHECKING:
+    from direx_kpi_store import KPIStore
+    from direx_okr_progress import ProgressTree
+    from direx_roadmap import RoadmapEngine
+    from direx_scheduler import TaskScheduler
+    from direx_storage import SnapshotSections, StorageBackend
+
+
+# Marca de atributos criados só no primeiro acesso
+_DEFERRED = object()
+
+# Maior horizonte coberto pelas fases dos templates; acima dele o roadmap é mensal
+TEMPLATE_MAX_DIAS = 90
+
+
+class _LazySection:
+    """
+    Seção do estado do agente. É carregada do snapshot só no primeiro acesso e,
+    com compact=True, atribuições são convertidas em registros de direx_model.
+    """
+
+    def __set_name__(self, owner, name: str):
+        self.name = name
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        try:
+            return instance.__dict__[self.name]
+        except KeyError:
+            pass
+        sections = instance.__dict__.get("_lazy_sections")
+        if sections is None:
+            raise AttributeError(self.name)
+        self.__set__(instance, sections.load_section(self.name))
+        return instance.__dict__[self.name]
+
+    def __set__(self, instance, value):
+        if instance.__dict__.get("compact"):
+            from direx_model import compact_section
+            value = compact_section(self.name, value)
+        instance.__dict__[self.name] = value
+
+
+@instrumented(exclude=("run_interactive", "welcome_message"))
 class DirexAgent:
     """
     DIREX: O cérebro estratégico da operação.
     Transforma ideias em metas, metas em rotinas e rotinas em resultados.
     """
 
-    def __init__(self):
+    okrs = _LazySection()
+    kpis = _LazySection()
+    roadmap = _LazySection()
+    weekly_plan = _LazySection()
+    tasks = _LazySection()
+
+    def __init__(self, storage: Optional["StorageBackend"] = None, data_dir: str = "direx_data",
+                 verbose: bool = True, index_search: bool = False, compact: bool = False):
+        # Com compact=True as seções guardam registros com __slots__ em vez de dicts
+        self.compact = compact
+        self._lazy_sections: Optional["SnapshotSections"] = None
         self.business_objective = None
         self.okrs = []
         self.kpis = []
         self.roadmap = []
         self.weekly_plan = []
         self.tasks = []
-        self.data_dir = "direx_data"
-        os.makedirs(self.data_dir, exist_ok=True)
+        # data_dir só é criado na primeira gravação (os backends criam o diretório ao escrever)
+        self.data_dir = data_dir
+        if storage is None:
+            from direx_storage import SQLiteStorage
+            storage = SQLiteStorage(os.path.join(self.data_dir, "direx.db"))
+        self.storage = storage
+        self.verbose = verbose
+        self.kpi_store: Optional["KPIStore"] = None
+        self._search_index = _DEFERRED if index_search else None
+        self._okr_progress: Optional["ProgressTree"] = None
+        self._okr_progress_source: Optional[List[Dict]] = None
+
+    @property
+    def search_index(self):
+        """Índice textual dos snapshots (direx_search é importado só no primeiro uso)"""
+        if self._search_index is _DEFERRED:
+            from direx_search import SearchIndex
+            self._search_index = SearchIndex(os.path.join(self.data_dir, "direx_search.db"))
+        return self._search_index
+
+    @search_index.setter
+    def search_index(self, value):
+        self._search_index = value
+
+    def _log(self, message: str):
+        """Imprime mensagens de progresso quando o modo verboso está ativo"""
+        if self.verbose:
+            print(message)
 
     def welcome_message(self) -> str:
         """Retorna a mensagem de boas-vindas do DIREX"""
@@ -71,9 +159,17 @@ Como CEO virtual, meu papel é transformar suas ideias em resultados concretos.
                 return objective
             print("❌ Objetivo não pode estar vazio. Tente novamente.")
 
+    def set_business_objective(self, objective: str) -> str:
+        """Define o objetivo do negócio sem interação"""
+        objective = (objective or "").strip()
+        if not objective:
+            raise ValueError("Objetivo não pode estar vazio.")
+        self.business_objective = objective
+        return objective
+
     def create_okrs(self) -> List[Dict]:
         """Cria OKRs baseados no objetivo do negócio"""
-        print("\n🎯 CRIANDO OKRs")
+        self._log("\n🎯 CRIANDO OKRs")
 
         if not self.business_objective:
             self.ask_business_objective()
@@ -92,41 +188,43 @@ Como CEO virtual, meu papel é transformar suas ideias em resultados concretos.
 
         self.okrs = [okr_principal] + okrs_suporte
 
-        print("✅ OKRs criados com sucesso!")
+        self._log("✅ OKRs criados com sucesso!")
         return self.okrs
 
+    def _progress_tree(self) -> "ProgressTree":
+        """Árvore de progresso dos OKRs atuais (reconstruída se self.okrs foi substituído)"""
+        if self._okr_progress is None or self._okr_progress_source is not self.okrs:
+            from direx_okr_progress import ProgressTree
+            tree = ProgressTree()
+            tree.add_okrs(self.okrs, portfolio_id="portfolio")
+            self._okr_progress = tree
+            self._okr_progress_source = self.okrs
+        return self._okr_progress
+
+    def update_key_result(self, okr_index: int, kr_index: int, progresso: float) -> float:
+        """Atualiza o progresso (0-1) de um resultado-chave e consolida no OKR"""
+        okr = self.okrs[okr_index]
+        total = len(okr.get("resultados_chave", []))
+        if not 0 <= kr_index < total:
+            raise IndexError(f"OKR {okr_index + 1} não tem o resultado-chave {kr_index + 1}")
+
+        tree = self._progress_tree()
+        objetivo = tree.update(f"okr-{okr_index}/kr-{kr_index}", progresso)
+
+        progresso_chave = okr.setdefault("progresso_chave", [])
+        progresso_chave.extend([0.0] * (total - len(progresso_chave)))
+        progresso_chave[kr_index] = tree.progress(f"okr-{okr_index}/kr-{kr_index}")
+        okr["progresso"] = objetivo
+        return objetivo
+
+    def okr_completion(self) -> float:
+        """Progresso consolidado (0-1) de todos os OKRs"""
+        return self._progress_tree().progress("portfolio")
+
     def _generate_key_results(self) -> List[str]:
         """Gera resultados-chave baseados no objetivo"""
-        objective_lower = self.business_objective.lower()
-
-        if "receita" in objective_lower or "vendas" in objective_lower:
-            return [
-                "Aumentar receita mensal em 30%",
-                "Adquirir 50 novos clientes pagantes",
-                "Elevar ticket médio em 20%",
-                "Reduzir churn para menos de 5%"
-            ]
-        elif "produto" in objective_lower or "lançar" in objective_lower:
-            return [
-                "Completar desenvolvimento do MVP",
-                "Validar produto com 100 usuários beta",
-                "Alcançar 95% de satisfação dos primeiros usuários",
-                "Definir pricing e modelo de negócio"
-            ]
-        elif "presença digital" in objective_lower or "autoridade" in objective_lower:
-            return [
-                "Aumentar seguidores em 200%",
-                "Gerar 50 menções em mídias relevantes",
-                "Criar 24 conteúdos de autoridade",
-                "Estabelecer parcerias estratégicas"
-            ]
-        else:
-            return [
-                "Definir 3 métricas principais de sucesso",
-                "Implementar processos para acompanhar progresso",
-                "Identificar e remover 2 maiores obstáculos",
-                "Construir base sólida para crescimento"
-            ]
+        from direx_templates import key_results_for
+        return list(key_results_for(self.business_objective))
 
     def _generate_support_okrs(self) -> List[Dict]:
         """Gera OKRs de suporte independentes do objetivo principal"""
@@ -159,7 +257,7 @@ Como CEO virtual, meu papel é transformar suas ideias em resultados concretos.
 
     def create_kpis(self) -> List[Dict]:
         """Cria KPIs para acompanhar o progresso"""
-        print("\n📊 CRIANDO KPIs")
+        self._log("\n📊 CRIANDO KPIs")
 
         kpis_base = [
             {
@@ -197,233 +295,107 @@ Como CEO virtual, meu papel é transformar suas ideias em resultados concretos.
         ]
 
         self.kpis = kpis_base
-        print("✅ KPIs criados com sucesso!")
+        self._log("✅ KPIs criados com sucesso!")
         return self.kpis
 
-    def create_roadmap(self, periodo_dias: int = 90) -> List[Dict]:
-        """Cria roadmap para o período especificado"""
-        print(f"\n🗺️ CRIANDO ROADMAP PARA {periodo_dias} DIAS")
+    def record_kpi(self, nome: str, valor: float, quando=None) -> Dict:
+        """Registra uma leitura de KPI na série temporal e atualiza o valor atual"""
+        if self.kpi_store is None:
+            from direx_kpi_store import KPIStore
+            self.kpi_store = KPIStore(os.path.join(self.data_dir, "kpis"))
+        series = self.kpi_store.record(nome, valor, quando)
+
+        for kpi in self.kpis:
+            if kpi.get("nome") == nome:
+                atual = str(kpi.get("atual", ""))
+                prefixo = "R$ " if atual.startswith("R$") else ""
+                sufixo = "%" if atual.endswith("%") else ""
+                kpi["atual"] = f"{prefixo}{series.latest():g}{sufixo}"
+
+        return {"nome": nome, "leituras": len(series), "ultimo": series.latest()}
+
+    def create_roadmap(self, periodo_dias: int = 90, granularidade: Optional[str] = None) -> List[Dict]:
+        """
+        Cria roadmap para o período especificado. Sem granularidade, horizontes
+        de até TEMPLATE_MAX_DIAS usam as fases do template e os mais longos,
+        fases mensais.
+        """
+        self._log(f"\n🗺️ CRIANDO ROADMAP PARA {periodo_dias} DIAS")
 
         if not self.okrs:
             self.create_okrs()
 
-        # Dividir período em fases
-        fases = []
-        if periodo_dias <= 7:
-            fases = ["Semana 1"]
-        elif periodo_dias <= 15:
-            fases = ["Semana 1", "Semana 2"]
-        elif periodo_dias <= 30:
-            fases = ["Semana 1-2", "Semana 3-4"]
+        if granularidade is None and periodo_dias > TEMPLATE_MAX_DIAS:
+            granularidade = "mensal"
+
+        if granularidade:
+            # Horizonte arbitrário em fases semanais/mensais/trimestrais
+            roadmap_items = list(self.iter_roadmap(periodo_dias, granularidade))
         else:
-            fases = ["Mês 1", "Mês 2", "Mês 3"]
-
-        roadmap_items = []
-
-        for i, fase in enumerate(fases):
-            fase_items = {
-                "fase": fase,
-                "periodo": f"Dias {(i * periodo_dias // len(fases)) + 1} - {(i + 1) * periodo_dias // len(fases)}",
-                "objetivos": self._generate_fase_objectives(fase),
-                "entregas": self._generate_fase_deliverables(fase),
-                "marcos": self._generate_fase_milestones(fase),
-                "status": "pendente"
-            }
-            roadmap_items.append(fase_items)
+            # Fases vêm do cache de planos: dicts novos, textos compartilhados
+            from direx_templates import classify_objective, materialize, plan_template
+            categoria = classify_objective(self.business_objective) if self.business_objective else "geral"
+            roadmap_items = materialize(plan_template(categoria, periodo_dias).roadmap)
 
         self.roadmap = roadmap_items
-        print("✅ Roadmap criado com sucesso!")
+        self._log("✅ Roadmap criado com sucesso!")
         return self.roadmap
 
+    def iter_roadmap(self, periodo_dias: int, granularidade: Optional[str] = None) -> "RoadmapEngine":
+        """Retorna um roadmap paginável cujas fases são geradas sob demanda"""
+        from direx_roadmap import RoadmapEngine
+        return RoadmapEngine(periodo_dias, granularidade)
+
     def _generate_fase_objectives(self, fase: str) -> List[str]:
         """Gera objetivos para cada fase"""
-        objectives_map = {
-            "Semana 1": [
-                "Definir escopo e requisitos claros",
-                "Configurar ferramentas e processos básicos",
-                "Realizar pesquisa inicial de mercado"
-            ],
-            "Semana 2": [
-                "Desenvolver primeira versão do produto/serviço",
-                "Testar com usuários iniciais",
-                "Ajustar baseado em feedback"
-            ],
-            "Mês 1": [
-                "Completar planejamento estratégico detalhado",
-                "Configurar infraestrutura básica",
-                "Iniciar desenvolvimento do core product"
-            ],
-            "Mês 2": [
-                "Lançar MVP e coletar feedback",
-                "Otimizar processos internos",
-                "Expandir equipe se necessário"
-            ],
-            "Mês 3": [
-                "Escalar operações baseado em métricas",
-                "Implementar melhorias identificadas",
-                "Planejar próximos passos de crescimento"
-            ]
-        }
-        return objectives_map.get(fase, ["Definir objetivos específicos da fase"])
+        from direx_templates import fase_objectives
+        return list(fase_objectives(fase))
 
     def _generate_fase_deliverables(self, fase: str) -> List[str]:
         """Gera entregas para cada fase"""
-        deliverables_map = {
-            "Semana 1": [
-                "Documento de requisitos",
-                "Plano de ação inicial",
-                "Pesquisa de mercado básica"
-            ],
-            "Semana 2": [
-                "Protótipo funcional",
-                "Relatório de testes iniciais",
-                "Lista de melhorias prioritárias"
-            ],
-            "Mês 1": [
-                "Estratégia completa documentada",
-                "Sistema básico operacional",
-                "Equipe alinhada com objetivos"
-            ],
-            "Mês 2": [
-                "Produto mínimo viável lançado",
-                "Processos otimizados",
-                "Métricas de sucesso definidas"
-            ],
-            "Mês 3": [
-                "Operações em escala",
-                "Relatório de performance",
-                "Plano de crescimento futuro"
-            ]
-        }
-        return deliverables_map.get(fase, ["Entregas específicas da fase"])
+        from direx_templates import fase_deliverables
+        return list(fase_deliverables(fase))
 
     def _generate_fase_milestones(self, fase: str) -> List[str]:
         """Gera marcos importantes para cada fase"""
-        milestones_map = {
-            "Semana 1": [
-                "Reunião de alinhamento da equipe",
-                "Definição clara de escopo",
-                "Setup completo do ambiente"
-            ],
-            "Semana 2": [
-                "Primeiro feedback de usuários",
-                "Iteração baseada em testes",
-                "Decisões sobre próximos passos"
-            ],
-            "Mês 1": [
-                "Aprovação da estratégia completa",
-                "Primeiras funcionalidades core",
-                "Contratações estratégicas"
-            ],
-            "Mês 2": [
-                "Lançamento público do MVP",
-                "Alcance das primeiras metas",
-                "Identificação de padrões de uso"
-            ],
-            "Mês 3": [
-                "Estabilidade operacional",
-                "Crescimento sustentável",
-                "Preparação para expansão"
-            ]
-        }
-        return milestones_map.get(fase, ["Marcos importantes da fase"])
+        from direx_templates import fase_milestones
+        return list(fase_milestones(fase))
 
-    def create_weekly_plan(self) -> List[Dict]:
+    def create_weekly_plan(self, tarefas: Optional[List[Dict]] = None,
+                           capacidade: Optional[Dict[str, float]] = None,
+                           membros: Optional[List[str]] = None, exact: bool = False) -> List[Dict]:
         """Cria plano semanal detalhado"""
-        print("\n📅 CRIANDO PLANO SEMANAL")
-
-        # Dias da semana
-        dias = ["Segunda", "Terça", "Quarta", "Quinta", "Sexta", "Sábado", "Domingo"]
-
-        weekly_plan = []
-
-        for dia in dias:
-            dia_plan = {
-                "dia": dia,
-                "tarefas_principais": self._generate_daily_tasks(dia),
-                "foco": self._generate_daily_focus(dia),
-                "metricas": self._generate_daily_metrics(dia),
-                "status": "pendente"
-            }
-            weekly_plan.append(dia_plan)
+        self._log("\n📅 CRIANDO PLANO SEMANAL")
+
+        if tarefas:
+            # Plano baseado na carga real: tarefas empacotadas pela capacidade de cada dia
+            from direx_capacity import build_capacity_plan
+            plano = build_capacity_plan(tarefas, capacidade, membros, exact)
+            weekly_plan = plano.dias
+            if plano.nao_alocadas:
+                self._log(f"⚠️ {len(plano.nao_alocadas)} tarefas não couberam na capacidade da semana")
+        else:
+            from direx_templates import materialize, weekly_plan_template
+            weekly_plan = materialize(weekly_plan_template())
 
         self.weekly_plan = weekly_plan
-        print("✅ Plano semanal criado com sucesso!")
+        self._log("✅ Plano semanal criado com sucesso!")
         return self.weekly_plan
 
     def _generate_daily_tasks(self, dia: str) -> List[str]:
         """Gera tarefas principais para cada dia"""
-        tasks_map = {
-            "Segunda": [
-                "Revisar objetivos da semana",
-                "Priorizar tarefas críticas",
-                "Reunião de alinhamento da equipe",
-                "Definir métricas diárias"
-            ],
-            "Terça": [
-                "Executar tarefas de alto impacto",
-                "Revisar progresso dos OKRs",
-                "Reuniões com stakeholders",
-                "Atualizar dashboards"
-            ],
-            "Quarta": [
-                "Foco em desenvolvimento/produto",
-                "Análise de dados e métricas",
-                "Brainstorming de ideias",
-                "Revisão de processos"
-            ],
-            "Quinta": [
-                "Execução de tarefas estratégicas",
-                "Preparação para entregas",
-                "Reuniões de acompanhamento",
-                "Planejamento da próxima semana"
-            ],
-            "Sexta": [
-                "Finalizar entregas da semana",
-                "Revisar conquistas e aprendizados",
-                "Feedback da equipe",
-                "Planejamento pessoal/profissional"
-            ],
-            "Sábado": [
-                "Atividades de crescimento pessoal",
-                "Leitura e aprendizado",
-                "Reflexão estratégica",
-                "Tempo com família/amigos"
-            ],
-            "Domingo": [
-                "Preparação para a semana",
-                "Revisão de hábitos e rotinas",
-                "Planejamento de lazer",
-                "Recarregar energias"
-            ]
-        }
-        return tasks_map.get(dia, ["Tarefas específicas do dia"])
+        from direx_templates import daily_tasks
+        return list(daily_tasks(dia))
 
     def _generate_daily_focus(self, dia: str) -> str:
         """Gera foco principal para cada dia"""
-        focus_map = {
-            "Segunda": "Alinhamento e planejamento",
-            "Terça": "Execução estratégica",
-            "Quarta": "Análise e otimização",
-            "Quinta": "Entregas e progresso",
-            "Sexta": "Conclusão e reflexão",
-            "Sábado": "Crescimento pessoal",
-            "Domingo": "Recuperação e preparação"
-        }
-        return focus_map.get(dia, "Foco específico do dia")
+        from direx_templates import daily_focus
+        return daily_focus(dia)
 
     def _generate_daily_metrics(self, dia: str) -> List[str]:
         """Gera métricas para acompanhar cada dia"""
-        metrics_map = {
-            "Segunda": ["Tarefas prioritárias definidas", "Equipe alinhada", "Objetivos claros"],
-            "Terça": ["Progresso nos OKRs", "Reuniões produtivas", "Bloqueadores removidos"],
-            "Quarta": ["Insights gerados", "Processos otimizados", "Ideias inovadoras"],
-            "Quinta": ["Entregas completadas", "Qualidade mantida", "Feedback coletado"],
-            "Sexta": ["Semana concluída", "Aprendizados documentados", "Próxima semana planejada"],
-            "Sábado": ["Habilidades desenvolvidas", "Conhecimento adquirido", "Bem-estar mantido"],
-            "Domingo": ["Energia recarregada", "Semana preparada", "Foco renovado"]
-        }
-        return metrics_map.get(dia, ["Métricas específicas do dia"])
+        from direx_templates import daily_metrics
+        return list(daily_metrics(dia))
 
     def prioritize_tasks(self, tasks: List[str]) -> List[Tuple[str, str, int]]:
         """Prioriza tarefas baseado em impacto x esforço"""
@@ -445,7 +417,7 @@ Como CEO virtual, meu papel é transformar suas ideias em resultados concretos.
                     esforco = int(input("   Esforço necessário (1-10): "))
 
                     if 1 <= impacto <= 10 and 1 <= esforco <= 10:
-                        prioridade = (impacto * 2) - esforco  # Fórmula: 2x impacto - esforço
+                        prioridade = priority_score(impacto, esforco)  # Fórmula: 2x impacto - esforço
                         nivel = self._get_priority_level(prioridade)
                         prioritized.append((task, nivel, prioridade))
                         break
@@ -465,67 +437,132 @@ Como CEO virtual, meu papel é transformar suas ideias em resultados concretos.
 
     def _get_priority_level(self, score: int) -> str:
         """Converte score em nível de prioridade"""
-        if score >= 15:
-            return "CRÍTICA"
-        elif score >= 10:
-            return "ALTA"
-        elif score >= 5:
-            return "MÉDIA"
-        else:
-            return "BAIXA"
-
-    def save_data(self):
-        """Salva todos os dados do DIREX"""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-
-        data = {
+        return priority_level(score)
+
+    def build_schedule(self) -> "TaskScheduler":
+        """Agenda self.tasks por dependências e alinha as entregas às fases do roadmap"""
+        from direx_scheduler import TaskScheduler, align_with_roadmap
+
+        scheduler = TaskScheduler.from_tasks(self.tasks)
+        if self.roadmap:
+            self.roadmap = align_with_roadmap(self.roadmap, scheduler)
+        return scheduler
+
+    def simulate(self, trials: int = 100_000, metas: Optional[Dict[str, Dict]] = None,
+                 duracao: Optional[Dict] = None, workers: int = 1, seed: Optional[int] = None) -> Dict:
+        """
+        Simulação Monte Carlo do roadmap e dos KPIs atuais: probabilidade de
+        cada fase terminar no prazo e de cada KPI atingir a meta até o fim de
+        cada fase (ver direx_simulation.build_model para `metas` e `duracao`)
+        """
+        if not self.roadmap:
+            raise ValueError("Crie o roadmap antes de simular")
+        from direx_simulation import build_model, simulate
+
+        model = build_model(self.export_section("roadmap"), self.export_section("kpis"),
+                            self.export_section("tasks"), metas, duracao)
+        return simulate(model, trials, seed, workers)
+
+    def export_section(self, section: str) -> List:
+        """Itens de uma seção no formato do snapshot JSON (dicts simples)"""
+        items = getattr(self, section)
+        if not self.compact:
+            return items
+        from direx_model import expand_section
+        return expand_section(items)
+
+    def to_dict(self) -> Dict:
+        """Retorna o estado atual no formato do snapshot JSON"""
+        return {
             "business_objective": self.business_objective,
-            "okrs": self.okrs,
-            "kpis": self.kpis,
-            "roadmap": self.roadmap,
-            "weekly_plan": self.weekly_plan,
-            "tasks": self.tasks,
-            "timestamp": timestamp
+            "okrs": self.export_section("okrs"),
+            "kpis": self.export_section("kpis"),
+            "roadmap": self.export_section("roadmap"),
+            "weekly_plan": self.export_section("weekly_plan"),
+            "tasks": self.export_section("tasks"),
+            "timestamp": datetime.now().strftime("%Y%m%d_%H%M%S")
         }
 
-        filename = os.path.join(self.data_dir, f"direx_data_{timestamp}.json")
-
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
-
-        print(f"\n💾 Dados salvos em: {filename}")
-        return filename
+    def apply_state(self, data: Dict):
+        """Substitui o estado atual pelo conteúdo de um snapshot"""
+        from direx_storage import SECTIONS
+        self._lazy_sections = None
+        self.business_objective = data.get("business_objective")
+        for section in SECTIONS:
+            setattr(self, section, data.get(section, []))
+
+    def apply_sections(self, sections: "SnapshotSections"):
+        """Substitui o estado atual sem desserializar as listas; cada seção é lida no primeiro acesso"""
+        from direx_storage import SECTIONS
+        self._lazy_sections = sections
+        self.business_objective = sections.header.get("business_objective")
+        for section in SECTIONS:
+            self.__dict__.pop(section, None)
+
+    def section_count(self, section: str) -> int:
+        """Quantidade de itens de uma seção, lida do cabeçalho se ela ainda não foi carregada"""
+        if section in self.__dict__ or self._lazy_sections is None:
+            return len(getattr(self, section))
+        return self._lazy_sections.counts.get(section, 0)
 
-    def load_data(self, filename: Optional[str] = None):
-        """Carrega dados salvos do DIREX"""
-        if not filename:
-            # Carregar o arquivo mais recente
-            files = [f for f in os.listdir(self.data_dir) if f.startswith("direx_data_") and f.endswith(".json")]
-            if not files:
-                print("❌ Nenhum arquivo de dados encontrado.")
-                return False
+    def save_data(self):
+        """Salva todos os dados do DIREX"""
+        data = self.to_dict()
+        ref = self.storage.save(data)
+        if self.search_index is not None:
+            # Indexação imediata (opt-in com index_search=True). Sem ela, `direx
+            # search` indexa os snapshots novos do direx.db antes de buscar. O
+            # snapshot já está gravado: uma falha aqui só deixa o índice para
+            # trás até a próxima busca, não desfaz o save
+            try:
+                self.search_index.add_snapshot(ref, data)
+            except Exception as e:
+                print(f"⚠️ Snapshot {ref} salvo, mas não indexado para busca: {e}", file=sys.stderr)
 
-            files.sort(reverse=True)
-            filename = os.path.join(self.data_dir, files[0])
+        self._log(f"\n💾 Dados salvos em: {ref}")
+        return ref
 
+    def load_data(self, filename: Optional[str] = None, lazy: bool = False):
+        """
+        Carrega dados salvos do DIREX. Com lazy=True só o cabeçalho é lido e cada
+        seção é carregada quando acessada pela primeira vez.
+        """
         try:
-            with open(filename, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-
-            self.business_objective = data.get("business_objective")
-            self.okrs = data.get("okrs", [])
-            self.kpis = data.get("kpis", [])
-            self.roadmap = data.get("roadmap", [])
-            self.weekly_plan = data.get("weekly_plan", [])
-            self.tasks = data.get("tasks", [])
-
-            print(f"✅ Dados carregados de: {filename}")
+            if not filename:
+                # Carregar o snapshot mais recente
+                filename = self.storage.latest_ref()
+                if filename is None:
+                    self._log("❌ Nenhum arquivo de dados encontrado.")
+                    return False
+
+            from direx_serializers import SNAPSHOT_EXTENSIONS
+            if filename.endswith(SNAPSHOT_EXTENSIONS):
+                from direx_storage import import_json
+                self.apply_state(import_json(filename))
+            elif lazy:
+                self.apply_sections(self.storage.open_sections(filename))
+            else:
+                self.apply_state(self.storage.load(filename))
+
+            self._log(f"✅ Dados carregados de: {filename}")
             return True
 
         except Exception as e:
-            print(f"❌ Erro ao carregar dados: {e}")
+            self._log(f"❌ Erro ao carregar dados: {e}")
             return False
 
+    def export_data(self, filename: str, formato: Optional[str] = None,
+                    compressao: Optional[str] = None) -> str:
+        """Exporta o estado atual como snapshot (JSON indentado, ou o formato/compressão informados)"""
+        if formato is None and compressao is None:
+            from direx_storage import export_json
+            export_json(self.to_dict(), filename)
+        else:
+            from direx_serializers import write_snapshot
+            write_snapshot(self.to_dict(), filename, formato or "json", compressao)
+        self._log(f"\n📤 Dados exportados para: {filename}")
+        return filename
+
     def display_summary(self):
         """Exibe resumo atual do DIREX"""
         print("\n📊 RESUMO DIREX")
@@ -536,11 +573,11 @@ Como CEO virtual, meu papel é transformar suas ideias em resultados concretos.
         else:
             print("🎯 Objetivo: Não definido")
 
-        print(f"🎯 OKRs: {len(self.okrs)} definidos")
-        print(f"📊 KPIs: {len(self.kpis)} configurados")
-        print(f"🗺️ Roadmap: {len(self.roadmap)} fases")
-        print(f"📅 Plano Semanal: {len(self.weekly_plan)} dias")
-        print(f"📋 Tarefas: {len(self.tasks)} registradas")
+        print(f"🎯 OKRs: {self.section_count('okrs')} definidos")
+        print(f"📊 KPIs: {self.section_count('kpis')} configurados")
+        print(f"🗺️ Roadmap: {self.section_count('roadmap')} fases")
+        print(f"📅 Plano Semanal: {self.section_count('weekly_plan')} dias")
+        print(f"📋 Tarefas: {self.section_count('tasks')} registradas")
 
         print("=" * 50)
 
@@ -555,7 +592,7 @@ Como CEO virtual, meu papel é transformar suas ideias em resultados concretos.
             print("1. 📝 Definir Objetivo de Negócio")
             print("2. 🎯 Criar OKRs")
             print("3. 📊 Configurar KPIs")
-            print("4. 🗺️ Criar Roadmap (7/15/30 dias)")
+            print("4. 🗺️ Criar Roadmap (7 dias a 36 meses)")
             print("5. 📅 Planejar Semana")
             print("6. ⚖️ Priorizar Tarefas")
             print("7. 📊 Ver Resumo")
@@ -566,95 +603,534 @@ Como CEO virtual, meu papel é transformar suas ideias em resultados concretos.
 
             try:
                 choice = input("Escolha uma opção: ").strip()
-
-                if choice == "1":
-                    self.ask_business_objective()
-
-                elif choice == "2":
-                    okrs = self.create_okrs()
-                    print("\n📋 OKRs Criados:")
-                    for i, okr in enumerate(okrs, 1):
-                        print(f"\n{i}. {okr['objetivo']}")
-                        print("   Resultados-Chave:")
-                        for kr in okr['resultados_chave']:
-                            print(f"   • {kr}")
-
-                elif choice == "3":
-                    kpis = self.create_kpis()
-                    print("\n📊 KPIs Configurados:")
-                    for kpi in kpis:
-                        print(f"• {kpi['nome']}: Meta {kpi['meta']} ({kpi['frequencia']})")
-
-                elif choice == "4":
-                    print("Escolha o período:")
-                    print("1. 7 dias")
-                    print("2. 15 dias")
-                    print("3. 30 dias")
-                    print("4. 90 dias")
-
-                    periodo_choice = input("Opção: ").strip()
-                    periodo_map = {"1": 7, "2": 15, "3": 30, "4": 90}
-                    periodo = periodo_map.get(periodo_choice, 30)
-
-                    roadmap = self.create_roadmap(periodo)
-                    print(f"\n🗺️ Roadmap para {periodo} dias:")
-                    for fase in roadmap:
-                        print(f"\n📅 {fase['fase']} ({fase['periodo']}):")
-                        print(f"   🎯 Objetivos: {', '.join(fase['objetivos'][:2])}...")
-                        print(f"   📦 Entregas: {', '.join(fase['entregas'][:2])}...")
-
-                elif choice == "5":
-                    weekly_plan = self.create_weekly_plan()
-                    print("\n📅 Plano Semanal Criado:")
-                    for dia in weekly_plan[:5]:  # Mostrar apenas dias úteis
-                        print(f"\n📆 {dia['dia']}:")
-                        print(f"   🎯 Foco: {dia['foco']}")
-                        print(f"   📋 Tarefas: {', '.join(dia['tarefas_principais'][:2])}...")
-
-                elif choice == "6":
-                    print("Digite as tarefas para priorizar (uma por linha, vazio para terminar):")
-                    tasks = []
-                    while True:
-                        task = input("Tarefa: ").strip()
-                        if not task:
-                            break
-                        tasks.append(task)
-
-                    if tasks:
-                        self.prioritize_tasks(tasks)
-                    else:
-                        print("❌ Nenhuma tarefa fornecida.")
-
-                elif choice == "7":
-                    self.display_summary()
-
-                elif choice == "8":
-                    self.save_data()
-
-                elif choice == "9":
-                    self.load_data()
-
-                elif choice == "0":
-                    print("\n👋 Até logo! DIREX foi desativado.")
+                with command(f"menu.{choice}"):
+                    self._run_menu_option(choice)
+                if choice == "0":
                     break
 
-                else:
-                    print("❌ Opção inválida. Tente novamente.")
-
             except KeyboardInterrupt:
                 print("\n\n👋 Operação interrompida. Até logo!")
                 break
             except Exception as e:
                 print(f"❌ Erro: {e}")
 
-def main():
-    """Função principal"""
+    def _run_menu_option(self, choice: str):
+        """Executa uma opção do menu principal"""
+        if choice == "1":
+            self.ask_business_objective()
+
+        elif choice == "2":
+            okrs = self.create_okrs()
+            print("\n📋 OKRs Criados:")
+            for i, okr in enumerate(okrs, 1):
+                print(f"\n{i}. {okr['objetivo']}")
+                print("   Resultados-Chave:")
+                for kr in okr['resultados_chave']:
+                    print(f"   • {kr}")
+
+        elif choice == "3":
+            kpis = self.create_kpis()
+            print("\n📊 KPIs Configurados:")
+            for kpi in kpis:
+                print(f"• {kpi['nome']}: Meta {kpi['meta']} ({kpi['frequencia']})")
+
+        elif choice == "4":
+            print("Escolha o período:")
+            print("1. 7 dias")
+            print("2. 15 dias")
+            print("3. 30 dias")
+            print("4. 90 dias")
+            print("5. 12 meses")
+            print("6. 24 meses")
+            print("7. 36 meses")
+
+            periodo_choice = input("Opção: ").strip()
+            periodo_map = {"1": 7, "2": 15, "3": 30, "4": 90, "5": 360, "6": 720, "7": 1080}
+            periodo = periodo_map.get(periodo_choice, 30)
+
+            roadmap = self.create_roadmap(periodo)
+            print(f"\n🗺️ Roadmap para {periodo} dias:")
+            for fase in roadmap:
+                print(f"\n📅 {fase['fase']} ({fase['periodo']}):")
+                print(f"   🎯 Objetivos: {', '.join(fase['objetivos'][:2])}...")
+                print(f"   📦 Entregas: {', '.join(fase['entregas'][:2])}...")
+
+        elif choice == "5":
+            weekly_plan = self.create_weekly_plan()
+            print("\n📅 Plano Semanal Criado:")
+            for dia in weekly_plan[:5]:  # Mostrar apenas dias úteis
+                print(f"\n📆 {dia['dia']}:")
+                print(f"   🎯 Foco: {dia['foco']}")
+                print(f"   📋 Tarefas: {', '.join(dia['tarefas_principais'][:2])}...")
+
+        elif choice == "6":
+            print("Digite as tarefas para priorizar (uma por linha, vazio para terminar):")
+            tasks = []
+            while True:
+                task = input("Tarefa: ").strip()
+                if not task:
+                    break
+                tasks.append(task)
+
+            if tasks:
+                self.prioritize_tasks(tasks)
+            else:
+                print("❌ Nenhuma tarefa fornecida.")
+
+        elif choice == "7":
+            self.display_summary()
+
+        elif choice == "8":
+            self.save_data()
+
+        elif choice == "9":
+            self.load_data(lazy=True)
+
+        elif choice == "0":
+            print("\n👋 Até logo! DIREX foi desativado.")
+
+        else:
+            print("❌ Opção inválida. Tente novamente.")
+
+# Subcomandos que geram partes do plano sem interação
+PLAN_COMMANDS = {
+    "okrs": "Gera os OKRs de um objetivo",
+    "kpis": "Gera os KPIs",
+    "roadmap": "Gera o roadmap de --days dias",
+    "weekly-plan": "Gera o plano semanal",
+    "plan": "Gera OKRs, KPIs, roadmap e plano semanal",
+}
+
+
+def positive_int(value: str) -> int:
+    """Tipo do argparse para contagens que precisam ser maiores que zero"""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"inteiro inválido: {value!r}") from None
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"deve ser maior que zero: {value}")
+    return number
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Monta o parser da linha de comando"""
+    parser = argparse.ArgumentParser(prog="direx", description="DIREX - O Cérebro Estratégico da Operação")
+    parser.add_argument("--metrics", metavar="ARQUIVO",
+                        help="Liga as métricas e as grava ao sair (.json ou texto Prometheus)")
+    parser.add_argument("--profile", metavar="DIR", help="Grava um perfil por comando neste diretório")
+    parser.add_argument("--profiler", choices=["cprofile", "pyinstrument"], default="cprofile",
+                        help="Profiler usado com --profile")
+    subparsers = parser.add_subparsers(dest="command")
+
+    # Comandos não interativos: sem banner nem menu, resultado em JSON no stdout
+    plan_options = argparse.ArgumentParser(add_help=False)
+    plan_options.add_argument("--objective", help="Objetivo de negócio")
+    plan_options.add_argument("--days", type=int, default=90, help="Horizonte do roadmap em dias")
+    plan_options.add_argument("--save", action="store_true", help="Salvar o estado gerado em --data-dir")
+    plan_options.add_argument("--data-dir", default="direx_data", help="Diretório de dados (com --save)")
+    plan_options.add_argument("--pretty", action="store_true", help="JSON indentado")
+    for name, help_text in PLAN_COMMANDS.items():
+        subparsers.add_parser(name, parents=[plan_options], help=help_text)
+
+    daemon = subparsers.add_parser("daemon", help="Mantém um processo aquecido atendendo comandos via socket Unix")
+    daemon.add_argument("--socket", help="Caminho do socket (padrão: $DIREX_SOCKET ou um arquivo em /tmp)")
+
+    prioritize = subparsers.add_parser("prioritize", help="Prioriza tarefas de um CSV/JSONL sem interação")
+    prioritize.add_argument("input", help="Arquivo CSV/JSONL com as tarefas ('-' para stdin)")
+    prioritize.add_argument("--format", choices=["csv", "jsonl"], help="Formato da entrada (padrão: pela extensão)")
+    prioritize.add_argument("--top", type=positive_int, help="Retornar apenas as K tarefas mais prioritárias")
+    prioritize.add_argument("--output", help="Gravar o ranking como JSONL neste arquivo")
+    prioritize.add_argument("--stream", action="store_true",
+                            help="Modo streaming: mantém apenas o top-K e emite rankings parciais")
+    prioritize.add_argument("--every", type=positive_int, default=1000,
+                            help="No modo streaming, emitir o ranking a cada N tarefas")
+    prioritize.add_argument("--task-col", default="tarefa", help="Coluna com o nome da tarefa")
+    prioritize.add_argument("--impact-col", default="impacto", help="Coluna com o impacto (1-10)")
+    prioritize.add_argument("--effort-col", default="esforco", help="Coluna com o esforço (1-10)")
+
+    serve = subparsers.add_parser("serve", help="Inicia o servidor HTTP/JSON com sessões isoladas")
+    serve.add_argument("--host", default="127.0.0.1", help="Endereço de escuta")
+    serve.add_argument("--port", type=int, default=8080, help="Porta de escuta")
+    serve.add_argument("--data-dir", default="direx_data", help="Diretório de dados das sessões")
+    serve.add_argument("--idle-timeout", type=float, default=900.0,
+                       help="Segundos de inatividade antes de encerrar uma sessão")
+    serve.add_argument("--memory-budget", type=float, default=256,
+                       help="MiB de agentes residentes; acima disso as sessões menos usadas saem da memória")
+    serve.add_argument("--max-agents", type=int, help="Limite de agentes residentes")
+
+    batch = subparsers.add_parser("batch", help="Gera planos completos para objetivos de um JSONL")
+    batch.add_argument("input", help="JSONL com um objetivo por linha ('-' para stdin)")
+    batch.add_argument("-o", "--output", required=True, help="JSONL de saída, um registro por objetivo")
+    batch.add_argument("--workers", type=int, help="Número de processos (padrão: CPUs)")
+    batch.add_argument("--chunk-size", type=int, default=64, help="Objetivos por bloco enviado a cada worker")
+
+    search = subparsers.add_parser("search", help="Busca textual em todos os snapshots salvos")
+    search.add_argument("query", help="Termos da busca")
+    search.add_argument("--limit", type=int, default=10, help="Número máximo de resultados")
+    search.add_argument("--data-dir", default="direx_data", help="Diretório de dados")
+    search.add_argument("--reindex-json", action="store_true",
+                        help="Indexa antes os snapshots direx_data_*.json existentes")
+
+    import_cmd = subparsers.add_parser("import", help="Importa snapshots JSON (ou de outros formatos) para o banco")
+    import_cmd.add_argument("sources", nargs="+", help="Arquivos de snapshot ou diretórios com direx_data_*")
+    import_cmd.add_argument("--data-dir", default="direx_data", help="Diretório de dados com o direx.db")
+
+    formats = subparsers.add_parser("formats", help="Compara tamanho e tempo dos formatos de snapshot")
+    formats.add_argument("snapshot", nargs="?", help="Snapshot a usar (padrão: o mais recente em --data-dir)")
+    formats.add_argument("--data-dir", default="direx_data", help="Diretório de dados")
+    formats.add_argument("--repeat", type=positive_int, default=5, help="Repetições por formato")
+
+    retention = subparsers.add_parser("retention", help="Aplica a retenção e arquiva snapshots antigos")
+    retention.add_argument("--data-dir", default="direx_data", help="Diretório de dados")
+    retention.add_argument("--keep-last", type=int, default=10, help="Snapshots recentes mantidos no diretório")
+    retention.add_argument("--hourly", type=int, default=24, help="Horas com um snapshot arquivado")
+    retention.add_argument("--daily", type=int, default=30, help="Dias com um snapshot arquivado")
+    retention.add_argument("--weekly", type=int, default=52, help="Semanas com um snapshot arquivado")
+    retention.add_argument("--dry-run", action="store_true", help="Apenas mostra o que seria feito")
+    retention.add_argument("--every", type=float, help="Repetir a cada N segundos (job contínuo)")
+    retention.add_argument("--restore", metavar="TIMESTAMP",
+                           help="Recupera o snapshot em TIMESTAMP (ou o anterior mais próximo)")
+    retention.add_argument("-o", "--output", help="Arquivo JSON de saída para --restore")
+
+    diff = subparsers.add_parser("diff", help="Mostra o que mudou entre dois snapshots")
+    diff.add_argument("old", help="Snapshot anterior (arquivo ou ref 'direx.db#id')")
+    diff.add_argument("new", help="Snapshot novo (arquivo ou ref 'direx.db#id')")
+    diff.add_argument("--json", action="store_true", help="Emitir o diff completo em JSON")
+
+    merge = subparsers.add_parser("merge", help="Merge de três vias entre versões de um plano")
+    merge.add_argument("base", help="Snapshot de origem comum")
+    merge.add_argument("ours", help="Nossa versão")
+    merge.add_argument("theirs", help="Versão deles")
+    merge.add_argument("-o", "--output", required=True, help="Snapshot JSON combinado")
+
+    simulate = subparsers.add_parser("simulate", help="Simulação Monte Carlo de prazos do roadmap e metas dos KPIs")
+    simulate.add_argument("snapshot", nargs="?", help="Snapshot a simular (arquivo ou ref 'direx.db#id')")
+    simulate.add_argument("--objective", help="Sem snapshot, gera um plano para este objetivo")
+    simulate.add_argument("--days", type=int, default=90, help="Horizonte do plano gerado em dias")
+    simulate.add_argument("--trials", type=int, default=100_000, help="Número de tentativas")
+    simulate.add_argument("--workers", type=int, default=1, help="Processos (0 = um por CPU)")
+    simulate.add_argument("--seed", type=int, help="Semente para resultados reprodutíveis")
+    simulate.add_argument("--targets", metavar="ARQUIVO",
+                          help='JSON {"KPI": {"atual", "meta", "crescimento", "modelo"}} com as metas numéricas')
+    simulate.add_argument("--duration", metavar="JSON",
+                          help='Distribuição do multiplicador de duração, ex.: {"tipo": "triangular", '
+                               '"min": 0.9, "moda": 1.0, "max": 1.5}')
+    simulate.add_argument("--json", action="store_true", help="Emitir o resultado em JSON")
+
+    bench = subparsers.add_parser("bench", help="Mede os caminhos principais e compara com um baseline")
+    bench.add_argument("-o", "--output", help="Gravar os resultados como baseline JSON")
+    bench.add_argument("--repeat", type=positive_int, default=5, help="Repetições por caso")
+    bench.add_argument("--tasks", type=int, nargs="+", default=[100, 1000, 10000], help="Números de tarefas")
+    bench.add_argument("--snapshots", type=int, nargs="+", default=[1, 100, 1000], help="Snapshots salvos")
+    bench.add_argument("--horizons", type=int, nargs="+", default=[7, 90, 360, 1080], help="Horizontes em dias")
+    bench.add_argument("--only", help="Executar apenas casos cujo nome contém este texto")
+    bench.add_argument("--compare", metavar="BASELINE", help="Comparar com um baseline e falhar se regredir")
+    bench.add_argument("--against", metavar="RESULTADO",
+                       help="Com --compare, usar este resultado salvo em vez de executar")
+    bench.add_argument("--threshold", type=float, default=0.25, help="Tolerância de tempo (0.25 = 25%%)")
+    bench.add_argument("--memory-threshold", type=float, help="Tolerância de alocação (padrão: não verifica)")
+
+    return parser
+
+
+def run_plan_command(args: argparse.Namespace):
+    """Gera a parte pedida do plano e a emite em JSON, sem banner nem menu"""
+    if args.command in ("okrs", "roadmap", "plan") and not args.objective:
+        raise ValueError(f"O comando {args.command} requer --objective")
+
+    agent = DirexAgent(data_dir=args.data_dir, verbose=False)
+    if args.objective:
+        agent.set_business_objective(args.objective)
+
+    if args.command == "okrs":
+        result = agent.create_okrs()
+    elif args.command == "kpis":
+        result = agent.create_kpis()
+    elif args.command == "roadmap":
+        result = agent.create_roadmap(args.days)
+    elif args.command == "weekly-plan":
+        result = agent.create_weekly_plan()
+    else:
+        result = {
+            "objetivo": agent.business_objective,
+            "periodo_dias": args.days,
+            "okrs": agent.create_okrs(),
+            "kpis": agent.create_kpis(),
+            "roadmap": agent.create_roadmap(args.days),
+            "weekly_plan": agent.create_weekly_plan()
+        }
+
+    print(json.dumps(result, ensure_ascii=False, indent=2 if args.pretty else None))
+    if args.save:
+        # A referência vai para o stderr para manter o stdout como JSON puro
+        print(f"💾 Dados salvos em: {agent.save_data()}", file=sys.stderr)
+
+
+def run_prioritize(args: argparse.Namespace):
+    """Executa a priorização em lote"""
+    from direx_priority import prioritize_batch, print_ranking, read_tasks, write_jsonl
+
+    fmt = args.format or ("jsonl" if args.input.endswith((".jsonl", ".ndjson")) else "csv")
+    stream = sys.stdin if args.input == "-" else open(args.input, 'r', encoding='utf-8', newline='')
+    try:
+        tasks = read_tasks(stream, fmt, args.task_col, args.impact_col, args.effort_col)
+        if args.stream:
+            run_prioritize_stream(args, tasks)
+            return
+        prioritized = prioritize_batch(tasks, args.top)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+    if tasks.malformadas:
+        print(f"⚠️ {tasks.malformadas} linha(s) malformada(s) ignorada(s)", file=sys.stderr)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            write_jsonl(prioritized, f)
+        print(f"✅ {len(prioritized)} tarefas priorizadas em: {args.output}")
+    else:
+        print("✅ Tarefas priorizadas:")
+        print_ranking(prioritized)
+
+
+def run_prioritize_stream(args: argparse.Namespace, tasks):
+    """Emite rankings parciais do top-K enquanto o feed é consumido"""
+    from direx_priority import StreamingPrioritizer, print_ranking, stream_prioritize
+
+    prioritizer = StreamingPrioritizer(args.top or 10)
+    out = open(args.output, 'w', encoding='utf-8') if args.output else None
     try:
+        for processadas, ranking in stream_prioritize(tasks, prioritizer.k, args.every, prioritizer):
+            if out:
+                out.write(json.dumps({
+                    "processadas": processadas,
+                    "ignoradas": tasks.malformadas + prioritizer.rejeitadas,
+                    "ranking": [{"tarefa": t, "nivel": n, "score": s} for t, n, s in ranking]
+                }, ensure_ascii=False) + "\n")
+                out.flush()
+            else:
+                print(f"\n🔄 Ranking após {processadas} tarefas:")
+                print_ranking(ranking)
+                sys.stdout.flush()
+    finally:
+        if out:
+            out.close()
+
+    if tasks.malformadas or prioritizer.rejeitadas:
+        print(f"⚠️ Ignoradas: {tasks.malformadas} linha(s) malformada(s), "
+              f"{prioritizer.rejeitadas} fora da escala 1-10", file=sys.stderr)
+
+
+def run_batch_command(args: argparse.Namespace):
+    """Executa a geração de planos em lote"""
+    from direx_batch import print_report, run_batch
+
+    stream = sys.stdin if args.input == "-" else open(args.input, 'r', encoding='utf-8')
+    try:
+        with open(args.output, 'w', encoding='utf-8') as out:
+            report = run_batch(stream, out, args.workers, args.chunk_size)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+    print_report(report)
+
+
+def run_search(args: argparse.Namespace):
+    """Executa a busca textual no histórico de snapshots"""
+    from direx_search import SearchIndex, print_hits
+    from direx_storage import SQLiteStorage
+
+    index = SearchIndex(os.path.join(args.data_dir, "direx_search.db"))
+    if args.reindex_json:
+        print(f"📚 {index.index_json_dir(args.data_dir)} snapshots JSON indexados")
+    # Os salvamentos não indexam: a busca põe o índice em dia com o direx.db
+    novos = index.index_storage(SQLiteStorage(os.path.join(args.data_dir, "direx.db")))
+    if novos:
+        print(f"📚 {novos} snapshot(s) novo(s) indexado(s)")
+    print_hits(index.search(args.query, args.limit))
+
+
+def run_import(args: argparse.Namespace):
+    """Importa snapshots avulsos ou diretórios inteiros para o SQLite de --data-dir"""
+    from direx_storage import SQLiteStorage
+
+    storage = SQLiteStorage(os.path.join(args.data_dir, "direx.db"))
+    total = sum(storage.import_snapshots(source) for source in args.sources)
+    print(f"📥 {total} snapshot(s) importado(s) em: {storage.db_path}")
+
+
+def run_formats(args: argparse.Namespace):
+    """Mede bytes em disco e tempo de codificação/decodificação de cada formato"""
+    from direx_serializers import benchmark, print_benchmark
+    from direx_storage import SQLiteStorage, import_json
+
+    if args.snapshot:
+        data = import_json(args.snapshot)
+    else:
+        data = SQLiteStorage(os.path.join(args.data_dir, "direx.db")).load_latest()
+        if data is None:
+            raise ValueError(f"Nenhum snapshot encontrado em {args.data_dir}")
+    print_benchmark(benchmark(data, args.repeat))
+
+
+def run_retention(args: argparse.Namespace):
+    """Executa a retenção de snapshots ou recupera um snapshot arquivado"""
+    import time
+    from direx_retention import RetentionManager, RetentionPolicy
+    from direx_storage import export_json
+
+    manager = RetentionManager(args.data_dir, RetentionPolicy(args.keep_last, args.hourly, args.daily, args.weekly))
+    if args.restore:
+        data = manager.fetch(args.restore)
+        if data is None:
+            raise ValueError(f"Nenhum snapshot até {args.restore}")
+        if args.output:
+            export_json(data, args.output)
+            print(f"✅ Snapshot {data.get('timestamp')} recuperado em: {args.output}")
+        else:
+            print(json.dumps(data, indent=2, ensure_ascii=False))
+        return
+
+    while True:
+        resumo = manager.run(dry_run=args.dry_run)
+        print(f"🗄️ Mantidos: {resumo['mantidos']} | Arquivados: {resumo['arquivados']} | "
+              f"Descartados: {resumo['descartados']} | Gravados: {resumo['bytes_gravados']:,} bytes | "
+              f"Liberados: {resumo['bytes_liberados']:,} bytes")
+        if not args.every:
+            break
+        time.sleep(args.every)
+
+
+def run_diff(args: argparse.Namespace):
+    """Compara dois snapshots salvos"""
+    from direx_diff import diff_plans, load_snapshot, print_diff
+
+    diff = diff_plans(load_snapshot(args.old), load_snapshot(args.new))
+    if args.json:
+        print(json.dumps(diff, indent=2, ensure_ascii=False, default=str))
+    else:
+        print_diff(diff)
+
+
+def run_merge(args: argparse.Namespace):
+    """Combina duas versões de um plano e relata os conflitos"""
+    from direx_diff import load_snapshot, merge_plans
+    from direx_storage import export_json
+
+    result = merge_plans(load_snapshot(args.base), load_snapshot(args.ours), load_snapshot(args.theirs))
+    export_json(result.dados, args.output)
+    print(f"✅ Plano combinado em: {args.output}")
+    for conflito in result.conflitos:
+        campo = f".{conflito['campo']}" if conflito["campo"] else ""
+        print(f"⚠️ Conflito em {conflito['secao']}[{conflito['id']}]{campo}: mantida a nossa versão")
+    if result.conflitos:
+        sys.exit(2)
+
+
+def run_simulate(args: argparse.Namespace):
+    """Simula um snapshot salvo (ou um plano gerado na hora) e exibe as probabilidades"""
+    from direx_simulation import print_simulation
+
+    if not args.snapshot and not args.objective:
+        raise ValueError("Informe um snapshot ou --objective")
+
+    agent = DirexAgent(verbose=False, index_search=False)
+    if args.snapshot:
+        from direx_diff import load_snapshot
+        agent.apply_state(load_snapshot(args.snapshot))
+    else:
+        agent.set_business_objective(args.objective)
+        agent.create_okrs()
+        agent.create_kpis()
+        agent.create_roadmap(args.days)
+
+    metas = None
+    if args.targets:
+        with open(args.targets, 'r', encoding='utf-8') as f:
+            metas = json.load(f)
+    duracao = json.loads(args.duration) if args.duration else None
+
+    result = agent.simulate(args.trials, metas, duracao, args.workers, args.seed)
+    if args.json:
+        print(json.dumps(result, indent=2, ensure_ascii=False))
+    else:
+        print_simulation(result)
+
+
+def run_bench(args: argparse.Namespace):
+    """Executa os benchmarks e, opcionalmente, compara com um baseline"""
+    from direx_bench import (build_cases, compare, load_baseline, print_comparison, run_benchmarks,
+                             save_baseline)
+
+    if args.against:
+        current = load_baseline(args.against)
+    else:
+        current = run_benchmarks(build_cases(args.tasks, args.snapshots, args.horizons), args.repeat, args.only)
+        if args.output:
+            print(f"💾 Baseline salvo em: {save_baseline(current, args.output)}")
+
+    if args.compare:
+        linhas = compare(load_baseline(args.compare), current, args.threshold, args.memory_threshold)
+        print_comparison(linhas)
+        if any(linha["regressao"] for linha in linhas):
+            sys.exit(1)
+
+
+def run_command(args: argparse.Namespace):
+    """Executa o subcomando escolhido (sem subcomando, o menu interativo)"""
+    if args.command in PLAN_COMMANDS:
+        run_plan_command(args)
+    elif args.command == "daemon":
+        from direx_daemon import serve
+        serve(args.socket)
+    elif args.command == "prioritize":
+        run_prioritize(args)
+    elif args.command == "batch":
+        run_batch_command(args)
+    elif args.command == "search":
+        run_search(args)
+    elif args.command == "import":
+        run_import(args)
+    elif args.command == "formats":
+        run_formats(args)
+    elif args.command == "retention":
+        run_retention(args)
+    elif args.command == "diff":
+        run_diff(args)
+    elif args.command == "merge":
+        run_merge(args)
+    elif args.command == "simulate":
+        run_simulate(args)
+    elif args.command == "bench":
+        run_bench(args)
+    elif args.command == "serve":
+        from direx_server import run_server
+        run_server(args.host, args.port, args.data_dir, args.idle_timeout,
+                   int(args.memory_budget * 1024 * 1024), args.max_agents)
+    else:
         direx = DirexAgent()
         direx.run_interactive()
+
+
+def main(argv: Optional[List[str]] = None):
+    """Função principal"""
+    args = build_parser().parse_args(argv)
+
+    try:
+        if args.metrics:
+            direx_metrics.enable()
+        direx_metrics.configure_profiling(args.profile, args.profiler)
+        # No modo interativo o perfil é capturado por opção do menu, não pela sessão inteira
+        with direx_metrics.command(f"cli.{args.command or 'interativo'}", profile=args.command is not None):
+            run_command(args)
     except Exception as e:
         print(f"Erro crítico: {e}")
         sys.exit(1)
+    finally:
+        if args.metrics:
+            direx_metrics.export(args.metrics)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+DIREX - Geração de Planos em Lote
+Gera OKRs, KPIs, roadmap e plano semanal para milhares de objetivos em paralelo.
+"""
+
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from direx_storage import empty_state
+
+# Agente reutilizado por processo worker (evita recriar diretório/backends a cada objetivo)
+_worker_agent = None
+
+
+def _get_worker_agent():
+    global _worker_agent
+    if _worker_agent is None:
+        from direx_agent import DirexAgent
+        _worker_agent = DirexAgent(verbose=False)
+    return _worker_agent
+
+
+def build_plan(record: Dict) -> Dict:
+    """Executa create_okrs, create_kpis, create_roadmap e create_weekly_plan para um objetivo"""
+    agent = _get_worker_agent()
+    agent.apply_state(empty_state())
+    agent.set_business_objective(record.get("objetivo", ""))
+
+    periodo = int(record.get("periodo_dias", 90))
+    return {
+        "objetivo": agent.business_objective,
+        "periodo_dias": periodo,
+        "okrs": agent.create_okrs(),
+        "kpis": agent.create_kpis(),
+        "roadmap": agent.create_roadmap(periodo),
+        "weekly_plan": agent.create_weekly_plan()
+    }
+
+
+def process_chunk(chunk: List[Tuple[int, Dict]]) -> Tuple[int, float, List[Dict]]:
+    """Processa um bloco de objetivos em um worker e mede o tempo gasto"""
+    start = time.perf_counter()
+    results = []
+    for indice, record in chunk:
+        # Um registro ruim vira um resultado com "erro" sem derrubar o bloco
+        try:
+            result = {"erro": record["erro"]} if "erro" in record else build_plan(record)
+            if "id" in record:
+                result["id"] = record["id"]
+        except Exception as e:
+            result = {"erro": str(e)}
+        result["indice"] = indice
+        results.append(result)
+    return os.getpid(), time.perf_counter() - start, results
+
+
+def read_objectives(stream: TextIO) -> Iterator[Tuple[int, Dict]]:
+    """
+    Lê objetivos de um JSONL; cada linha pode ser um objeto ou apenas o texto do
+    objetivo. Outros valores JSON viram {"erro": ...} e saem como erro no resultado.
+    """
+    for indice, line in enumerate(stream):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            record = {"objetivo": line}
+        if isinstance(record, str):
+            record = {"objetivo": record}
+        elif not isinstance(record, dict):
+            # JSON válido que não é objeto nem texto (ex.: 42, [1])
+            record = {"erro": "registro inválido"}
+        yield indice, record
+
+
+def _chunks(items: Iterable, size: int) -> Iterator[List]:
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class BatchStats:
+    """Contadores de progresso e throughput por worker"""
+
+    def __init__(self):
+        self.processados = 0
+        self.erros = 0
+        self.start = time.perf_counter()
+        self.workers: Dict[int, List[float]] = {}  # pid -> [objetivos, segundos]
+
+    def add(self, pid: int, elapsed: float, results: List[Dict]):
+        self.processados += len(results)
+        self.erros += sum(1 for r in results if "erro" in r)
+        stats = self.workers.setdefault(pid, [0, 0.0])
+        stats[0] += len(results)
+        stats[1] += elapsed
+
+    def report(self) -> Dict:
+        elapsed = time.perf_counter() - self.start
+        return {
+            "processados": self.processados,
+            "erros": self.erros,
+            "segundos": round(elapsed, 3),
+            "objetivos_por_segundo": round(self.processados / elapsed, 1) if elapsed else 0.0,
+            "workers": {
+                pid: {
+                    "objetivos": int(count),
+                    "segundos": round(seconds, 3),
+                    "objetivos_por_segundo": round(count / seconds, 1) if seconds else 0.0
+                }
+                for pid, (count, seconds) in sorted(self.workers.items())
+            }
+        }
+
+
+def run_batch(input_stream: TextIO, output_stream: TextIO, workers: Optional[int] = None,
+              chunk_size: int = 64, progress: Optional[TextIO] = sys.stderr) -> Dict:
+    """
+    Distribui os objetivos em blocos por um ProcessPoolExecutor e grava um
+    registro JSONL por objetivo assim que cada bloco termina. No máximo
+    2 blocos por worker ficam em voo, então a entrada é lida sob demanda.
+    """
+    workers = workers or os.cpu_count() or 1
+    stats = BatchStats()
+    chunks = _chunks(read_objectives(input_stream), chunk_size)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = set()
+        for chunk in islice(chunks, workers * 2):
+            pending.add(executor.submit(process_chunk, chunk))
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                pid, elapsed, results = future.result()
+                for result in results:
+                    output_stream.write(json.dumps(result, ensure_ascii=False) + "\n")
+                stats.add(pid, elapsed, results)
+                if progress:
+                    progress.write(f"\r⏳ {stats.processados} objetivos processados")
+                    progress.flush()
+
+            for chunk in islice(chunks, len(done)):
+                pending.add(executor.submit(process_chunk, chunk))
+
+    if progress:
+        progress.write("\n")
+    return stats.report()
+
+
+def print_report(report: Dict):
+    """Exibe o resumo do lote com throughput por worker"""
+    print(f"✅ {report['processados']} objetivos em {report['segundos']}s "
+          f"({report['objetivos_por_segundo']}/s, {report['erros']} erros)")
+    for pid, stats in report["workers"].items():
+        print(f"   • Worker {pid}: {stats['objetivos']} objetivos, {stats['objetivos_por_segundo']}/s")
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+DIREX - Benchmarks
+Mede os caminhos mais usados do DirexAgent (tempo, alocações e pico de RSS),
+grava baselines em JSON e compara execuções para detectar regressões.
+"""
+
+import builtins
+import contextlib
+import gc
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence
+
+try:
+    import resource
+except ImportError:  # Windows: sem pico de RSS
+    resource = None
+
+from direx_agent import DirexAgent
+
+DEFAULT_TASKS = (100, 1000, 10000)
+DEFAULT_SNAPSHOTS = (1, 100, 1000)
+DEFAULT_HORIZONS = (7, 90, 360, 1080)
+
+OBJECTIVE = "Aumentar receita mensal em 30%"
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class BenchCase(NamedTuple):
+    """Um caso: `setup` prepara o estado e devolve a função medida"""
+    nome: str
+    setup: Callable[[str], Callable[[], object]]
+
+
+def _agent(data_dir: str) -> DirexAgent:
+    agent = DirexAgent(data_dir=data_dir, verbose=False)
+    agent.set_business_objective(OBJECTIVE)
+    return agent
+
+
+def _full_agent(data_dir: str, tasks: int) -> DirexAgent:
+    agent = _agent(data_dir)
+    agent.create_okrs()
+    agent.create_kpis()
+    agent.create_roadmap(90)
+    agent.create_weekly_plan()
+    agent.tasks = [{"id": f"t{i}", "tarefa": f"Tarefa {i}", "duracao": 1 + i % 5} for i in range(tasks)]
+    return agent
+
+
+def _scripted_prioritize(agent: DirexAgent, tasks: List[str]) -> Callable[[], object]:
+    """prioritize_tasks com respostas pré-definidas no lugar do input() e saída descartada"""
+    answers = [str(1 + (i * 7) % 10) for i in range(2 * len(tasks))]
+
+    def run():
+        feed = iter(answers)
+        original = builtins.input
+        builtins.input = lambda prompt="": next(feed)
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                return agent.prioritize_tasks(tasks)
+        finally:
+            builtins.input = original
+    return run
+
+
+def _subprocess(args: List[str]) -> Callable[[str], Callable[[], object]]:
+    """Caso que mede um processo Python novo (partida do interpretador + imports)"""
+    def setup(data_dir):
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [PACKAGE_DIR, os.environ.get("PYTHONPATH")])))
+        command = [sys.executable, *args]
+        return lambda: subprocess.run(command, cwd=data_dir, env=env, stdout=subprocess.DEVNULL, check=True)
+    return setup
+
+
+def startup_cases() -> List[BenchCase]:
+    """Tempo de partida: interpretador puro, import do direx_agent e um comando não interativo"""
+    return [
+        BenchCase("startup[python]", _subprocess(["-c", "pass"])),
+        BenchCase("startup[import direx_agent]", _subprocess(["-c", "import direx_agent"])),
+        BenchCase("startup[okrs]", _subprocess([os.path.join(PACKAGE_DIR, "direx_agent.py"), "okrs",
+                                                "--objective", OBJECTIVE])),
+    ]
+
+
+def build_cases(tasks: Sequence[int] = DEFAULT_TASKS, snapshots: Sequence[int] = DEFAULT_SNAPSHOTS,
+                horizons: Sequence[int] = DEFAULT_HORIZONS, startup: bool = True) -> List[BenchCase]:
+    """Casos parametrizados por número de tarefas, snapshots salvos e horizonte do roadmap"""
+    cases = startup_cases() if startup else []
+    cases.append(BenchCase("create_okrs", lambda d: _agent(d).create_okrs))
+
+    for dias in horizons:
+        def roadmap(d, dias=dias):
+            agent = _agent(d)
+            agent.create_okrs()
+            return lambda: agent.create_roadmap(dias)
+        cases.append(BenchCase(f"create_roadmap[dias={dias}]", roadmap))
+
+    cases.append(BenchCase("create_weekly_plan[template]", lambda d: _agent(d).create_weekly_plan))
+    for n in tasks:
+        def weekly(d, n=n):
+            agent = _agent(d)
+            tarefas = [{"tarefa": f"Tarefa {i}", "esforco": 1 + i % 4, "score": i % 25} for i in range(n)]
+            return lambda: agent.create_weekly_plan(tarefas, membros=["Ana", "Bruno", "Carla"])
+        cases.append(BenchCase(f"create_weekly_plan[tarefas={n}]", weekly))
+
+    for n in tasks:
+        cases.append(BenchCase(
+            f"prioritize_tasks[tarefas={n}]",
+            lambda d, n=n: _scripted_prioritize(_agent(d), [f"Tarefa {i}" for i in range(n)])
+        ))
+
+    for n in tasks:
+        cases.append(BenchCase(f"save_data[tarefas={n}]", lambda d, n=n: _full_agent(d, n).save_data))
+
+    for n in snapshots:
+        def load(d, n=n):
+            agent = _full_agent(d, 100)
+            agent.search_index = None
+            for _ in range(n):
+                agent.storage.save(agent.to_dict())
+            return agent.load_data
+        cases.append(BenchCase(f"load_data[snapshots={n}]", load))
+
+    return cases
+
+
+def _max_rss_kb() -> Optional[int]:
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == "darwin" else rss
+
+
+def measure(case: BenchCase, repeat: int = 5) -> Dict:
+    """
+    Executa o caso `repeat` vezes para medir o tempo e uma vez extra com
+    tracemalloc (o rastreamento distorce o tempo, por isso fica separado).
+    """
+    if repeat < 1:
+        raise ValueError("repeat deve ser maior que zero")
+    with tempfile.TemporaryDirectory(prefix="direx_bench_") as data_dir:
+        fn = case.setup(data_dir)
+
+        tempos = []
+        for _ in range(repeat):
+            gc.collect()
+            inicio = time.perf_counter()
+            fn()
+            tempos.append(time.perf_counter() - inicio)
+
+        gc.collect()
+        tracemalloc.start()
+        fn()
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    # ru_maxrss é o pico do processo inteiro (inclui casos anteriores): serve de
+    # referência para a execução, não como custo deste caso
+    return {
+        "tempo_mediano_s": statistics.median(tempos),
+        "tempo_min_s": min(tempos),
+        "alocado_pico_bytes": pico,
+        "rss_pico_kb": _max_rss_kb()
+    }
+
+
+def run_benchmarks(cases: Sequence[BenchCase], repeat: int = 5, only: Optional[str] = None,
+                   progress=None) -> Dict:
+    """Executa os casos (filtrados por substring em `only`) e retorna o baseline"""
+    progress = progress if progress is not None else sys.stderr
+    resultados = {}
+    for case in cases:
+        if only and only not in case.nome:
+            continue
+        resultados[case.nome] = measure(case, repeat)
+        r = resultados[case.nome]
+        print(f"  {case.nome:<36} {r['tempo_mediano_s'] * 1000:>10.2f} ms  "
+              f"{r['alocado_pico_bytes'] / 1024:>10.1f} KiB", file=progress)
+
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "plataforma": platform.platform(),
+            "data": datetime.now().isoformat(timespec="seconds"),
+            "repeticoes": repeat
+        },
+        "resultados": resultados
+    }
+
+
+def save_baseline(baseline: Dict, filename: str) -> str:
+    directory = os.path.dirname(filename)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(filename, "w", encoding="utf-8") as f:
+        json.dump(baseline, f, indent=2, ensure_ascii=False)
+    return filename
+
+
+def load_baseline(filename: str) -> Dict:
+    with open(filename, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(baseline: Dict, current: Dict, threshold: float = 0.25,
+            memory_threshold: Optional[float] = None) -> List[Dict]:
+    """
+    Compara dois resultados caso a caso. Uma regressão é um tempo mediano (ou
+    pico de alocação, se `memory_threshold` for informado) maior que o baseline
+    em mais de `threshold` (0.25 = 25%). Retorna uma linha por caso; casos
+    presentes em só um dos lados vêm com `ausente` ("baseline" ou "atual") e
+    razões None.
+    """
+    linhas = []
+    base = baseline["resultados"]
+    atuais = current["resultados"]
+    for nome, atual in atuais.items():
+        anterior = base.get(nome)
+        if anterior is None:
+            linhas.append({"caso": nome, "razao_tempo": None, "razao_memoria": None, "regressao": False,
+                           "ausente": "baseline"})
+            continue
+
+        razao_tempo = atual["tempo_mediano_s"] / anterior["tempo_mediano_s"] if anterior["tempo_mediano_s"] else 1.0
+        razao_memoria = (atual["alocado_pico_bytes"] / anterior["alocado_pico_bytes"]
+                         if anterior["alocado_pico_bytes"] else 1.0)
+        regressao = razao_tempo > 1 + threshold
+        if memory_threshold is not None and razao_memoria > 1 + memory_threshold:
+            regressao = True
+        linhas.append({"caso": nome, "razao_tempo": razao_tempo, "razao_memoria": razao_memoria,
+                       "regressao": regressao, "ausente": None})
+
+    for nome in base:
+        if nome not in atuais:
+            linhas.append({"caso": nome, "razao_tempo": None, "razao_memoria": None, "regressao": False,
+                           "ausente": "atual"})
+    return linhas
+
+
+def print_comparison(linhas: List[Dict]):
+    """Exibe a comparação com os casos regredidos marcados"""
+    print(f"{'Caso':<38} {'Tempo':>8} {'Memória':>8}")
+    for linha in linhas:
+        if linha["ausente"] == "baseline":
+            print(f"{linha['caso']:<38} {'—':>8} {'—':>8} 🆕 sem baseline")
+        elif linha["ausente"] == "atual":
+            print(f"{linha['caso']:<38} {'—':>8} {'—':>8} ⚠️ não executado")
+        else:
+            marca = "❌" if linha["regressao"] else "✅"
+            print(f"{linha['caso']:<38} {linha['razao_tempo']:>7.2f}x {linha['razao_memoria']:>7.2f}x {marca}")
+    regressoes = sum(1 for linha in linhas if linha["regressao"])
+    comparados = sum(1 for linha in linhas if linha["ausente"] is None)
+    print(f"\n{regressoes} regressão(ões) em {comparados} casos comparados")
+    novos = sum(1 for linha in linhas if linha["ausente"] == "baseline")
+    faltando = sum(1 for linha in linhas if linha["ausente"] == "atual")
+    if novos or faltando:
+        print(f"{novos} caso(s) sem baseline, {faltando} caso(s) do baseline não executado(s)")
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+DIREX - Plano Semanal por Capacidade
+Distribui tarefas priorizadas pelos dias e membros da equipe respeitando a capacidade.
+"""
+
+from collections.abc import Mapping
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+from direx_templates import DIAS_SEMANA, daily_focus, daily_metrics
+
+# Horas disponíveis por dia quando nada é informado
+DEFAULT_CAPACITY = {
+    "Segunda": 8.0,
+    "Terça": 8.0,
+    "Quarta": 8.0,
+    "Quinta": 8.0,
+    "Sexta": 8.0,
+    "Sábado": 0.0,
+    "Domingo": 0.0,
+}
+
+# Acima deste número de tarefas o solver exato cede lugar à heurística
+EXACT_LIMIT = 12
+
+# Nós visitados pelo branch and bound antes de ficar com a melhor solução já
+# encontrada (no mínimo a do first-fit), para limitar o tempo em equipes grandes
+EXACT_NODE_BUDGET = 50_000
+
+
+class CapacityPlan(NamedTuple):
+    """Resultado do empacotamento semanal"""
+    dias: List[Dict]
+    nao_alocadas: List[Dict]
+    utilizacao: float
+
+
+class _MaxTree:
+    """Árvore de segmentos de máximos para achar o primeiro bin com espaço em O(log n)"""
+
+    def __init__(self, values: Sequence[float]):
+        self.size = 1
+        while self.size < len(values):
+            self.size *= 2
+        self.tree = [float("-inf")] * (2 * self.size)
+        self.tree[self.size:self.size + len(values)] = values
+        for i in range(self.size - 1, 0, -1):
+            self.tree[i] = max(self.tree[2 * i], self.tree[2 * i + 1])
+
+    def first_fit(self, need: float) -> int:
+        """Índice do primeiro bin com capacidade >= need, ou -1"""
+        if self.tree[1] < need:
+            return -1
+        i = 1
+        while i < self.size:
+            i = 2 * i if self.tree[2 * i] >= need else 2 * i + 1
+        return i - self.size
+
+    def update(self, index: int, value: float):
+        i = index + self.size
+        self.tree[i] = value
+        i //= 2
+        while i:
+            self.tree[i] = max(self.tree[2 * i], self.tree[2 * i + 1])
+            i //= 2
+
+
+def _normalize_tasks(tarefas: Sequence) -> List[Dict]:
+    normalized = []
+    for posicao, item in enumerate(tarefas):
+        if not isinstance(item, Mapping):
+            raise ValueError(f"Tarefa {posicao + 1}: informe um dict com 'tarefa' e 'esforco'")
+        esforco = float(item.get("esforco", item.get("horas", 0)))
+        if esforco <= 0:
+            raise ValueError(f"Tarefa {posicao + 1}: esforço deve ser maior que zero")
+        normalized.append({
+            "tarefa": item.get("tarefa", f"Tarefa {posicao + 1}"),
+            "esforco": esforco,
+            "score": item.get("score", item.get("prioridade", 0)) or 0,
+            "responsavel": item.get("responsavel"),
+            "posicao": posicao
+        })
+    return normalized
+
+
+def build_capacity_plan(tarefas: Sequence[Dict], capacidade: Optional[Dict[str, float]] = None,
+                        membros: Optional[Sequence[str]] = None, exact: bool = False) -> CapacityPlan:
+    """
+    Empacota tarefas ({"tarefa", "esforco" em horas, "score"?, "responsavel"?}) em
+    dias x membros. Heurística: first-fit decrescente (prioridade, depois esforço),
+    com os bins ordenados por dia e então por membro. Com exact=True e poucas
+    tarefas, usa branch and bound para maximizar as horas alocadas.
+    """
+    capacidade = dict(DEFAULT_CAPACITY if capacidade is None else capacidade)
+    membros = list(membros or ["Equipe"])
+    dias = [d for d in DIAS_SEMANA if d in capacidade] + [d for d in capacidade if d not in DIAS_SEMANA]
+
+    # Bins em ordem dia-maior: o "primeiro" bin é sempre o dia mais cedo
+    bins = [(dia, membro) for dia in dias for membro in membros]
+    restante = [float(capacidade[dia]) for dia, _ in bins]
+    total_capacidade = sum(restante)
+
+    tasks = _normalize_tasks(tarefas)
+    unknown = {t["responsavel"] for t in tasks if t["responsavel"] is not None} - set(membros)
+    if unknown:
+        raise ValueError(f"Responsáveis fora da equipe: {', '.join(sorted(map(str, unknown)))}")
+    tasks.sort(key=lambda t: (-t["score"], -t["esforco"], t["posicao"]))
+
+    assignment = _first_fit_decreasing(tasks, bins, membros, restante)
+    if exact and len(tasks) <= EXACT_LIMIT:
+        assignment = _exact_assignment(tasks, bins, restante, assignment)
+
+    alocacoes: Dict[int, List[Dict]] = {}
+    nao_alocadas = []
+    for task, bin_index in zip(tasks, assignment):
+        if bin_index < 0:
+            nao_alocadas.append({"tarefa": task["tarefa"], "esforco": task["esforco"],
+                                 "responsavel": task["responsavel"]})
+        else:
+            alocacoes.setdefault(bin_index, []).append(task)
+
+    plan = []
+    carga_total = 0.0
+    for posicao_dia, dia in enumerate(dias):
+        por_membro = {}
+        tarefas_dia = []
+        carga = 0.0
+        for offset, membro in enumerate(membros):
+            bin_index = posicao_dia * len(membros) + offset
+            itens = alocacoes.get(bin_index, [])
+            if itens:
+                por_membro[membro] = [t["tarefa"] for t in itens]
+                tarefas_dia.extend(t["tarefa"] for t in itens)
+                carga += sum(t["esforco"] for t in itens)
+        carga_total += carga
+        plan.append({
+            "dia": dia,
+            "tarefas_principais": tarefas_dia,
+            "foco": daily_focus(dia),
+            "metricas": daily_metrics(dia),
+            "status": "pendente",
+            "carga_horas": carga,
+            "capacidade_horas": float(capacidade[dia]) * len(membros),
+            "alocacoes": por_membro
+        })
+
+    utilizacao = carga_total / total_capacidade if total_capacidade else 0.0
+    return CapacityPlan(plan, nao_alocadas, utilizacao)
+
+
+def _first_fit_decreasing(tasks: List[Dict], bins: List, membros: List[str], restante: List[float]) -> List[int]:
+    """First-fit em O(n log b) com árvore de segmentos sobre as capacidades restantes"""
+    tree = _MaxTree(restante)
+    restante = list(restante)
+    member_bins = {m: [i for i, (_, membro) in enumerate(bins) if membro == m] for m in membros}
+
+    assignment = []
+    for task in tasks:
+        need = task["esforco"]
+        if task["responsavel"] is None:
+            chosen = tree.first_fit(need)
+        else:
+            chosen = next((i for i in member_bins[task["responsavel"]] if restante[i] >= need), -1)
+
+        if chosen >= 0:
+            restante[chosen] -= need
+            tree.update(chosen, restante[chosen])
+        assignment.append(chosen)
+    return assignment
+
+
+class _BudgetExceeded(Exception):
+    pass
+
+
+def _exact_assignment(tasks: List[Dict], bins: List, restante: List[float], inicial: List[int],
+                      node_budget: int = EXACT_NODE_BUDGET) -> List[int]:
+    """
+    Branch and bound que maximiza as horas alocadas, partindo da solução
+    `inicial` (first-fit). Bins com a mesma folga são equivalentes quando o
+    membro não é exigido por nenhuma tarefa restante, então só o mais cedo é
+    tentado; o limite superior considera apenas a capacidade que ainda comporta
+    alguma tarefa. Passado `node_budget`, devolve a melhor solução encontrada.
+    """
+    restante = list(restante)
+    n = len(tasks)
+    suffix = [0.0] * (n + 1)
+    menor = [float("inf")] * (n + 1)
+    fixados: List[frozenset] = [frozenset()] * (n + 1)
+    for i in range(n - 1, -1, -1):
+        suffix[i] = suffix[i + 1] + tasks[i]["esforco"]
+        menor[i] = min(menor[i + 1], tasks[i]["esforco"])
+        responsavel = tasks[i]["responsavel"]
+        fixados[i] = fixados[i + 1] | {responsavel} if responsavel is not None else fixados[i + 1]
+
+    best = {
+        "valor": sum(t["esforco"] for t, b in zip(tasks, inicial) if b >= 0),
+        "assignment": list(inicial)
+    }
+    current = [-1] * n
+    nodes = [0]
+
+    def search(i: int, valor: float):
+        nodes[0] += 1
+        if nodes[0] > node_budget:
+            raise _BudgetExceeded
+        if i == n:
+            if valor > best["valor"]:
+                best["valor"] = valor
+                best["assignment"] = list(current)
+            return
+
+        # Limite superior: horas restantes, ou a capacidade que ainda comporta a menor tarefa
+        util = sum(r for r in restante if r >= menor[i])
+        if valor + min(suffix[i], util) <= best["valor"]:
+            return
+
+        task = tasks[i]
+        tried = set()
+        for b, (_, membro) in enumerate(bins):
+            if task["responsavel"] is not None and membro != task["responsavel"]:
+                continue
+            if restante[b] < task["esforco"]:
+                continue
+            # Bins intercambiáveis: mesma folga e membro irrelevante para as tarefas restantes
+            key = (restante[b], membro if membro in fixados[i] else None)
+            if key in tried:
+                continue
+            tried.add(key)
+            restante[b] -= task["esforco"]
+            current[i] = b
+            search(i + 1, valor + task["esforco"])
+            restante[b] += task["esforco"]
+            current[i] = -1
+        search(i + 1, valor)
+
+    try:
+        search(0, 0.0)
+    except _BudgetExceeded:
+        pass
+    return best["assignment"]
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+DIREX - Classificador de Objetivos
+Autômato Aho-Corasick que classifica objetivos de negócio em uma única passada.
+"""
+
+import json
+import unicodedata
+from collections import deque
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+
+def normalize(text: str) -> str:
+    """Remove acentos, ignora maiúsculas/minúsculas e colapsa espaços"""
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(stripped.casefold().split())
+
+
+class AhoCorasick:
+    """Autômato de múltiplos padrões: encontra todas as ocorrências em O(n + ocorrências)"""
+
+    def __init__(self, patterns: Sequence[str]):
+        self.patterns = list(patterns)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Tuple[int, ...]] = [()]
+
+        for index, pattern in enumerate(self.patterns):
+            node = 0
+            for char in pattern:
+                next_node = self._goto[node].get(char)
+                if next_node is None:
+                    next_node = len(self._goto)
+                    self._goto[node][char] = next_node
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append(())
+                node = next_node
+            self._output[node] += (index,)
+
+        # Links de falha em largura: cada nó herda as saídas do seu sufixo
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                self._output[child] += self._output[self._fail[child]]
+
+    def iter_matches(self, text: str) -> Iterable[Tuple[int, int]]:
+        """Itera sobre (posição final, índice do padrão) de cada ocorrência"""
+        goto, fail, output = self._goto, self._fail, self._output
+        node = 0
+        for position, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for index in output[node]:
+                yield position, index
+
+
+class ObjectiveClassifier:
+    """
+    Classifica objetivos em categorias por palavras-chave.
+    As categorias são avaliadas em ordem de prioridade: se um objetivo contém
+    palavras de mais de uma, vence a primeira da lista.
+    """
+
+    def __init__(self, categories: Sequence[Tuple[str, Sequence[str]]],
+                 key_results: Optional[Mapping[str, Sequence[str]]] = None,
+                 default: str = "geral"):
+        self.categories = [name for name, _ in categories]
+        self.key_results = dict(key_results or {})
+        self.default = default
+
+        patterns = []
+        self._pattern_category: List[int] = []
+        for rank, (_, keywords) in enumerate(categories):
+            for keyword in keywords:
+                patterns.append(normalize(keyword))
+                self._pattern_category.append(rank)
+        self._automaton = AhoCorasick(patterns)
+
+    def classify(self, objective: str) -> str:
+        """Retorna a categoria do objetivo (normalizado uma única vez)"""
+        best = len(self.categories)
+        for _, index in self._automaton.iter_matches(normalize(objective or "")):
+            rank = self._pattern_category[index]
+            if rank < best:
+                best = rank
+                if best == 0:
+                    break
+        return self.categories[best] if best < len(self.categories) else self.default
+
+    def classify_many(self, objectives: Iterable[str]) -> List[str]:
+        """Classifica um lote de objetivos"""
+        classify = self.classify
+        return [classify(objective) for objective in objectives]
+
+    def key_results_for(self, objective: str) -> Sequence[str]:
+        """Resultados-chave da categoria do objetivo"""
+        categoria = self.classify(objective)
+        return self.key_results.get(categoria, self.key_results.get(self.default, ()))
+
+    @classmethod
+    def from_config(cls, config: Mapping) -> "ObjectiveClassifier":
+        """
+        Cria um classificador a partir de uma configuração no formato:
+        {"padrao": "geral", "categorias": [{"nome", "palavras", "resultados_chave"}]}
+        """
+        categories = []
+        key_results = {}
+        for item in config.get("categorias", []):
+            categories.append((item["nome"], tuple(item.get("palavras", ()))))
+            if "resultados_chave" in item:
+                key_results[item["nome"]] = tuple(item["resultados_chave"])
+        return cls(categories, key_results, config.get("padrao", "geral"))
+
+    @classmethod
+    def from_json(cls, filename: str) -> "ObjectiveClassifier":
+        """Carrega a configuração de categorias de um arquivo JSON"""
+        with open(filename, 'r', encoding='utf-8') as f:
+            return cls.from_config(json.load(f))
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+DIREX - Daemon Aquecido
+Processo persistente que atende comandos do direx_agent por um socket Unix,
+evitando a partida do interpretador e os imports a cada chamada.
+
+Protocolo: uma linha JSON por conexão, {"argv": [...], "stdin": "..."?,
+"cwd": "..."?, "env": {...}?}, e uma linha JSON de resposta,
+{"codigo": int, "stdout": str, "stderr": str}. O comando roda no diretório
+`cwd` do cliente (caminhos relativos como direx_data/ são os dele) com as
+variáveis de FORWARDED_ENV recebidas em `env`.
+Qualquer cliente de socket Unix serve; este módulo também é um cliente leve:
+
+    python direx_daemon.py -- okrs --objective "Aumentar receita"
+
+Sem daemon no socket, o cliente executa o comando no próprio processo. Para
+eliminar também a partida do cliente, a automação pode falar o protocolo
+diretamente (ex.: socat ou o cliente de socket da própria linguagem).
+"""
+
+import json
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+# Comandos que não fazem sentido dentro do daemon (interativos ou de longa duração)
+BLOCKED_COMMANDS = (None, "daemon", "serve", "bench")
+
+# Variáveis de ambiente do cliente aplicadas durante o comando
+FORWARDED_ENV = ("DIREX_METRICS", "TZ")
+
+
+def default_socket() -> str:
+    """Socket em $DIREX_SOCKET ou, por padrão, um arquivo por usuário em $TMPDIR (ou /tmp)"""
+    # Sem tempfile: o cliente importa só o essencial para partir rápido
+    directory = os.environ.get("TMPDIR") or "/tmp"
+    return os.environ.get("DIREX_SOCKET") or os.path.join(directory, f"direx-{os.getuid()}.sock")
+
+
+def blocked_reason(args) -> Optional[str]:
+    """Motivo para recusar o comando no daemon (None se puder ser executado)"""
+    if args.command in BLOCKED_COMMANDS:
+        return args.command or "menu interativo"
+    if args.command == "retention" and args.every:
+        return "retention --every"
+    if args.command == "prioritize" and args.stream and args.input == "-":
+        return "prioritize --stream com stdin"
+    return None
+
+
+def client_env() -> Dict[str, str]:
+    """Variáveis de FORWARDED_ENV definidas no cliente"""
+    return {name: os.environ[name] for name in FORWARDED_ENV if name in os.environ}
+
+
+def _apply_env(env: Dict[str, str]) -> Dict[str, Optional[str]]:
+    """Aplica as variáveis do cliente e devolve os valores anteriores"""
+    previous = {}
+    for name in FORWARDED_ENV:
+        previous[name] = os.environ.get(name)
+        if name in env:
+            os.environ[name] = str(env[name])
+        else:
+            os.environ.pop(name, None)
+    if hasattr(time, "tzset"):
+        time.tzset()
+    return previous
+
+
+def execute(argv: List[str], stdin: str = "", cwd: Optional[str] = None,
+            env: Optional[Dict[str, str]] = None) -> Tuple[int, str, str]:
+    """
+    Executa direx_agent.main(argv) capturando saída e código de retorno, no
+    diretório `cwd` e com as variáveis `env` do cliente. Métricas e profiling
+    ligados pelo comando (--metrics, --profile, DIREX_METRICS) valem só para
+    ele: o estado do processo é restaurado ao final.
+    """
+    import contextlib
+    import io
+    import direx_metrics
+    from direx_agent import build_parser, main
+
+    out = io.StringIO()
+    err = io.StringIO()
+    original_stdin = sys.stdin
+    original_cwd = os.getcwd()
+    metrics_enabled = direx_metrics.enabled()
+    previous_env = None
+    sys.stdin = io.StringIO(stdin)
+    codigo = 0
+    try:
+        with contextlib.redirect_stdout(out), contextlib.redirect_stderr(err):
+            reason = blocked_reason(build_parser().parse_args(argv))
+            if reason:
+                print(f"Comando não suportado pelo daemon: {reason}", file=sys.stderr)
+                sys.exit(2)
+            if cwd:
+                try:
+                    os.chdir(cwd)
+                except OSError as e:
+                    print(f"Diretório do cliente inacessível: {e}", file=sys.stderr)
+                    sys.exit(2)
+            if env is not None:
+                previous_env = _apply_env(env)
+                if os.environ.get("DIREX_METRICS", "").lower() not in ("", "0", "false", "no"):
+                    direx_metrics.enable()
+            main(argv)
+    except SystemExit as e:
+        codigo = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    finally:
+        sys.stdin = original_stdin
+        os.chdir(original_cwd)
+        if previous_env is not None:
+            _apply_env({name: value for name, value in previous_env.items() if value is not None})
+        if not metrics_enabled:
+            direx_metrics.disable()
+        direx_metrics.REGISTRY.reset()
+        direx_metrics.configure_profiling(None)
+    return codigo, out.getvalue(), err.getvalue()
+
+
+def _warm_up():
+    """Importa os módulos usados pelos comandos e gera um plano descartável"""
+    # direx_agent importa estes módulos só no primeiro uso; o daemon os carrega já
+    import direx_capacity  # noqa: F401
+    import direx_kpi_store  # noqa: F401
+    import direx_priority
+    import direx_scheduler  # noqa: F401
+    import direx_search  # noqa: F401
+    from direx_agent import DirexAgent
+
+    agent = DirexAgent(verbose=False, index_search=False)
+    agent.set_business_objective("Aquecimento")
+    agent.create_okrs()
+    agent.create_kpis()
+    agent.create_roadmap()
+    agent.create_weekly_plan()
+    direx_priority.prioritize_batch([("Aquecimento", 5, 5)])
+
+
+def serve(socket_path: Optional[str] = None):
+    """Atende comandos no socket até ser interrompido; as conexões são tratadas em série"""
+    import socketserver
+
+    socket_path = socket_path or default_socket()
+    if os.path.exists(socket_path):
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+            try:
+                probe.connect(socket_path)
+            except OSError:
+                os.remove(socket_path)  # socket órfão de um daemon encerrado
+            else:
+                raise RuntimeError(f"Já existe um daemon DIREX em {socket_path}")
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            try:
+                request = json.loads(self.rfile.readline())
+                codigo, out, err = execute([str(a) for a in request["argv"]], request.get("stdin") or "",
+                                           request.get("cwd"), request.get("env"))
+            except (ValueError, KeyError, TypeError) as e:
+                codigo, out, err = 2, "", f"Requisição inválida: {e}\n"
+            except Exception as e:
+                codigo, out, err = 1, "", f"Erro crítico: {e}\n"
+            response = {"codigo": codigo, "stdout": out, "stderr": err}
+            self.wfile.write(json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n")
+
+    _warm_up()
+    # Socket acessível só pelo dono
+    previous_umask = os.umask(0o177)
+    try:
+        server = socketserver.UnixStreamServer(socket_path, Handler)
+    finally:
+        os.umask(previous_umask)
+
+    print(f"🔥 Daemon DIREX aquecido em {socket_path} (Ctrl+C para encerrar)", file=sys.stderr)
+    # SIGTERM encerra como Ctrl+C, removendo o socket
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+
+
+def call(socket_path: str, argv: List[str], stdin: str = "", timeout: Optional[float] = None) -> Tuple[int, str, str]:
+    """Envia um comando ao daemon; levanta OSError se não houver daemon no socket"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+        conn.settimeout(timeout)
+        conn.connect(socket_path)
+        request = {"argv": argv, "stdin": stdin, "cwd": os.getcwd(), "env": client_env()}
+        conn.sendall(json.dumps(request, ensure_ascii=False).encode("utf-8") + b"\n")
+        conn.shutdown(socket.SHUT_WR)
+        chunks = []
+        while True:
+            chunk = conn.recv(65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+
+    response = json.loads(b"".join(chunks))
+    return response["codigo"], response["stdout"], response["stderr"]
+
+
+def main(argv: Optional[List[str]] = None):
+    """Cliente: repassa os argumentos ao daemon ou, sem daemon, executa localmente"""
+    argv = list(sys.argv[1:] if argv is None else argv)
+    socket_path = default_socket()
+    if argv[:1] == ["--socket"] and len(argv) > 1:
+        socket_path, argv = argv[1], argv[2:]
+    if argv[:1] == ["--"]:
+        argv = argv[1:]
+
+    stdin = "" if sys.stdin is None or sys.stdin.isatty() or "-" not in argv else sys.stdin.read()
+    try:
+        codigo, out, err = call(socket_path, argv, stdin)
+    except OSError:
+        codigo, out, err = execute(argv, stdin)
+
+    sys.stdout.write(out)
+    sys.stderr.write(err)
+    sys.exit(codigo)
+
+
+if __name__ == "__main__":
+    main()
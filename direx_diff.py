@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+DIREX - Diff e Merge de Planos
+Comparação estrutural entre versões de um plano e merge de três vias com
+identidade estável por item (OKR pelo objetivo, KPI pelo nome, fase, dia, tarefa).
+"""
+
+from bisect import bisect_left
+from collections.abc import Mapping
+from typing import Any, Dict, Hashable, List, NamedTuple, Optional, Sequence, Tuple
+
+from direx_storage import SECTIONS, SectionedSnapshot, SQLiteStorage, import_json
+
+# Campo que identifica cada item de uma seção
+IDENTITY_FIELDS = {
+    "okrs": ("objetivo",),
+    "kpis": ("nome",),
+    "roadmap": ("fase",),
+    "weekly_plan": ("dia",),
+    "tasks": ("id", "tarefa"),
+}
+
+
+class MergeResult(NamedTuple):
+    """Estado combinado e os conflitos encontrados (o estado usa 'nosso' em cada conflito)"""
+    dados: Dict
+    conflitos: List[Dict]
+
+
+def _item_key(section: str, item: Any) -> Hashable:
+    if isinstance(item, Mapping):
+        for field in IDENTITY_FIELDS[section]:
+            value = item.get(field)
+            if value is not None:
+                return value
+        return repr(sorted(item.items(), key=lambda kv: kv[0]))
+    return item
+
+
+def index_items(section: str, items: Sequence) -> Dict[Tuple[Hashable, int], Tuple[int, Any]]:
+    """
+    Mapeia a identidade de cada item para (posição, item). Identidades repetidas
+    são desambiguadas pela ordem de ocorrência: (chave, 0), (chave, 1)...
+    """
+    index = {}
+    seen: Dict[Hashable, int] = {}
+    for position, item in enumerate(items):
+        key = _item_key(section, item)
+        n = seen.get(key, 0)
+        seen[key] = n + 1
+        index[(key, n)] = (position, item)
+    return index
+
+
+def _same(a: Any, b: Any) -> bool:
+    """Igualdade que trata tuplas e listas de mesmo conteúdo como iguais"""
+    if a == b:
+        return True
+    if isinstance(a, (list, tuple)) and isinstance(b, (list, tuple)):
+        return len(a) == len(b) and all(_same(x, y) for x, y in zip(a, b))
+    if isinstance(a, Mapping) and isinstance(b, Mapping):
+        return a.keys() == b.keys() and all(_same(a[k], b[k]) for k in a)
+    return False
+
+
+def _field_changes(old: Any, new: Any) -> Dict[str, Tuple[Any, Any]]:
+    if not (isinstance(old, Mapping) and isinstance(new, Mapping)):
+        return {"valor": (old, new)}
+    return {field: (old.get(field), new.get(field))
+            for field in list(old) + [f for f in new if f not in old]
+            if not _same(old.get(field), new.get(field))}
+
+
+def _stable_positions(sequence: List[int]) -> set:
+    """Índices da maior subsequência crescente (itens que não mudaram de ordem), O(n log n)"""
+    tails: List[int] = []
+    tails_index: List[int] = []
+    previous = [-1] * len(sequence)
+    for i, value in enumerate(sequence):
+        pos = bisect_left(tails, value)
+        if pos == len(tails):
+            tails.append(value)
+            tails_index.append(i)
+        else:
+            tails[pos] = value
+            tails_index[pos] = i
+        previous[i] = tails_index[pos - 1] if pos else -1
+
+    stable = set()
+    i = tails_index[-1] if tails_index else -1
+    while i >= 0:
+        stable.add(i)
+        i = previous[i]
+    return stable
+
+
+def diff_section(section: str, old: Sequence, new: Sequence) -> Dict[str, List]:
+    """Itens adicionados, removidos, alterados (por campo) e movidos de uma seção"""
+    old_index = index_items(section, old)
+    new_index = index_items(section, new)
+
+    removidos = [item for key, (_, item) in old_index.items() if key not in new_index]
+    adicionados = [item for key, (_, item) in new_index.items() if key not in old_index]
+
+    alterados = []
+    comuns = []
+    for key, (old_pos, old_item) in old_index.items():
+        entry = new_index.get(key)
+        if entry is None:
+            continue
+        new_pos, new_item = entry
+        comuns.append((old_pos, new_pos, key))
+        if not _same(old_item, new_item):
+            alterados.append({"id": key[0], "campos": _field_changes(old_item, new_item)})
+
+    comuns.sort()
+    stable = _stable_positions([new_pos for _, new_pos, _ in comuns])
+    movidos = [key[0] for i, (_, _, key) in enumerate(comuns) if i not in stable]
+
+    return {"adicionados": adicionados, "removidos": removidos, "alterados": alterados, "movidos": movidos}
+
+
+def diff_plans(old: Dict, new: Dict) -> Dict:
+    """Diff estrutural entre dois snapshots; seções sem mudanças ficam de fora"""
+    result = {}
+    if old.get("business_objective") != new.get("business_objective"):
+        result["business_objective"] = (old.get("business_objective"), new.get("business_objective"))
+
+    for section in SECTIONS:
+        changes = diff_section(section, old.get(section) or [], new.get(section) or [])
+        if any(changes.values()):
+            result[section] = changes
+    return result
+
+
+def _merge_value(base: Any, ours: Any, theirs: Any) -> Tuple[Any, bool]:
+    """Regra de três vias para um valor; retorna (valor, houve_conflito)"""
+    if _same(ours, theirs):
+        return ours, False
+    if _same(base, ours):
+        return theirs, False
+    if _same(base, theirs):
+        return ours, False
+    return ours, True
+
+
+_MISSING = object()
+
+
+def merge_section(section: str, base: Sequence, ours: Sequence, theirs: Sequence) -> Tuple[List, List[Dict]]:
+    """Merge de três vias de uma seção; a ordem segue 'nosso' com as inserções deles ancoradas"""
+    base_index = index_items(section, base)
+    ours_index = index_items(section, ours)
+    theirs_index = index_items(section, theirs)
+    conflitos = []
+
+    merged: Dict[Tuple[Hashable, int], Any] = {}
+    for key in list(ours_index) + [k for k in theirs_index if k not in ours_index]:
+        b = base_index[key][1] if key in base_index else _MISSING
+        o = ours_index[key][1] if key in ours_index else _MISSING
+        t = theirs_index[key][1] if key in theirs_index else _MISSING
+
+        if o is _MISSING or t is _MISSING:
+            present = t if o is _MISSING else o
+            if b is _MISSING:
+                merged[key] = present           # adicionado de um lado só
+            elif not _same(b, present):
+                # Removido de um lado e alterado do outro: mantém a versão alterada
+                conflitos.append({"secao": section, "id": key[0], "campo": None, "base": b,
+                                  "nosso": None if o is _MISSING else o,
+                                  "deles": None if t is _MISSING else t})
+                merged[key] = present
+            continue                            # removido de um lado, intacto do outro
+
+        if isinstance(o, Mapping) and isinstance(t, Mapping):
+            base_item = b if isinstance(b, Mapping) else {}
+            item = {}
+            for field in list(o) + [f for f in t if f not in o]:
+                value, conflito = _merge_value(base_item.get(field, _MISSING), o.get(field, _MISSING),
+                                               t.get(field, _MISSING))
+                if conflito:
+                    conflitos.append({"secao": section, "id": key[0], "campo": field,
+                                      "base": base_item.get(field), "nosso": o.get(field), "deles": t.get(field)})
+                if value is not _MISSING:
+                    item[field] = value
+            merged[key] = item
+        else:
+            value, conflito = _merge_value(b, o, t)
+            if conflito:
+                conflitos.append({"secao": section, "id": key[0], "campo": None,
+                                  "base": None if b is _MISSING else b, "nosso": o, "deles": t})
+            merged[key] = value
+
+    # Ordem: a de 'nosso'; itens só deles entram logo após o antecessor que tinham lá
+    order = [k for k in ours_index if k in merged]
+    position = {k: i for i, k in enumerate(order)}
+    inserts: Dict[Optional[Tuple], List] = {}
+    anchor = None
+    for key in theirs_index:
+        if key in position:
+            anchor = key
+        elif key in merged:
+            inserts.setdefault(anchor, []).append(key)
+
+    result = [merged[k] for k in inserts.get(None, [])]
+    for key in order:
+        result.append(merged[key])
+        result.extend(merged[k] for k in inserts.get(key, []))
+    return result, conflitos
+
+
+def merge_plans(base: Dict, ours: Dict, theirs: Dict) -> MergeResult:
+    """Merge de três vias entre dois planos derivados do mesmo snapshot base"""
+    conflitos = []
+    objective, conflito = _merge_value(base.get("business_objective"), ours.get("business_objective"),
+                                       theirs.get("business_objective"))
+    if conflito:
+        conflitos.append({"secao": "business_objective", "id": None, "campo": None,
+                          "base": base.get("business_objective"), "nosso": ours.get("business_objective"),
+                          "deles": theirs.get("business_objective")})
+
+    dados = {"business_objective": objective}
+    for section in SECTIONS:
+        dados[section], section_conflicts = merge_section(section, base.get(section) or [],
+                                                          ours.get(section) or [], theirs.get(section) or [])
+        conflitos.extend(section_conflicts)
+    return MergeResult(dados, conflitos)
+
+
+def load_snapshot(ref: str) -> Dict:
+    """Carrega um snapshot salvo por save_data: arquivo (JSON/msgpack/.direx) ou ref SQLite 'caminho#id'"""
+    path, _, snapshot_id = ref.rpartition("#")
+    if path and snapshot_id.isdigit():
+        return SQLiteStorage(path).load(ref)
+    if ref.endswith(".direx"):
+        return SectionedSnapshot(ref).load_all()
+    return import_json(ref)
+
+
+def print_diff(diff: Dict):
+    """Exibe o diff de forma resumida"""
+    if not diff:
+        print("✅ Nenhuma diferença.")
+        return
+
+    if "business_objective" in diff:
+        antes, depois = diff["business_objective"]
+        print(f"🎯 Objetivo: {antes} → {depois}")
+    for section in SECTIONS:
+        changes = diff.get(section)
+        if not changes:
+            continue
+        print(f"\n📂 {section}: +{len(changes['adicionados'])} -{len(changes['removidos'])} "
+              f"~{len(changes['alterados'])} ↕{len(changes['movidos'])}")
+        for item in changes["adicionados"][:20]:
+            print(f"   + {_item_key(section, item)}")
+        for item in changes["removidos"][:20]:
+            print(f"   - {_item_key(section, item)}")
+        for change in changes["alterados"][:20]:
+            print(f"   ~ {change['id']}: {', '.join(change['campos'])}")
+        ocultos = sum(max(0, len(changes[k]) - 20) for k in ("adicionados", "removidos", "alterados"))
+        if ocultos:
+            print(f"   ... e mais {ocultos} itens (use --json para ver tudo)")
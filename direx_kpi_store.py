@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+DIREX - Séries Temporais de KPIs
+Armazenamento colunar append-only por KPI com agregados incrementais por período.
+"""
+
+import hashlib
+import os
+import re
+import unicodedata
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from datetime import date, datetime
+from typing import Dict, List, Optional, Union
+
+RESOLUCOES = ("diaria", "semanal", "mensal", "trimestral")
+
+Timestamp = Union[datetime, date, float, int, None]
+
+
+def _bucket_key(resolucao: str, quando: datetime) -> int:
+    """Chave inteira e ordenável do período que contém `quando`"""
+    if resolucao == "diaria":
+        return quando.toordinal()
+    elif resolucao == "semanal":
+        return quando.toordinal() - quando.weekday()
+    elif resolucao == "mensal":
+        return quando.year * 12 + quando.month - 1
+    elif resolucao == "trimestral":
+        return quando.year * 4 + (quando.month - 1) // 3
+    raise ValueError(f"Resolução inválida: {resolucao} (use {', '.join(RESOLUCOES)})")
+
+
+def _bucket_label(resolucao: str, key: int) -> str:
+    """Rótulo legível do período"""
+    if resolucao in ("diaria", "semanal"):
+        return date.fromordinal(key).isoformat()
+    elif resolucao == "mensal":
+        return f"{key // 12}-{key % 12 + 1:02d}"
+    return f"{key // 4}-T{key % 4 + 1}"
+
+
+def _to_epoch(quando: Timestamp) -> float:
+    if quando is None:
+        return datetime.now().timestamp()
+    if isinstance(quando, datetime):
+        return quando.timestamp()
+    if isinstance(quando, date):
+        return datetime(quando.year, quando.month, quando.day).timestamp()
+    return float(quando)
+
+
+def slugify(nome: str) -> str:
+    """Nome legível e seguro para arquivo de um KPI (nomes diferentes podem coincidir)"""
+    ascii_name = unicodedata.normalize("NFKD", nome).encode("ascii", "ignore").decode("ascii")
+    return re.sub(r"[^a-z0-9]+", "_", ascii_name.lower()).strip("_") or "kpi"
+
+
+def series_filename(nome: str) -> str:
+    """Base dos arquivos da série: slug mais um hash curto do nome original, único por KPI"""
+    digest = hashlib.sha1(nome.encode("utf-8")).hexdigest()[:8]
+    return f"{slugify(nome)}-{digest}"
+
+
+def _check_resolucao(resolucao: str):
+    if resolucao not in RESOLUCOES:
+        raise ValueError(f"Resolução inválida: {resolucao} (use {', '.join(RESOLUCOES)})")
+
+
+class _Bucket:
+    """Agregado incremental de um período"""
+    __slots__ = ("contagem", "soma", "minimo", "maximo", "primeiro", "ultimo", "_t_primeiro", "_t_ultimo")
+
+    def __init__(self, t: float, valor: float):
+        self.contagem = 1
+        self.soma = valor
+        self.minimo = valor
+        self.maximo = valor
+        self.primeiro = valor
+        self.ultimo = valor
+        self._t_primeiro = t
+        self._t_ultimo = t
+
+    def add(self, t: float, valor: float):
+        self.contagem += 1
+        self.soma += valor
+        if valor < self.minimo:
+            self.minimo = valor
+        if valor > self.maximo:
+            self.maximo = valor
+        if t < self._t_primeiro:
+            self._t_primeiro, self.primeiro = t, valor
+        if t >= self._t_ultimo:
+            self._t_ultimo, self.ultimo = t, valor
+
+    @property
+    def media(self) -> float:
+        return self.soma / self.contagem
+
+
+class KPISeries:
+    """
+    Série de leituras de um KPI.
+    Timestamps e valores ficam em duas colunas array('d'); com `path`, cada leitura
+    também é anexada a arquivos binários <path>.ts / <path>.val. Os agregados de
+    cada resolução são atualizados a cada leitura, então consultas leem apenas
+    os períodos, nunca os valores brutos.
+    """
+
+    def __init__(self, nome: str, path: Optional[str] = None):
+        self.nome = nome
+        self.path = path
+        self.timestamps = array("d")
+        self.valores = array("d")
+        self._buckets: Dict[str, Dict[int, _Bucket]] = {r: {} for r in RESOLUCOES}
+        self._keys: Dict[str, List[int]] = {r: [] for r in RESOLUCOES}
+
+        if path and os.path.exists(path + ".ts"):
+            self._load()
+
+    def __len__(self) -> int:
+        return len(self.valores)
+
+    def _load(self):
+        """
+        Lê as colunas do disco e reconstrói os agregados uma única vez. Se uma
+        falha entre as duas gravações de append deixou as colunas com tamanhos
+        diferentes (ou um registro pela metade), os arquivos são cortados no
+        último par completo para que os próximos appends continuem alinhados.
+        """
+        if not os.path.exists(self.path + ".val"):
+            open(self.path + ".val", "wb").close()
+        with open(self.path + ".ts", "r+b") as f_ts, open(self.path + ".val", "r+b") as f_val:
+            count = min(os.fstat(f_ts.fileno()).st_size, os.fstat(f_val.fileno()).st_size) // 8
+            for f in (f_ts, f_val):
+                if os.fstat(f.fileno()).st_size != count * 8:
+                    f.truncate(count * 8)
+            self.timestamps.fromfile(f_ts, count)
+            self.valores.fromfile(f_val, count)
+        for t, valor in zip(self.timestamps, self.valores):
+            self._aggregate(t, valor)
+
+    def _aggregate(self, t: float, valor: float):
+        quando = datetime.fromtimestamp(t)
+        for resolucao in RESOLUCOES:
+            key = _bucket_key(resolucao, quando)
+            bucket = self._buckets[resolucao].get(key)
+            if bucket is None:
+                self._buckets[resolucao][key] = _Bucket(t, valor)
+                keys = self._keys[resolucao]
+                if not keys or key > keys[-1]:
+                    keys.append(key)
+                else:
+                    insort(keys, key)
+            else:
+                bucket.add(t, valor)
+
+    def append(self, valor: float, quando: Timestamp = None):
+        """Registra uma leitura (append-only)"""
+        t = _to_epoch(quando)
+        valor = float(valor)
+        self.timestamps.append(t)
+        self.valores.append(valor)
+        self._aggregate(t, valor)
+
+        if self.path:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path + ".ts", "ab") as f:
+                array("d", [t]).tofile(f)
+            with open(self.path + ".val", "ab") as f:
+                array("d", [valor]).tofile(f)
+
+    def aggregates(self, resolucao: str = "diaria", inicio: Timestamp = None,
+                   fim: Timestamp = None) -> List[Dict]:
+        """Agregados por período (contagem, média, mínimo, máximo, primeiro, último)"""
+        _check_resolucao(resolucao)
+        keys = self._keys[resolucao]
+        lo = 0 if inicio is None else bisect_left(keys, _bucket_key(resolucao, datetime.fromtimestamp(_to_epoch(inicio))))
+        hi = len(keys) if fim is None else bisect_right(keys, _bucket_key(resolucao, datetime.fromtimestamp(_to_epoch(fim))))
+
+        buckets = self._buckets[resolucao]
+        return [
+            {
+                "periodo": _bucket_label(resolucao, key),
+                "contagem": buckets[key].contagem,
+                "media": buckets[key].media,
+                "minimo": buckets[key].minimo,
+                "maximo": buckets[key].maximo,
+                "primeiro": buckets[key].primeiro,
+                "ultimo": buckets[key].ultimo
+            }
+            for key in keys[lo:hi]
+        ]
+
+    def rolling(self, resolucao: str = "diaria", janela: int = 7) -> Optional[Dict]:
+        """Média móvel, mínimo e máximo sobre os últimos `janela` períodos"""
+        _check_resolucao(resolucao)
+        keys = self._keys[resolucao][-janela:]
+        if not keys:
+            return None
+
+        buckets = [self._buckets[resolucao][k] for k in keys]
+        contagem = sum(b.contagem for b in buckets)
+        return {
+            "periodos": len(buckets),
+            "media_movel": sum(b.soma for b in buckets) / contagem,
+            "minimo": min(b.minimo for b in buckets),
+            "maximo": max(b.maximo for b in buckets)
+        }
+
+    def period_over_period(self, resolucao: str = "mensal") -> Optional[float]:
+        """Variação percentual da média do último período em relação ao anterior"""
+        _check_resolucao(resolucao)
+        keys = self._keys[resolucao]
+        if len(keys) < 2:
+            return None
+
+        anterior = self._buckets[resolucao][keys[-2]].media
+        atual = self._buckets[resolucao][keys[-1]].media
+        if anterior == 0:
+            return None
+        return (atual - anterior) / abs(anterior) * 100
+
+    def latest(self) -> Optional[float]:
+        """Valor da leitura mais recente"""
+        keys = self._keys["diaria"]
+        return self._buckets["diaria"][keys[-1]].ultimo if keys else None
+
+
+class KPIStore:
+    """
+    Conjunto de séries de KPIs persistidas em um diretório, uma por nome
+    (arquivos <slug>-<hash>.ts/.val; ver series_filename).
+    """
+
+    def __init__(self, data_dir: str = os.path.join("direx_data", "kpis")):
+        self.data_dir = data_dir
+        self._series: Dict[str, KPISeries] = {}
+
+    def series(self, nome: str) -> KPISeries:
+        """Série do KPI, carregada do disco na primeira utilização"""
+        series = self._series.get(nome)
+        if series is None:
+            path = os.path.join(self.data_dir, series_filename(nome))
+            self._adopt_legacy(nome, path)
+            series = KPISeries(nome, path)
+            self._series[nome] = series
+        return series
+
+    def _adopt_legacy(self, nome: str, path: str):
+        """Renomeia a série gravada só com o slug (formato anterior) para o nome com hash"""
+        legacy = os.path.join(self.data_dir, slugify(nome))
+        if os.path.exists(path + ".ts") or not os.path.exists(legacy + ".ts"):
+            return
+        for ext in (".ts", ".val"):
+            if os.path.exists(legacy + ext):
+                os.replace(legacy + ext, path + ext)
+
+    def record(self, nome: str, valor: float, quando: Timestamp = None) -> KPISeries:
+        """Registra uma leitura do KPI"""
+        series = self.series(nome)
+        series.append(valor, quando)
+        return series
+
+    def dashboard(self, nomes: List[str], resolucao: str = "mensal", janela: int = 3) -> List[Dict]:
+        """Resumo por KPI: último valor, janela móvel e variação entre períodos"""
+        resumo = []
+        for nome in nomes:
+            series = self.series(nome)
+            resumo.append({
+                "nome": nome,
+                "leituras": len(series),
+                "ultimo": series.latest(),
+                "janela": series.rolling(resolucao, janela),
+                "variacao_percentual": series.period_over_period(resolucao)
+            })
+        return resumo
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+DIREX - Métricas e Profiling
+Instrumentação opcional dos métodos públicos do DirexAgent e da persistência:
+contagem de chamadas, histogramas de latência, erros e bytes lidos/gravados,
+exportáveis em texto Prometheus ou JSON, e captura cProfile/pyinstrument por
+comando. Desligada, os métodos registrados ficam intactos (custo zero); ligue
+com DIREX_METRICS=1 ou enable().
+"""
+
+import functools
+import json
+import os
+import re
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from datetime import datetime
+from types import FunctionType
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+# Limites dos buckets de latência, em segundos (mesmos do cliente Prometheus)
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+PROFILERS = ("cprofile", "pyinstrument")
+
+
+class Histogram:
+    """Histograma cumulativo de latências com soma e contagem"""
+
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float):
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """Pares (le, contagem acumulada), terminando em +Inf"""
+        pares = []
+        acumulado = 0
+        for limite, n in zip(BUCKETS + (float("inf"),), self.counts):
+            acumulado += n
+            pares.append(("+Inf" if limite == float("inf") else repr(limite), acumulado))
+        return pares
+
+
+class MetricsRegistry:
+    """Métricas coletadas no processo; todas as operações são thread-safe"""
+
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self.histograms: Dict[str, Histogram] = {}
+        self.errors: Dict[Tuple[str, str], int] = {}
+        self.bytes: Dict[Tuple[str, str], int] = {}
+
+    def observe(self, funcao: str, seconds: float):
+        with self._lock:
+            histogram = self.histograms.get(funcao)
+            if histogram is None:
+                histogram = self.histograms[funcao] = Histogram()
+            histogram.observe(seconds)
+
+    def record_error(self, funcao: str, error: BaseException):
+        key = (funcao, type(error).__name__)
+        with self._lock:
+            self.errors[key] = self.errors.get(key, 0) + 1
+
+    def record_bytes(self, direcao: str, origem: str, n: int):
+        key = (direcao, origem)
+        with self._lock:
+            self.bytes[key] = self.bytes.get(key, 0) + n
+
+    def reset(self):
+        with self._lock:
+            self.histograms.clear()
+            self.errors.clear()
+            self.bytes.clear()
+
+    def to_json(self) -> Dict:
+        """Métricas como dict serializável"""
+        with self._lock:
+            return {
+                "chamadas": {
+                    funcao: {
+                        "contagem": h.count,
+                        "soma_s": h.total,
+                        "media_ms": h.total / h.count * 1000 if h.count else 0.0,
+                        "buckets": dict(h.cumulative())
+                    }
+                    for funcao, h in sorted(self.histograms.items())
+                },
+                "erros": [{"funcao": f, "tipo": t, "contagem": n} for (f, t), n in sorted(self.errors.items())],
+                "bytes": [{"direcao": d, "origem": o, "total": n} for (d, o), n in sorted(self.bytes.items())]
+            }
+
+    def to_prometheus(self) -> str:
+        """Métricas no formato de exposição em texto do Prometheus"""
+        with self._lock:
+            linhas = [
+                "# HELP direx_calls_total Chamadas por função",
+                "# TYPE direx_calls_total counter"
+            ]
+            for funcao, h in sorted(self.histograms.items()):
+                linhas.append(f'direx_calls_total{{funcao="{_escape(funcao)}"}} {h.count}')
+
+            linhas += [
+                "# HELP direx_call_duration_seconds Latência por função",
+                "# TYPE direx_call_duration_seconds histogram"
+            ]
+            for funcao, h in sorted(self.histograms.items()):
+                label = f'funcao="{_escape(funcao)}"'
+                for le, n in h.cumulative():
+                    linhas.append(f'direx_call_duration_seconds_bucket{{{label},le="{le}"}} {n}')
+                linhas.append(f"direx_call_duration_seconds_sum{{{label}}} {h.total!r}")
+                linhas.append(f"direx_call_duration_seconds_count{{{label}}} {h.count}")
+
+            linhas += [
+                "# HELP direx_errors_total Exceções por função e tipo",
+                "# TYPE direx_errors_total counter"
+            ]
+            for (funcao, tipo), n in sorted(self.errors.items()):
+                linhas.append(f'direx_errors_total{{funcao="{_escape(funcao)}",tipo="{_escape(tipo)}"}} {n}')
+
+            linhas += [
+                "# HELP direx_bytes_total Bytes lidos/gravados pela persistência",
+                "# TYPE direx_bytes_total counter"
+            ]
+            for (direcao, origem), n in sorted(self.bytes.items()):
+                linhas.append(f'direx_bytes_total{{direcao="{direcao}",origem="{_escape(origem)}"}} {n}')
+            return "\n".join(linhas) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+REGISTRY = MetricsRegistry()
+
+# Classes registradas com instrumented() e os métodos originais substituídos
+_TARGETS: List[Tuple[type, Tuple[str, ...]]] = []
+_ORIGINALS: Dict[Tuple[type, str], Callable] = {}
+
+# Captura de profiling por comando: (diretório, motor) ou None
+_PROFILE: Optional[Tuple[str, str]] = None
+
+
+def enabled() -> bool:
+    return REGISTRY.enabled
+
+
+def _wrap(cls: type, name: str):
+    if (cls, name) in _ORIGINALS:
+        return
+    original = cls.__dict__[name]
+    funcao = f"{cls.__name__}.{name}"
+
+    @functools.wraps(original)
+    def wrapper(*args, **kwargs):
+        inicio = time.perf_counter()
+        try:
+            return original(*args, **kwargs)
+        except Exception as e:
+            REGISTRY.record_error(funcao, e)
+            raise
+        finally:
+            REGISTRY.observe(funcao, time.perf_counter() - inicio)
+
+    _ORIGINALS[(cls, name)] = original
+    setattr(cls, name, wrapper)
+
+
+def instrumented(*methods: str, exclude: Tuple[str, ...] = ()):
+    """
+    Decorador de classe que registra `methods` (padrão: todos os métodos
+    públicos definidos na classe) para instrumentação. Os métodos só são
+    envolvidos enquanto as métricas estiverem ligadas.
+    """
+    def decorate(cls: type) -> type:
+        names = methods or tuple(
+            name for name, value in vars(cls).items()
+            if not name.startswith("_") and isinstance(value, FunctionType)
+        )
+        names = tuple(name for name in names if name not in exclude and name in vars(cls))
+        _TARGETS.append((cls, names))
+        if REGISTRY.enabled:
+            for name in names:
+                _wrap(cls, name)
+        return cls
+    return decorate
+
+
+def enable():
+    """Liga a coleta e instrumenta as classes registradas"""
+    REGISTRY.enabled = True
+    for cls, names in _TARGETS:
+        for name in names:
+            _wrap(cls, name)
+
+
+def disable():
+    """Desliga a coleta e restaura os métodos originais (as métricas coletadas são mantidas)"""
+    REGISTRY.enabled = False
+    for (cls, name), original in _ORIGINALS.items():
+        setattr(cls, name, original)
+    _ORIGINALS.clear()
+
+
+def record_bytes(direcao: str, origem: str, n: int):
+    """Contabiliza bytes de I/O ('leitura' ou 'escrita'); não faz nada com as métricas desligadas"""
+    if REGISTRY.enabled:
+        REGISTRY.record_bytes(direcao, origem, n)
+
+
+def configure_profiling(directory: Optional[str], engine: str = "cprofile"):
+    """Ativa (ou desativa, com None) a captura de um perfil por comando em `directory`"""
+    global _PROFILE
+    if directory is None:
+        _PROFILE = None
+        return
+    if engine not in PROFILERS:
+        raise ValueError(f"Profiler inválido: {engine} (use {', '.join(PROFILERS)})")
+    if engine == "pyinstrument":
+        # Importado só quando o profiling é ligado com ele
+        try:
+            import pyinstrument  # noqa: F401
+        except ImportError:
+            raise ValueError("Profiler pyinstrument requer o pacote pyinstrument") from None
+    os.makedirs(directory, exist_ok=True)
+    _PROFILE = (directory, engine)
+
+
+@contextmanager
+def profiled(nome: str, directory: str, engine: str = "cprofile") -> Iterator[str]:
+    """Grava o perfil do bloco em `directory` (.prof para cProfile, .html para pyinstrument)"""
+    slug = re.sub(r"[^\w.-]+", "_", nome)
+    base = os.path.join(directory, f"{slug}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}")
+
+    if engine == "pyinstrument":
+        import pyinstrument
+        profiler = pyinstrument.Profiler()
+        profiler.start()
+        try:
+            yield base + ".html"
+        finally:
+            profiler.stop()
+            with open(base + ".html", "w", encoding="utf-8") as f:
+                f.write(profiler.output_html())
+        return
+
+    import cProfile
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield base + ".prof"
+    finally:
+        profiler.disable()
+        profiler.dump_stats(base + ".prof")
+
+
+@contextmanager
+def command(nome: str, profile: bool = True) -> Iterator[None]:
+    """
+    Mede um comando (opção do menu ou subcomando) e, se configurado e
+    `profile` for verdadeiro, captura seu perfil. Com métricas e profiling
+    desligados só executa o bloco.
+    """
+    profile = _PROFILE if profile else None
+    if not REGISTRY.enabled and profile is None:
+        yield
+        return
+
+    inicio = time.perf_counter()
+    try:
+        if profile is None:
+            yield
+        else:
+            with profiled(nome, *profile):
+                yield
+    except Exception as e:
+        if REGISTRY.enabled:
+            REGISTRY.record_error(nome, e)
+        raise
+    finally:
+        if REGISTRY.enabled:
+            REGISTRY.observe(nome, time.perf_counter() - inicio)
+
+
+def export(filename: str) -> str:
+    """Grava as métricas em `filename`: JSON se terminar em .json, senão texto Prometheus"""
+    directory = os.path.dirname(filename)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(filename, "w", encoding="utf-8") as f:
+        if filename.endswith(".json"):
+            json.dump(REGISTRY.to_json(), f, indent=2, ensure_ascii=False)
+        else:
+            f.write(REGISTRY.to_prometheus())
+    return filename
+
+
+if os.environ.get("DIREX_METRICS", "").lower() not in ("", "0", "false", "no"):
+    REGISTRY.enabled = True
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+DIREX - Modelo Compacto
+Registros com __slots__ para OKRs, KPIs, fases, dias e tarefas, com valores
+categóricos internados em enums. Cada registro é um Mapping com as chaves do dict
+original (get, [], setdefault); == compara pelo formato do snapshot, então
+OKR.from_dict(d) == d. Não é um dict: para json.dumps, use to_dict().
+"""
+
+import sys
+from collections.abc import Mapping, MutableMapping
+from dataclasses import dataclass, fields
+from enum import Enum
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+class _ValueEnum(str, Enum):
+    """Enum textual que se exibe (str, f-strings, format) pelo valor, como o texto original"""
+
+    def __str__(self) -> str:
+        return self.value
+
+    def __format__(self, spec: str) -> str:
+        return format(self.value, spec)
+
+
+class Status(_ValueEnum):
+    ATIVO = "ativo"
+    PENDENTE = "pendente"
+    EM_ANDAMENTO = "em_andamento"
+    CONCLUIDO = "concluido"
+
+
+class TipoOKR(_ValueEnum):
+    PRINCIPAL = "principal"
+    SUPORTE = "suporte"
+
+
+class Categoria(_ValueEnum):
+    FINANCEIRO = "Financeiro"
+    COMERCIAL = "Comercial"
+    QUALIDADE = "Qualidade"
+    OPERACIONAL = "Operacional"
+
+
+class Frequencia(_ValueEnum):
+    DIARIA = "Diária"
+    SEMANAL = "Semanal"
+    MENSAL = "Mensal"
+    TRIMESTRAL = "Trimestral"
+
+
+# Valor dos campos ausentes do dict de origem (None é um valor válido do snapshot)
+_UNSET = type("_Unset", (), {"__repr__": lambda self: "<unset>", "__slots__": ()})()
+
+# Tuplas de textos compartilhadas entre registros (os textos vêm quase sempre dos templates)
+_SHARED_TUPLES: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+_SHARED_TUPLES_LIMIT = 4096
+
+
+def _intern(value: Any, freeze: bool = True) -> Any:
+    """Interna textos; listas de textos viram tuplas compartilhadas (freeze) ou listas de textos internados"""
+    if isinstance(value, str):
+        return sys.intern(value)
+    if isinstance(value, (list, tuple)) and value and all(isinstance(v, str) for v in value):
+        if not freeze:
+            return [sys.intern(v) for v in value]
+        key = tuple(value)
+        shared = _SHARED_TUPLES.get(key)
+        if shared is None:
+            shared = tuple(sys.intern(v) for v in key)
+            if len(_SHARED_TUPLES) < _SHARED_TUPLES_LIMIT:
+                _SHARED_TUPLES[shared] = shared
+        return shared
+    return value
+
+
+def _coerce(enum: type, value: Any) -> Any:
+    """Membro do enum quando o valor é conhecido; senão o texto internado"""
+    if isinstance(value, str):
+        return enum._value2member_map_.get(value) or sys.intern(value)
+    return value
+
+
+def _plain(value: Any) -> Any:
+    """Valor no formato do snapshot JSON"""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, tuple):
+        return list(value)
+    return value
+
+
+class _Record(MutableMapping):
+    """
+    Base dos registros: campos fixos em __slots__ e chaves desconhecidas em
+    `extras`. Campos que não vieram no dict de origem ficam com _UNSET e não
+    aparecem como chaves ([] levanta KeyError, get devolve o default), então o
+    registro tem exatamente as chaves do dict que o originou.
+    """
+
+    __slots__ = ()
+
+    _FIELDS: Tuple[str, ...] = ()
+    _REQUIRED: Tuple[str, ...] = ()
+    _OPTIONAL: Tuple[str, ...] = ()
+    _ENUMS: Dict[str, type] = {}
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._FIELDS:
+            value = getattr(self, key)
+            if value is not _UNSET:
+                return value
+        elif self.extras and key in self.extras:
+            return self.extras[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value: Any):
+        if key in self._FIELDS:
+            enum = self._ENUMS.get(key)
+            setattr(self, key, _coerce(enum, value) if enum else value)
+        else:
+            if self.extras is None:
+                self.extras = {}
+            self.extras[key] = value
+
+    def __delitem__(self, key: str):
+        if key in self._FIELDS and getattr(self, key) is not _UNSET:
+            setattr(self, key, _UNSET)
+        elif key not in self._FIELDS and self.extras and key in self.extras:
+            del self.extras[key]
+        else:
+            raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        for key in self._FIELDS:
+            if getattr(self, key) is not _UNSET:
+                yield key
+        if self.extras:
+            yield from self.extras
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({dict(self.items())!r})"
+
+    def __eq__(self, other) -> bool:
+        # Tuplas e enums internados comparam como as listas e textos do snapshot
+        if isinstance(other, _Record):
+            return self.to_dict() == other.to_dict()
+        if isinstance(other, Mapping):
+            return self.to_dict() == {key: _plain(value) for key, value in other.items()}
+        return NotImplemented
+
+    __hash__ = None
+
+    def to_dict(self) -> Dict:
+        """Dict no formato do snapshot JSON"""
+        return {key: _plain(self[key]) for key in self}
+
+    @classmethod
+    def from_dict(cls, data: Mapping) -> "_Record":
+        """Cria o registro a partir do dict do snapshot, internando textos e enums"""
+        values = {}
+        extras = None
+        for key, value in data.items():
+            if key in cls._FIELDS:
+                # Listas de campos opcionais continuam mutáveis (ex.: progresso_chave)
+                enum = cls._ENUMS.get(key)
+                values[key] = _coerce(enum, value) if enum else _intern(value, key in cls._REQUIRED)
+            else:
+                if extras is None:
+                    extras = {}
+                extras[key] = value
+        return cls(extras=extras, **values)
+
+
+def _record(cls):
+    """Gera o dataclass com slots (campos sem valor começam em _UNSET) e as tuplas de campos usadas pela base"""
+    for name in cls.__annotations__:
+        if name != "extras":
+            setattr(cls, name, _UNSET)
+    cls = dataclass(slots=True, eq=False, repr=False)(cls)
+    names = [f.name for f in fields(cls) if f.name != "extras"]
+    cls._FIELDS = tuple(names)
+    cls._OPTIONAL = tuple(n for n in names if n in cls.__dict__.get("_optional_fields", ()))
+    cls._REQUIRED = tuple(n for n in names if n not in cls._OPTIONAL)
+    return cls
+
+
+@_record
+class OKR(_Record):
+    _optional_fields = ("progresso_chave", "progresso")
+    _ENUMS = {"tipo": TipoOKR, "status": Status}
+
+    tipo: Any
+    objetivo: Optional[str]
+    resultados_chave: Tuple[str, ...]
+    periodo: Optional[str]
+    status: Any
+    progresso_chave: Optional[List[float]]
+    progresso: Optional[float]
+    extras: Optional[Dict] = None
+
+
+@_record
+class KPI(_Record):
+    _ENUMS = {"categoria": Categoria, "frequencia": Frequencia}
+
+    nome: Optional[str]
+    categoria: Any
+    meta: Optional[str]
+    atual: Optional[str]
+    frequencia: Any
+    responsavel: Optional[str]
+    extras: Optional[Dict] = None
+
+
+@_record
+class RoadmapPhase(_Record):
+    _optional_fields = ("entregas_agendadas", "atrasos")
+    _ENUMS = {"status": Status}
+
+    fase: Optional[str]
+    periodo: Optional[str]
+    objetivos: Tuple[str, ...]
+    entregas: Tuple[str, ...]
+    marcos: Tuple[str, ...]
+    status: Any
+    entregas_agendadas: Optional[List[str]]
+    atrasos: Optional[List[Dict]]
+    extras: Optional[Dict] = None
+
+
+@_record
+class WeeklyDay(_Record):
+    _optional_fields = ("carga_horas", "capacidade_horas", "alocacoes")
+    _ENUMS = {"status": Status}
+
+    dia: Optional[str]
+    tarefas_principais: Tuple[str, ...]
+    foco: Optional[str]
+    metricas: Tuple[str, ...]
+    status: Any
+    carga_horas: Optional[float]
+    capacidade_horas: Optional[float]
+    alocacoes: Optional[Dict[str, List[str]]]
+    extras: Optional[Dict] = None
+
+
+@_record
+class TaskRecord(_Record):
+    _optional_fields = ("id", "duracao", "dependencias", "responsavel", "fase", "status")
+    _ENUMS = {"status": Status}
+
+    tarefa: Optional[str]
+    id: Any
+    duracao: Optional[float]
+    dependencias: Optional[Tuple[str, ...]]
+    responsavel: Optional[str]
+    fase: Optional[str]
+    status: Any
+    extras: Optional[Dict] = None
+
+
+# Registro usado para cada seção do estado do DirexAgent
+SECTION_RECORDS = {
+    "okrs": OKR,
+    "kpis": KPI,
+    "roadmap": RoadmapPhase,
+    "weekly_plan": WeeklyDay,
+    "tasks": TaskRecord,
+}
+
+
+def compact_section(section: str, items: Iterable) -> List:
+    """Converte os itens de uma seção em registros (tarefas em texto viram strings internadas)"""
+    record = SECTION_RECORDS[section]
+    compact = []
+    for item in items:
+        if isinstance(item, _Record):
+            compact.append(item)
+        elif isinstance(item, Mapping):
+            compact.append(record.from_dict(item))
+        else:
+            compact.append(_intern(item))
+    return compact
+
+
+def expand_section(items: Iterable) -> List:
+    """Converte registros de volta para dicts no formato do snapshot"""
+    return [item.to_dict() if isinstance(item, _Record) else item for item in items]
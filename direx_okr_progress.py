@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+DIREX - Progresso de OKRs
+Árvore portfólio -> objetivo -> resultado-chave com consolidação incremental.
+"""
+
+from typing import Dict, Iterable, List, Optional
+
+
+def progress_from_values(atual: float, meta: float, inicial: float = 0.0) -> float:
+    """Converte uma medição em progresso 0-1 em relação à meta"""
+    if meta == inicial:
+        return 1.0 if atual >= meta else 0.0
+    return min(1.0, max(0.0, (atual - inicial) / (meta - inicial)))
+
+
+class _Node:
+    __slots__ = ("node_id", "parent", "peso", "progresso", "soma", "peso_filhos", "filhos")
+
+    def __init__(self, node_id: str, parent: Optional["_Node"], peso: float):
+        self.node_id = node_id
+        self.parent = parent
+        self.peso = peso
+        self.progresso = 0.0
+        self.soma = 0.0          # soma ponderada do progresso dos filhos
+        self.peso_filhos = 0.0   # soma dos pesos dos filhos
+        self.filhos = 0
+
+
+class ProgressTree:
+    """
+    Consolida o progresso de resultados-chave em objetivos e portfólios.
+    Cada nó interno guarda a soma ponderada do progresso dos filhos; atualizar um
+    resultado-chave propaga apenas a diferença pelos seus ancestrais (O(profundidade)).
+    """
+
+    def __init__(self):
+        self.nodes: Dict[str, _Node] = {}
+
+    def _add(self, node_id: str, parent_id: Optional[str], peso: float) -> _Node:
+        if node_id in self.nodes:
+            raise ValueError(f"Nó {node_id} já existe")
+        if peso <= 0:
+            raise ValueError("O peso deve ser maior que zero")
+
+        parent = None
+        if parent_id is not None:
+            parent = self.nodes.get(parent_id)
+            if parent is None:
+                raise KeyError(f"Nó pai {parent_id} não encontrado")
+
+        node = _Node(node_id, parent, float(peso))
+        self.nodes[node_id] = node
+        if parent is not None:
+            parent.filhos += 1
+            self._reweight(parent, peso, 0.0)
+        return node
+
+    def add_portfolio(self, portfolio_id: str):
+        """Adiciona um portfólio (raiz)"""
+        self._add(portfolio_id, None, 1.0)
+
+    def add_objective(self, objective_id: str, portfolio_id: Optional[str] = None, peso: float = 1.0):
+        """Adiciona um objetivo, opcionalmente dentro de um portfólio"""
+        self._add(objective_id, portfolio_id, peso)
+
+    def add_key_result(self, kr_id: str, objective_id: str, peso: float = 1.0, progresso: float = 0.0):
+        """Adiciona um resultado-chave a um objetivo"""
+        self._add(kr_id, objective_id, peso)
+        if progresso:
+            self.update(kr_id, progresso)
+
+    def _reweight(self, parent: _Node, delta_peso: float, delta_soma: float):
+        """Aplica uma variação de peso/soma em `parent` e propaga pelos ancestrais"""
+        node = parent
+        while node is not None:
+            antes = node.progresso
+            node.peso_filhos += delta_peso
+            node.soma += delta_soma
+            node.progresso = node.soma / node.peso_filhos if node.peso_filhos else 0.0
+            if node.parent is None:
+                break
+            # Só a diferença de contribuição sobe para o próximo nível
+            delta_peso = 0.0
+            delta_soma = node.peso * (node.progresso - antes)
+            if delta_soma == 0.0:
+                break
+            node = node.parent
+
+    def update(self, kr_id: str, progresso: float) -> float:
+        """Atualiza o progresso (0-1) de um resultado-chave; retorna o progresso do objetivo"""
+        node = self.nodes.get(kr_id)
+        if node is None:
+            raise KeyError(f"Resultado-chave {kr_id} não encontrado")
+        if node.filhos:
+            raise ValueError(f"{kr_id} não é um resultado-chave (possui filhos)")
+
+        progresso = min(1.0, max(0.0, float(progresso)))
+        delta = node.peso * (progresso - node.progresso)
+        node.progresso = progresso
+        if node.parent is not None and delta:
+            self._reweight(node.parent, 0.0, delta)
+        return node.parent.progresso if node.parent is not None else progresso
+
+    def progress(self, node_id: str) -> float:
+        """Progresso consolidado (0-1) de qualquer nó"""
+        node = self.nodes.get(node_id)
+        if node is None:
+            raise KeyError(f"Nó {node_id} não encontrado")
+        return node.progresso
+
+    def add_okrs(self, okrs: Iterable[Dict], portfolio_id: Optional[str] = None,
+                 prefix: str = "okr") -> List[str]:
+        """
+        Registra OKRs no formato do DirexAgent. Cada OKR vira `<prefix>-<i>` e seus
+        resultados-chave `<prefix>-<i>/kr-<j>`; progressos salvos em
+        `progresso_chave` são restaurados. Retorna os ids dos objetivos.
+        """
+        if portfolio_id is not None and portfolio_id not in self.nodes:
+            self.add_portfolio(portfolio_id)
+
+        ids = []
+        for i, okr in enumerate(okrs):
+            objective_id = f"{prefix}-{i}"
+            self.add_objective(objective_id, portfolio_id, okr.get("peso", 1.0))
+            salvos = okr.get("progresso_chave") or []
+            for j, _ in enumerate(okr.get("resultados_chave", [])):
+                progresso = salvos[j] if j < len(salvos) else 0.0
+                self.add_key_result(f"{objective_id}/kr-{j}", objective_id, progresso=progresso)
+            ids.append(objective_id)
+        return ids
@@ -0,0 +1,383 @@
+#!/usr/bin/env python3
+"""
+DIREX - Pool de Agentes
+Mantém um DirexAgent por tenant/sessão em um LRU limitado por memória
+estimada. Agentes removidos do pool são gravados (write-through) no backend
+de persistência da sessão e reidratados do snapshot mais recente no próximo
+acesso, de forma transparente para quem chama.
+"""
+
+import os
+import re
+import shutil
+import sys
+import threading
+from collections import OrderedDict
+from collections.abc import Mapping
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from direx_agent import DirexAgent
+from direx_storage import SECTIONS, QueuedStorage, SQLiteStorage
+
+KEY_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+# Orçamento padrão de memória dos agentes residentes
+DEFAULT_MEMORY_BUDGET = 256 * 1024 * 1024
+
+# Custo fixo aproximado de um agente vazio (objeto, backends, dicts internos)
+AGENT_OVERHEAD = 4096
+
+
+def _deep_size(value) -> int:
+    """Bytes de um valor e de tudo o que ele contém (dicts, registros, listas, tuplas)"""
+    size = sys.getsizeof(value)
+    if isinstance(value, Mapping):
+        for key, item in value.items():
+            size += sys.getsizeof(key) + _deep_size(item)
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(_deep_size(item) for item in value)
+    return size
+
+
+def estimate_size(agent: DirexAgent) -> int:
+    """
+    Estimativa em bytes do estado residente de um agente: listas, itens e
+    tudo o que eles contêm, inclusive os textos dentro de tuplas e registros.
+    Textos e tuplas compartilhados (internados) entre itens e agentes são
+    contados a cada ocorrência, então a estimativa erra para cima. Seções
+    ainda não carregadas (load_data com lazy=True) não contam.
+    """
+    size = AGENT_OVERHEAD
+    for section in SECTIONS:
+        items = agent.__dict__.get(section)
+        if items:
+            size += _deep_size(items)
+    return size
+
+
+class _Entry:
+    __slots__ = ("agent", "size", "dirty", "pins")
+
+    def __init__(self, agent: DirexAgent):
+        self.agent = agent
+        self.size = estimate_size(agent)
+        self.dirty = False
+        self.pins = 0
+
+
+class AgentPool:
+    """
+    LRU de agentes por chave (tenant ou sessão), um diretório de dados por
+    chave em `data_dir`. Quando a memória estimada passa de `memory_budget`
+    (ou o número de agentes passa de `max_agents`), os menos usados saem do
+    pool; os que têm alterações são salvos antes. Agentes em uso (acquire sem
+    release) nunca são removidos. Thread-safe.
+
+    A trava do pool só protege o LRU: carregar, salvar e apagar do disco
+    acontecem fora dela. Enquanto isso a chave fica em `_pending` e só quem
+    pede essa mesma chave espera; uma falha ao salvar um agente removido volta
+    com ele para o pool e é registrada, sem chegar a quem pediu outra chave.
+    """
+
+    def __init__(self, data_dir: str = os.path.join("direx_data", "sessions"),
+                 memory_budget: int = DEFAULT_MEMORY_BUDGET, max_agents: Optional[int] = None,
+                 compact: bool = True):
+        self.data_dir = data_dir
+        self.memory_budget = memory_budget
+        self.max_agents = max_agents
+        self.compact = compact
+        self.memory_used = 0
+        self.hits = 0
+        self.misses = 0
+        self.rehydrations = 0
+        self.evictions = 0
+        self.writes = 0
+        self.write_errors = 0
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        # Chaves sendo carregadas, salvas ao sair do pool ou apagadas (I/O fora da trava)
+        self._pending: Set[str] = set()
+        self._lock = threading.RLock()
+        self._cond = threading.Condition(self._lock)
+
+    def agent_dir(self, key: str) -> str:
+        if not KEY_PATTERN.match(key):
+            raise ValueError(f"Chave inválida: {key!r} (use letras, números, '-' ou '_')")
+        return os.path.join(self.data_dir, key)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def exists(self, key: str) -> bool:
+        """Se a chave está no pool ou tem estado salvo em disco"""
+        return key in self._entries or os.path.exists(os.path.join(self.agent_dir(key), "direx.db"))
+
+    def _load(self, key: str) -> DirexAgent:
+        """Cria o agente da chave, reidratado do último snapshot salvo se houver"""
+        directory = self.agent_dir(key)
+        # Salvamentos em rajada da mesma sessão viram uma única escrita
+        storage = QueuedStorage(SQLiteStorage(os.path.join(directory, "direx.db")))
+        agent = DirexAgent(storage=storage, data_dir=directory, verbose=False, index_search=False,
+                           compact=self.compact)
+        ref = agent.storage.latest_ref()
+        if ref is not None:
+            agent.apply_state(agent.storage.load(ref))
+            with self._lock:
+                self.rehydrations += 1
+        return agent
+
+    def _wait(self, key: str):
+        """Espera a chave sair de `_pending` (chamado com a trava; ela é liberada durante a espera)"""
+        self._cond.wait_for(lambda: key not in self._pending)
+
+    def _done(self, key: str):
+        with self._cond:
+            self._pending.discard(key)
+            self._cond.notify_all()
+
+    def _checkout(self, key: str, pin: bool) -> DirexAgent:
+        """Entrada da chave (carregada fora da trava se necessário), fixada se `pin`"""
+        self.agent_dir(key)
+        with self._cond:
+            self._wait(key)
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                if pin:
+                    entry.pins += 1
+                victims = self._take_victims()
+            else:
+                self.misses += 1
+                self._pending.add(key)
+
+        if entry is None:
+            try:
+                entry = _Entry(self._load(key))
+            except BaseException:
+                self._done(key)
+                raise
+            with self._cond:
+                self._entries[key] = entry
+                self.memory_used += entry.size
+                if pin:
+                    entry.pins += 1
+                self._pending.discard(key)
+                self._cond.notify_all()
+                victims = self._take_victims()
+
+        self._write_back(victims)
+        return entry.agent
+
+    def get(self, key: str) -> DirexAgent:
+        """
+        Agente da chave (reidratado se necessário). Sem acquire, o agente pode
+        sair do pool a qualquer momento: alterações feitas nele devem ser
+        sinalizadas com mark_dirty logo em seguida.
+        """
+        return self._checkout(key, pin=False)
+
+    def acquire(self, key: str) -> DirexAgent:
+        """Agente da chave, fixado no pool até o release correspondente"""
+        return self._checkout(key, pin=True)
+
+    def release(self, key: str, dirty: Optional[bool] = None):
+        """
+        Libera um agente obtido com acquire. `dirty` True/False marca se há
+        alterações a salvar (None mantém a marca atual); o tamanho é reestimado.
+        """
+        with self._lock:
+            entry = self._entries[key]
+            entry.pins -= 1
+            if dirty is not None:
+                entry.dirty = dirty
+            self._resize(entry)
+            victims = self._take_victims()
+        self._write_back(victims)
+
+    @contextmanager
+    def lease(self, key: str, dirty: bool = True) -> Iterator[DirexAgent]:
+        """acquire/release em um bloco with; por padrão o agente fica marcado como alterado"""
+        agent = self.acquire(key)
+        try:
+            yield agent
+        finally:
+            self.release(key, dirty)
+
+    def mark_dirty(self, key: str):
+        """Sinaliza alterações em um agente obtido com get (e reestima seu tamanho)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            entry.dirty = True
+            self._resize(entry)
+            victims = self._take_victims()
+        self._write_back(victims)
+
+    def _resize(self, entry: _Entry):
+        size = estimate_size(entry.agent)
+        self.memory_used += size - entry.size
+        entry.size = size
+
+    def _over_budget(self) -> bool:
+        if self.max_agents is not None and len(self._entries) > self.max_agents:
+            return True
+        return self.memory_used > self.memory_budget
+
+    def _take_victims(self) -> List[Tuple[str, _Entry]]:
+        """
+        Tira do pool os menos usados até caber no orçamento (o mais recente
+        sempre fica). Chamado com a trava; devolve os alterados, que ficam
+        pendentes até _write_back salvá-los.
+        """
+        victims = []
+        if not self._over_budget():
+            return victims
+        for key in list(self._entries)[:-1]:
+            entry = self._entries[key]
+            if entry.pins or key in self._pending:
+                continue
+            del self._entries[key]
+            self.memory_used -= entry.size
+            self.evictions += 1
+            if entry.dirty:
+                self._pending.add(key)
+                victims.append((key, entry))
+            if not self._over_budget():
+                break
+        return victims
+
+    def _save_out(self, key: str, entry: _Entry) -> Optional[Exception]:
+        """
+        Salva um agente já fora do pool (chave pendente). Se a gravação falhar,
+        o agente volta ao pool como o menos usado, ainda alterado, e a
+        exceção é devolvida.
+        """
+        try:
+            entry.agent.storage.save(entry.agent.to_dict())
+        except Exception as e:
+            with self._cond:
+                self.write_errors += 1
+                self._entries[key] = entry
+                self._entries.move_to_end(key, last=False)
+                self.memory_used += entry.size
+                self._pending.discard(key)
+                self._cond.notify_all()
+            return e
+
+        with self._cond:
+            self.writes += 1
+            self._pending.discard(key)
+            self._cond.notify_all()
+        return None
+
+    def _write_back(self, victims: List[Tuple[str, _Entry]]):
+        """Salva os agentes removidos pelo orçamento; falhas são registradas, não propagadas"""
+        for key, entry in victims:
+            error = self._save_out(key, entry)
+            if error is not None:
+                print(f"⚠️ Falha ao salvar o agente {key} removido do pool (mantido em memória): {error}",
+                      file=sys.stderr)
+
+    def discard(self, key: str, save: bool = True):
+        """Tira a chave do pool, salvando antes se houver alterações (e `save`)"""
+        with self._cond:
+            self._wait(key)
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            if entry.pins:
+                raise RuntimeError(f"Agente {key} está em uso")
+            del self._entries[key]
+            self.memory_used -= entry.size
+            if not (save and entry.dirty):
+                return
+            self._pending.add(key)
+
+        error = self._save_out(key, entry)
+        if error is not None:
+            raise error
+
+    def delete(self, key: str) -> bool:
+        """Tira a chave do pool sem salvar e apaga o estado em disco; retorna se ela existia"""
+        directory = self.agent_dir(key)
+        with self._cond:
+            self._wait(key)
+            entry = self._entries.get(key)
+            if entry is not None and entry.pins:
+                raise RuntimeError(f"Agente {key} está em uso")
+            existed = entry is not None
+            if entry is not None:
+                del self._entries[key]
+                self.memory_used -= entry.size
+            self._pending.add(key)
+
+        try:
+            existed = os.path.exists(os.path.join(directory, "direx.db")) or existed
+            shutil.rmtree(directory, ignore_errors=True)
+        finally:
+            self._done(key)
+        return existed
+
+    def flush(self) -> int:
+        """
+        Salva todos os agentes com alterações, mantendo-os no pool; retorna
+        quantos. O estado é copiado com a trava e gravado fora dela; se alguma
+        gravação falhar, o agente continua marcado como alterado e a primeira
+        exceção é levantada depois de tentar os demais.
+        """
+        with self._cond:
+            pending = []
+            for key, entry in self._entries.items():
+                if entry.dirty and key not in self._pending:
+                    pending.append((key, entry, entry.agent.to_dict()))
+                    entry.dirty = False
+                    self._pending.add(key)
+
+        saved = 0
+        first_error = None
+        for key, entry, data in pending:
+            try:
+                entry.agent.storage.save(data)
+                saved += 1
+            except Exception as e:
+                with self._lock:
+                    entry.dirty = True
+                    self.write_errors += 1
+                first_error = first_error or e
+            finally:
+                self._done(key)
+
+        with self._lock:
+            self.writes += saved
+        if first_error is not None:
+            raise first_error
+        return saved
+
+    def close(self):
+        """Salva os agentes alterados e esvazia o pool"""
+        self.flush()
+        with self._lock:
+            self._entries.clear()
+            self.memory_used = 0
+
+    def stats(self) -> Dict:
+        """Contadores do pool"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "agentes": len(self._entries),
+                "memoria_estimada": self.memory_used,
+                "orcamento_memoria": self.memory_budget,
+                "acertos": self.hits,
+                "faltas": self.misses,
+                "taxa_acerto": self.hits / total if total else 0.0,
+                "reidratacoes": self.rehydrations,
+                "remocoes": self.evictions,
+                "gravacoes": self.writes,
+                "erros_gravacao": self.write_errors
+            }
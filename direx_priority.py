@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+DIREX - Priorização em Lote
+Pontua tarefas por impacto x esforço sem interação, a partir de CSV ou JSONL.
+"""
+
+import csv
+import heapq
+import json
+import sys
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+# NumPy é opcional (sem ele usamos heapq puro) e só é importado no primeiro lote
+_np = None
+
+
+def _numpy():
+    global _np
+    if _np is None:
+        try:
+            import numpy
+            _np = numpy
+        except ImportError:
+            _np = False
+    return _np or None
+
+# Limiares dos níveis de prioridade (score mínimo, nível), do maior para o menor
+PRIORITY_LEVELS = ((15, "CRÍTICA"), (10, "ALTA"), (5, "MÉDIA"))
+DEFAULT_LEVEL = "BAIXA"
+
+
+def priority_score(impacto: int, esforco: int) -> int:
+    """Fórmula de prioridade: 2x impacto - esforço"""
+    return (impacto * 2) - esforco
+
+
+def priority_level(score: int) -> str:
+    """Converte score em nível de prioridade"""
+    for threshold, level in PRIORITY_LEVELS:
+        if score >= threshold:
+            return level
+    return DEFAULT_LEVEL
+
+
+def _validate(row: int, impacto: int, esforco: int):
+    if not (1 <= impacto <= 10 and 1 <= esforco <= 10):
+        raise ValueError(f"Linha {row}: impacto e esforço devem estar entre 1 e 10")
+
+
+class TaskReader:
+    """
+    Itera tuplas (tarefa, impacto, esforço) de um stream CSV (com cabeçalho) ou
+    JSONL. Com strict=False, linhas malformadas (JSON inválido, coluna ausente
+    ou valor não inteiro) são puladas e contadas em `malformadas`, para que uma
+    linha ruim não interrompa um feed contínuo; com strict=True levantam
+    ValueError indicando a linha. `linha` é o número da última linha entregue.
+    """
+
+    def __init__(self, stream: TextIO, fmt: str = "csv", task_col: str = "tarefa",
+                 impact_col: str = "impacto", effort_col: str = "esforco", strict: bool = False):
+        if fmt not in ("csv", "jsonl"):
+            raise ValueError(f"Formato desconhecido: {fmt}")
+        self.stream = stream
+        self.fmt = fmt
+        self.columns = (task_col, impact_col, effort_col)
+        self.strict = strict
+        self.malformadas = 0
+        self.linha = 0
+
+    def _rows(self) -> Iterator[Tuple[int, object]]:
+        """Pares (número da linha, registro); JSON inválido vira o próprio erro"""
+        if self.fmt == "csv":
+            # Linha 1 é o cabeçalho
+            yield from enumerate(csv.DictReader(self.stream), 2)
+            return
+        for number, line in enumerate(self.stream, 1):
+            if not line.strip():
+                continue
+            try:
+                yield number, json.loads(line)
+            except ValueError as e:
+                yield number, e
+
+    def __iter__(self) -> Iterator[Tuple[str, int, int]]:
+        task_col, impact_col, effort_col = self.columns
+        for number, row in self._rows():
+            try:
+                if isinstance(row, ValueError):
+                    raise ValueError(f"JSON inválido ({row})")
+                task = row[task_col]
+                if task is None:
+                    raise KeyError(task_col)
+                parsed = task, int(row[impact_col]), int(row[effort_col])
+                self.linha = number
+                yield parsed
+            except KeyError as e:
+                self._reject(number, f"Coluna ausente: {e}")
+            except (TypeError, ValueError) as e:
+                self._reject(number, str(e))
+
+    def _reject(self, number: int, motivo: str):
+        if self.strict:
+            raise ValueError(f"Linha {number}: {motivo}") from None
+        self.malformadas += 1
+
+
+def read_tasks(stream: TextIO, fmt: str = "csv", task_col: str = "tarefa",
+               impact_col: str = "impacto", effort_col: str = "esforco", strict: bool = False) -> TaskReader:
+    """Lê tuplas (tarefa, impacto, esforço) de um stream CSV (com cabeçalho) ou JSONL (ver TaskReader)"""
+    return TaskReader(stream, fmt, task_col, impact_col, effort_col, strict)
+
+
+def prioritize_batch(tasks: Iterable[Tuple[str, int, int]],
+                     top_k: Optional[int] = None) -> List[Tuple[str, str, int]]:
+    """
+    Prioriza tarefas (tarefa, impacto, esforço) sem interação.
+    Retorna [(tarefa, nível, score)] na mesma ordem que prioritize_tasks produziria
+    (score decrescente, empates na ordem de entrada), limitado a `top_k` itens.
+    """
+    names: List[str] = []
+    impacts: List[int] = []
+    efforts: List[int] = []
+    for name, impacto, esforco in tasks:
+        names.append(name)
+        impacts.append(impacto)
+        efforts.append(esforco)
+
+    n = len(names)
+    if n == 0:
+        return []
+    k = n if top_k is None else max(0, min(top_k, n))
+
+    if _numpy() is not None:
+        return _prioritize_numpy(names, impacts, efforts, k)
+
+    scores = []
+    for row, (impacto, esforco) in enumerate(zip(impacts, efforts), 1):
+        _validate(row, impacto, esforco)
+        scores.append(priority_score(impacto, esforco))
+
+    # Chave (score, -índice) reproduz a ordenação estável do modo interativo
+    order = heapq.nlargest(k, range(n), key=lambda i: (scores[i], -i))
+    return [(names[i], priority_level(scores[i]), scores[i]) for i in order]
+
+
+def _prioritize_numpy(names: List[str], impacts: List[int], efforts: List[int], k: int) -> List[Tuple[str, str, int]]:
+    """Caminho vetorizado: scores, níveis e seleção parcial do top-k em arrays"""
+    np = _numpy()
+    impacto = np.asarray(impacts, dtype=np.int64)
+    esforco = np.asarray(efforts, dtype=np.int64)
+
+    invalid = (impacto < 1) | (impacto > 10) | (esforco < 1) | (esforco > 10)
+    if invalid.any():
+        row = int(np.argmax(invalid))
+        _validate(row + 1, int(impacto[row]), int(esforco[row]))
+
+    n = len(names)
+    scores = impacto * 2 - esforco
+
+    # Chave única: score desempatado pela ordem de entrada (primeiro vence)
+    key = scores * n + (n - 1 - np.arange(n, dtype=np.int64))
+    if k < n:
+        selected = np.argpartition(-key, k - 1)[:k] if k else np.empty(0, dtype=np.int64)
+        order = selected[np.argsort(-key[selected])]
+    else:
+        order = np.argsort(-key)
+
+    thresholds = np.array(sorted(t for t, _ in PRIORITY_LEVELS))
+    labels = np.array([DEFAULT_LEVEL] + [level for _, level in sorted(PRIORITY_LEVELS)], dtype=object)
+    levels = labels[np.searchsorted(thresholds, scores[order], side="right")]
+
+    return [(names[i], level, int(score)) for i, level, score in zip(order.tolist(), levels, scores[order].tolist())]
+
+
+class StreamingPrioritizer:
+    """
+    Mantém o top-k corrente de um feed ilimitado de tarefas.
+    Usa um heap mínimo limitado a k entradas, então a memória não depende
+    do tamanho do feed. `processadas` conta só as tarefas aceitas; `lidas`
+    conta todas as recebidas, inclusive as rejeitadas.
+    """
+
+    def __init__(self, k: int):
+        if k < 1:
+            raise ValueError("k deve ser maior que zero")
+        self.k = k
+        self.processadas = 0
+        self.rejeitadas = 0
+        self.lidas = 0
+        self._heap: List[Tuple[int, int, str]] = []
+
+    def push(self, task: str, impacto: int, esforco: int, linha: Optional[int] = None):
+        """
+        Pontua uma tarefa e a mantém se entrar no top-k. `linha` é o número da
+        linha na entrada, usado na mensagem de erro (padrão: ordem de chegada).
+        """
+        self.lidas += 1
+        try:
+            _validate(linha or self.lidas, impacto, esforco)
+        except ValueError:
+            self.rejeitadas += 1
+            raise
+        self.processadas += 1
+
+        # -seq faz o empate favorecer a tarefa que chegou primeiro
+        entry = (priority_score(impacto, esforco), -self.lidas, task)
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+        elif entry > self._heap[0]:
+            heapq.heapreplace(self._heap, entry)
+
+    def ranking(self) -> List[Tuple[str, str, int]]:
+        """Retorna o top-k atual ordenado como em prioritize_tasks"""
+        return [(task, priority_level(score), score) for score, _, task in sorted(self._heap, reverse=True)]
+
+
+def stream_prioritize(tasks: Iterable[Tuple[str, int, int]], k: int, every: int = 1000,
+                      prioritizer: Optional[StreamingPrioritizer] = None
+                      ) -> Iterator[Tuple[int, List[Tuple[str, str, int]]]]:
+    """
+    Consome tarefas de um iterador (stdin, arquivo, fila) e emite
+    (tarefas processadas, ranking top-k) a cada `every` tarefas e ao final.
+    Tarefas com impacto/esforço fora de 1-10 são contadas em
+    `prioritizer.rejeitadas` e ignoradas.
+    """
+    prioritizer = prioritizer or StreamingPrioritizer(k)
+    emitted_at = 0
+
+    for task, impacto, esforco in tasks:
+        try:
+            prioritizer.push(task, impacto, esforco, getattr(tasks, "linha", None))
+        except ValueError:
+            pass
+        if prioritizer.processadas - emitted_at >= every:
+            emitted_at = prioritizer.processadas
+            yield emitted_at, prioritizer.ranking()
+
+    if prioritizer.processadas != emitted_at or emitted_at == 0:
+        yield prioritizer.processadas, prioritizer.ranking()
+
+
+def print_ranking(prioritized: List[Tuple[str, str, int]], out: Optional[TextIO] = None):
+    """Imprime o ranking no mesmo formato do modo interativo"""
+    out = out or sys.stdout
+    for i, (task, nivel, score) in enumerate(prioritized, 1):
+        out.write(f"   {i}. [{nivel}] {task} (Score: {score})\n")
+
+
+def write_jsonl(prioritized: List[Tuple[str, str, int]], out: TextIO):
+    """Grava o ranking como JSONL"""
+    for posicao, (task, nivel, score) in enumerate(prioritized, 1):
+        out.write(json.dumps({"posicao": posicao, "tarefa": task, "nivel": nivel, "score": score},
+                             ensure_ascii=False) + "\n")
@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+"""
+DIREX - Retenção de Snapshots
+Políticas de retenção para direx_data/ (arquivos de snapshot e o banco direx.db),
+arquivamento dos snapshots antigos em segmentos comprimidos e deduplicados, e
+coleta de lixo do arquivo.
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+from contextlib import closing
+from datetime import datetime
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set
+
+from direx_serializers import SNAPSHOT_EXTENSIONS, available_compressions, compress, decode
+from direx_storage import BUSY_TIMEOUT, SECTIONS, SQLiteStorage, SectionedSnapshot, empty_state, import_json
+
+# direx_data_<timestamp>[_<seq>] ou direx_snapshot_<timestamp>_<seq>.direx: o ID completo identifica o snapshot
+SNAPSHOT_PATTERN = re.compile(r"^direx_(?:data|snapshot)_(\d{8}_\d{6}(?:_\d+)?)")
+DB_TIMESTAMP_PATTERN = re.compile(r"^\d{8}_\d{6}$")
+TIMESTAMP_FORMAT = "%Y%m%d_%H%M%S"
+SEGMENT_PATTERN = re.compile(r"^segment_(\d+)\.pack$")
+
+# Tamanho a partir do qual um novo segmento é aberto
+SEGMENT_SIZE = 16 * 1024 * 1024
+
+
+class RetentionPolicy(NamedTuple):
+    """
+    Quantos snapshots manter: os `keep_last` mais recentes ficam no diretório;
+    o mais recente de cada uma das últimas `hourly` horas, `daily` dias e
+    `weekly` semanas vai para o arquivo; os demais são descartados.
+    """
+    keep_last: int = 10
+    hourly: int = 24
+    daily: int = 30
+    weekly: int = 52
+
+    def select(self, timestamps: Iterable[str]) -> Dict[str, Set[str]]:
+        """Classifica IDs (%Y%m%d_%H%M%S[_seq]) em 'manter', 'arquivar' e 'descartar'"""
+        ordered = sorted(set(timestamps), reverse=True)
+        manter = set(ordered[:self.keep_last])
+
+        arquivar = set()
+        for count, bucket in ((self.hourly, lambda t: t[:11]),
+                              (self.daily, lambda t: t[:8]),
+                              (self.weekly, _iso_week)):
+            seen = set()
+            for ts in ordered:
+                if len(seen) >= count:
+                    break
+                key = bucket(ts)
+                if key not in seen:
+                    seen.add(key)
+                    arquivar.add(ts)
+
+        arquivar -= manter
+        return {"manter": manter, "arquivar": arquivar, "descartar": set(ordered) - manter - arquivar}
+
+
+def _iso_week(timestamp: str) -> str:
+    year, week, _ = datetime.strptime(timestamp[:15], TIMESTAMP_FORMAT).isocalendar()
+    return f"{year}-{week:02d}"
+
+
+def _upper_bound(timestamp: str) -> str:
+    """Maior ID possível para um timestamp, incluindo snapshots do mesmo segundo com sequência"""
+    return timestamp + "_~" if len(timestamp) == 15 else timestamp
+
+
+def snapshot_files(data_dir: str) -> Dict[str, str]:
+    """Snapshots direx_data_* e direx_snapshot_*.direx do diretório, por timestamp"""
+    if not os.path.isdir(data_dir):
+        return {}
+
+    files = {}
+    for name in os.listdir(data_dir):
+        match = SNAPSHOT_PATTERN.match(name)
+        if match and name.endswith(SNAPSHOT_EXTENSIONS + (".direx",)):
+            files.setdefault(match.group(1), os.path.join(data_dir, name))
+    return files
+
+
+def load_snapshot_file(path: str) -> Dict:
+    """Lê um snapshot do diretório em qualquer formato salvo pelos backends de arquivo"""
+    if path.endswith(".direx"):
+        return SectionedSnapshot(path).load_all()
+    return import_json(path)
+
+
+def _file_size(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except FileNotFoundError:
+        return 0
+
+
+class SnapshotArchive:
+    """
+    Arquivo de snapshots em segmentos append-only.
+    Cada seção é gravada uma única vez por conteúdo (hash SHA-256) como bloco
+    comprimido; um snapshot arquivado é só um manifesto {seção: hash}. O índice
+    SQLite tem o timestamp como chave primária, então buscar um snapshot é uma
+    descida na B-tree (O(log n)).
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS chunks (
+            hash TEXT PRIMARY KEY,
+            segment INTEGER NOT NULL,
+            offset INTEGER NOT NULL,
+            length INTEGER NOT NULL
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS archived (
+            timestamp TEXT PRIMARY KEY,
+            business_objective TEXT,
+            manifest TEXT NOT NULL
+        ) WITHOUT ROWID;
+    """
+
+    def __init__(self, archive_dir: str = os.path.join("direx_data", "archive"),
+                 compressao: Optional[str] = None, segment_size: int = SEGMENT_SIZE):
+        self.archive_dir = archive_dir
+        self.db_path = os.path.join(archive_dir, "index.db")
+        self.compressao = compressao or available_compressions()[-1]
+        self.segment_size = segment_size
+        self._schema_ready = False
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        os.makedirs(self.archive_dir, exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=BUSY_TIMEOUT)
+        if not self._schema_ready:
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.executescript(self.SCHEMA)
+            self._schema_ready = True
+        return conn
+
+    def _segment_path(self, segment: int) -> str:
+        return os.path.join(self.archive_dir, f"segment_{segment:06d}.pack")
+
+    def _current_segment(self, conn: sqlite3.Connection) -> int:
+        segment = conn.execute("SELECT MAX(segment) FROM chunks").fetchone()[0] or 1
+        path = self._segment_path(segment)
+        if os.path.exists(path) and os.path.getsize(path) >= self.segment_size:
+            segment += 1
+        return segment
+
+    def add(self, data: Dict, timestamp: Optional[str] = None) -> int:
+        """Arquiva um snapshot sob `timestamp` (ID do arquivo); retorna os bytes novos gravados"""
+        timestamp = timestamp or data.get("timestamp") or datetime.now().strftime(TIMESTAMP_FORMAT)
+        with self._lock, closing(self._connect()) as conn, conn:
+            segment = self._current_segment(conn)
+            manifest = {}
+            novos = 0
+            with open(self._segment_path(segment), "ab") as f:
+                for section in SECTIONS:
+                    raw = json.dumps(data.get(section) or [], ensure_ascii=False,
+                                     separators=(",", ":")).encode("utf-8")
+                    digest = hashlib.sha256(raw).hexdigest()
+                    manifest[section] = digest
+                    if conn.execute("SELECT 1 FROM chunks WHERE hash = ?", (digest,)).fetchone():
+                        continue
+
+                    blob = compress(raw, self.compressao)
+                    offset = f.tell()
+                    f.write(blob)
+                    conn.execute("INSERT INTO chunks (hash, segment, offset, length) VALUES (?, ?, ?, ?)",
+                                 (digest, segment, offset, len(blob)))
+                    novos += len(blob)
+                f.flush()
+                os.fsync(f.fileno())
+
+            conn.execute("INSERT OR REPLACE INTO archived (timestamp, business_objective, manifest) VALUES (?, ?, ?)",
+                         (timestamp, data.get("business_objective"), json.dumps(manifest)))
+        return novos
+
+    def _read_chunk(self, conn: sqlite3.Connection, digest: str) -> List:
+        segment, offset, length = conn.execute(
+            "SELECT segment, offset, length FROM chunks WHERE hash = ?", (digest,)
+        ).fetchone()
+        with open(self._segment_path(segment), "rb") as f:
+            f.seek(offset)
+            return decode(f.read(length))
+
+    def fetch(self, timestamp: str, exact: bool = False) -> Optional[Dict]:
+        """
+        Snapshot arquivado em `timestamp` ou, se exact=False, o mais recente
+        anterior a ele. Retorna None se não houver.
+        """
+        if not os.path.exists(self.db_path):
+            return None
+
+        query = ("SELECT timestamp, business_objective, manifest FROM archived WHERE timestamp = ?" if exact else
+                 "SELECT timestamp, business_objective, manifest FROM archived WHERE timestamp <= ? "
+                 "ORDER BY timestamp DESC LIMIT 1")
+        with closing(self._connect()) as conn:
+            row = conn.execute(query, (timestamp if exact else _upper_bound(timestamp),)).fetchone()
+            if row is None:
+                return None
+
+            state = empty_state()
+            state["business_objective"] = row[1]
+            state["timestamp"] = row[0]
+            for section, digest in json.loads(row[2]).items():
+                state[section] = self._read_chunk(conn, digest)
+        return state
+
+    def timestamps(self) -> List[str]:
+        """Timestamps arquivados, do mais antigo ao mais recente"""
+        if not os.path.exists(self.db_path):
+            return []
+        with closing(self._connect()) as conn:
+            return [ts for (ts,) in conn.execute("SELECT timestamp FROM archived ORDER BY timestamp")]
+
+    def remove(self, timestamps: Iterable[str]) -> int:
+        """Remove snapshots do índice (os blocos órfãos saem na próxima coleta)"""
+        with self._lock, closing(self._connect()) as conn, conn:
+            return conn.executemany("DELETE FROM archived WHERE timestamp = ?",
+                                    ((ts,) for ts in timestamps)).rowcount
+
+    def _segment_files(self) -> Dict[int, str]:
+        """Segmentos presentes no diretório, por número"""
+        files = {}
+        for name in os.listdir(self.archive_dir):
+            match = SEGMENT_PATTERN.match(name)
+            if match:
+                files[int(match.group(1))] = os.path.join(self.archive_dir, name)
+        return files
+
+    def collect_garbage(self, min_garbage: float = 0.5) -> int:
+        """
+        Reescreve os segmentos em que blocos sem referência ocupam mais de
+        `min_garbage` do arquivo. Retorna os bytes liberados.
+
+        Os blocos vivos vão para um segmento com número novo; os offsets passam
+        a apontar para ele em uma transação e só depois do commit o segmento
+        antigo é apagado. Uma falha no meio deixa no máximo um arquivo órfão,
+        removido na coleta seguinte, e nunca um índice apontando para dados errados.
+        """
+        with self._lock, closing(self._connect()) as conn:
+            referenced = set()
+            for (manifest,) in conn.execute("SELECT manifest FROM archived"):
+                referenced.update(json.loads(manifest).values())
+
+            liberados = 0
+            segments = [s for (s,) in conn.execute("SELECT DISTINCT segment FROM chunks")]
+            proximo = max([*segments, *self._segment_files()], default=0) + 1
+            for segment in segments:
+                rows = conn.execute("SELECT hash, offset, length FROM chunks WHERE segment = ? ORDER BY offset",
+                                    (segment,)).fetchall()
+                vivos = [r for r in rows if r[0] in referenced]
+                path = self._segment_path(segment)
+                total = os.path.getsize(path)
+                lixo = total - sum(r[2] for r in vivos)
+                if not total or lixo / total < min_garbage:
+                    continue
+
+                novas_posicoes = []
+                if vivos:
+                    novo = proximo
+                    proximo += 1
+                    with open(path, "rb") as src, open(self._segment_path(novo), "wb") as dst:
+                        for digest, offset, length in vivos:
+                            src.seek(offset)
+                            novas_posicoes.append((novo, dst.tell(), digest))
+                            dst.write(src.read(length))
+                        dst.flush()
+                        os.fsync(dst.fileno())
+
+                with conn:
+                    conn.executemany("DELETE FROM chunks WHERE hash = ?",
+                                     ((r[0],) for r in rows if r[0] not in referenced))
+                    conn.executemany("UPDATE chunks SET segment = ?, offset = ? WHERE hash = ?", novas_posicoes)
+                os.remove(path)
+                liberados += lixo
+
+            # Órfãos de coletas interrompidas: segmentos sem blocos anteriores ao atual
+            ativos = {s for (s,) in conn.execute("SELECT DISTINCT segment FROM chunks")}
+            atual = max(ativos, default=0)
+            for segment, path in self._segment_files().items():
+                if segment not in ativos and segment < atual:
+                    liberados += _file_size(path)
+                    os.remove(path)
+        return liberados
+
+
+class RetentionManager:
+    """
+    Aplica a política aos snapshots locais (arquivos do diretório e linhas de
+    direx.db): mantém os recentes, arquiva os representantes por
+    hora/dia/semana e apaga o restante. Linhas do banco recebem o ID
+    <timestamp>_<id>, no mesmo formato dos arquivos. O próprio arquivo também é
+    podado pela política, e os segmentos são compactados na sequência.
+    """
+
+    def __init__(self, data_dir: str = "direx_data", policy: Optional[RetentionPolicy] = None,
+                 archive: Optional[SnapshotArchive] = None):
+        self.data_dir = data_dir
+        self.policy = policy or RetentionPolicy()
+        self.archive = archive or SnapshotArchive(os.path.join(data_dir, "archive"))
+        self.db_path = os.path.join(data_dir, "direx.db")
+        self._stop = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+
+    def _storage(self) -> Optional[SQLiteStorage]:
+        """Banco de snapshots do diretório; só é aberto se já existir"""
+        return SQLiteStorage(self.db_path) if os.path.exists(self.db_path) else None
+
+    def db_snapshots(self) -> Dict[str, int]:
+        """Snapshots de direx.db por ID <timestamp>_<id> (linhas com timestamp fora do padrão ficam de fora)"""
+        storage = self._storage()
+        if storage is None:
+            return {}
+        return {f"{s['timestamp']}_{s['id']:08d}": s["id"] for s in storage.list_snapshots(limit=-1)
+                if DB_TIMESTAMP_PATTERN.match(s["timestamp"] or "")}
+
+    def _load_local(self, timestamp: str, files: Dict[str, str], rows: Dict[str, int]) -> Dict:
+        if timestamp in files:
+            return load_snapshot_file(files[timestamp])
+        return self._storage().load(f"{self.db_path}#{rows[timestamp]}")
+
+    def _delete_rows(self, snapshot_ids: Iterable[int]) -> int:
+        """
+        Apaga snapshots de direx.db (as seções saem em cascata) e devolve o
+        espaço ao sistema com VACUUM. Retorna os bytes liberados no disco.
+        """
+        snapshot_ids = sorted(snapshot_ids)
+        storage = self._storage()
+        if storage is None or not snapshot_ids:
+            return 0
+
+        antes = _file_size(self.db_path) + _file_size(self.db_path + "-wal")
+        with closing(storage._connect()) as conn:
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                conn.executemany("DELETE FROM snapshots WHERE id = ?", ((i,) for i in snapshot_ids))
+            # VACUUM não roda dentro de transação; o checkpoint tira as páginas do WAL
+            conn.execute("VACUUM")
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return max(0, antes - _file_size(self.db_path) - _file_size(self.db_path + "-wal"))
+
+    def run(self, dry_run: bool = False) -> Dict[str, int]:
+        """Executa uma passada de retenção e retorna o resumo das ações"""
+        files = snapshot_files(self.data_dir)
+        rows = self.db_snapshots()
+        locais = set(files) | set(rows)
+        arquivados = set(self.archive.timestamps())
+        plano = self.policy.select(locais | arquivados)
+
+        resumo = {"mantidos": len(plano["manter"]), "arquivados": 0, "descartados": 0,
+                  "bytes_gravados": 0, "bytes_liberados": 0}
+        if dry_run:
+            resumo["arquivados"] = len((plano["arquivar"] & locais) - arquivados)
+            resumo["descartados"] = len(plano["descartar"])
+            return resumo
+
+        # Arquiva antes de apagar: uma falha no meio deixa o snapshot nos dois lugares, nunca em nenhum
+        for timestamp in sorted(plano["arquivar"] & locais):
+            if timestamp not in arquivados:
+                data = self._load_local(timestamp, files, rows)
+                resumo["bytes_gravados"] += self.archive.add(data, timestamp)
+                resumo["arquivados"] += 1
+
+        saem = plano["arquivar"] | plano["descartar"]
+        for timestamp in saem & set(files):
+            os.remove(files[timestamp])
+        resumo["bytes_liberados"] += self._delete_rows(rows[ts] for ts in saem & set(rows))
+        resumo["descartados"] = len(plano["descartar"])
+
+        # Snapshots ainda no diretório ou no banco não precisam ficar também no arquivo
+        self.archive.remove((plano["descartar"] | (plano["manter"] & locais)) & arquivados)
+        resumo["bytes_liberados"] += self.archive.collect_garbage()
+        return resumo
+
+    def fetch(self, timestamp: str) -> Optional[Dict]:
+        """Snapshot em `timestamp` (ou o anterior mais próximo), do diretório, do banco ou do arquivo"""
+        files = snapshot_files(self.data_dir)
+        rows = self.db_snapshots()
+        anteriores = [ts for ts in set(files) | set(rows) if ts <= _upper_bound(timestamp)]
+        candidato = max(anteriores) if anteriores else None
+        arquivado = self.archive.fetch(timestamp)
+        if arquivado is not None and (candidato is None or arquivado["timestamp"] > candidato):
+            return arquivado
+        return self._load_local(candidato, files, rows) if candidato else None
+
+    def start(self, interval: float = 3600.0) -> threading.Thread:
+        """Executa a retenção periodicamente em uma thread de fundo"""
+        if self._worker is not None and self._worker.is_alive():
+            return self._worker
+
+        def loop():
+            while not self._stop.wait(interval):
+                try:
+                    self.run()
+                except (OSError, sqlite3.Error) as e:
+                    # Banco travado ou disco cheio: a próxima passada tenta de novo
+                    print(f"⚠️ Retenção falhou: {e}", file=sys.stderr)
+
+        self._stop.clear()
+        self._worker = threading.Thread(target=loop, name="direx-retention", daemon=True)
+        self._worker.start()
+        return self._worker
+
+    def stop(self):
+        """Interrompe a thread de fundo e aguarda a passada em andamento"""
+        self._stop.set()
+        if self._worker is not None:
+            self._worker.join()
+            self._worker = None
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+DIREX - Motor de Roadmap
+Divide horizontes de qualquer tamanho em fases semanais, mensais ou trimestrais,
+geradas sob demanda.
+"""
+
+from itertools import islice
+from typing import Dict, Iterator, List, Optional
+
+from direx_templates import fase_deliverables, fase_milestones, fase_objectives
+
+# granularidade -> (dias por fase, rótulo da fase)
+GRANULARIDADES = {
+    "semanal": (7, "Semana"),
+    "mensal": (30, "Mês"),
+    "trimestral": (90, "Trimestre"),
+}
+
+
+def auto_granularity(periodo_dias: int) -> str:
+    """Escolhe a granularidade para manter o número de fases legível"""
+    if periodo_dias <= 60:
+        return "semanal"
+    elif periodo_dias <= 730:
+        return "mensal"
+    return "trimestral"
+
+
+class RoadmapEngine:
+    """
+    Roadmap para um horizonte arbitrário.
+    Cada fase é calculada em O(1) a partir do seu índice, então o engine pode ser
+    iterado, indexado ou paginado sem materializar o horizonte inteiro.
+    """
+
+    def __init__(self, periodo_dias: int, granularidade: Optional[str] = None):
+        if periodo_dias < 1:
+            raise ValueError("O período deve ter pelo menos 1 dia")
+
+        granularidade = granularidade or auto_granularity(periodo_dias)
+        if granularidade not in GRANULARIDADES:
+            raise ValueError(f"Granularidade inválida: {granularidade} (use {', '.join(GRANULARIDADES)})")
+
+        self.periodo_dias = periodo_dias
+        self.granularidade = granularidade
+        self.dias_por_fase, self.rotulo = GRANULARIDADES[granularidade]
+
+    def __len__(self) -> int:
+        return -(-self.periodo_dias // self.dias_por_fase)
+
+    def phase(self, index: int) -> Dict:
+        """Retorna a fase `index` (0-based) no formato dos itens do roadmap"""
+        total = len(self)
+        if index < 0:
+            index += total
+        if not 0 <= index < total:
+            raise IndexError(f"Fase {index} fora do roadmap de {total} fases")
+
+        fase = f"{self.rotulo} {index + 1}"
+        inicio = index * self.dias_por_fase + 1
+        fim = min((index + 1) * self.dias_por_fase, self.periodo_dias)
+        return {
+            "fase": fase,
+            "periodo": f"Dias {inicio} - {fim}",
+            "objetivos": fase_objectives(fase),
+            "entregas": fase_deliverables(fase),
+            "marcos": fase_milestones(fase),
+            "status": "pendente"
+        }
+
+    __getitem__ = phase
+
+    def iter_phases(self, start: int = 0) -> Iterator[Dict]:
+        """Gera as fases sob demanda a partir de `start`"""
+        for index in range(start, len(self)):
+            yield self.phase(index)
+
+    __iter__ = iter_phases
+
+    def page(self, pagina: int, tamanho: int = 12) -> List[Dict]:
+        """Retorna a página `pagina` (1-based) com até `tamanho` fases"""
+        if pagina < 1 or tamanho < 1:
+            raise ValueError("Página e tamanho devem ser maiores que zero")
+        return list(islice(self.iter_phases((pagina - 1) * tamanho), tamanho))
+
+    def pages(self, tamanho: int = 12) -> int:
+        """Número de páginas para o tamanho informado"""
+        return -(-len(self) // tamanho)
@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""
+DIREX - Agendador de Tarefas
+Ordenação topológica, caminho crítico e folgas com recálculo incremental.
+"""
+
+import re
+from bisect import bisect_left
+from collections import deque
+from collections.abc import Mapping
+from typing import Dict, Iterable, List, Optional, Sequence, Set
+
+PERIODO_PATTERN = re.compile(r"Dias\s+(\d+)\s*-\s*(\d+)")
+
+
+class CycleError(ValueError):
+    """Dependências formam um ciclo"""
+
+    def __init__(self, nodes: Sequence[str]):
+        super().__init__(f"Dependências circulares entre: {', '.join(map(str, nodes))}")
+        self.nodes = list(nodes)
+
+
+def _dependency_set(dependencias: Iterable[str]) -> Set[str]:
+    """Conjunto de ids de dependências; um texto solto viraria um conjunto de caracteres"""
+    if isinstance(dependencias, (str, bytes)):
+        raise TypeError("dependencias deve ser uma coleção de ids, não um texto")
+    return set(dependencias)
+
+
+class _Node:
+    __slots__ = ("task_id", "nome", "duracao", "responsavel", "fase", "preds", "succs", "inicio", "cauda")
+
+    def __init__(self, task_id: str, nome: str, duracao: float, responsavel: Optional[str], fase: Optional[str]):
+        self.task_id = task_id
+        self.nome = nome
+        self.duracao = duracao
+        self.responsavel = responsavel
+        self.fase = fase
+        self.preds: Set[str] = set()
+        self.succs: Set[str] = set()
+        self.inicio = 0.0   # início mais cedo (maior término entre os predecessores)
+        self.cauda = 0.0    # maior caminho da tarefa até o fim do projeto, incluindo a própria duração
+
+
+class TaskScheduler:
+    """
+    Grafo de tarefas com durações, dependências e responsáveis.
+
+    O início mais cedo de uma tarefa só depende dos seus ancestrais e a "cauda"
+    (caminho mais longo até o fim) só depende dos seus descendentes. Por isso uma
+    alteração recalcula apenas os descendentes (início) e os ancestrais (cauda) da
+    tarefa modificada. A folga é derivada: duração do projeto - cauda - início.
+    """
+
+    def __init__(self):
+        self.nodes: Dict[str, _Node] = {}
+        self._makespan: Optional[float] = None
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def add_task(self, task_id: str, duracao: float = 1.0, dependencias: Iterable[str] = (),
+                 responsavel: Optional[str] = None, nome: Optional[str] = None, fase: Optional[str] = None):
+        """Adiciona uma tarefa e recalcula apenas o subgrafo afetado"""
+        if task_id in self.nodes:
+            raise ValueError(f"Tarefa {task_id} já existe")
+        if duracao < 0:
+            raise ValueError("A duração não pode ser negativa")
+
+        deps = _dependency_set(dependencias)
+        node = _Node(task_id, nome or str(task_id), float(duracao), responsavel, fase)
+        # Um nó novo não tem descendentes, então só precisa de dependências existentes
+        self._check_dependencies(node, deps)
+        self.nodes[task_id] = node
+        self._link(node, deps)
+        self._propagate({task_id}, {task_id} | node.preds)
+
+    def update_task(self, task_id: str, duracao: Optional[float] = None,
+                    dependencias: Optional[Iterable[str]] = None, responsavel: Optional[str] = None):
+        """
+        Altera duração, dependências ou responsável de uma tarefa. Tudo é
+        validado antes de aplicar: uma alteração rejeitada (duração negativa,
+        dependência inexistente ou ciclo) não muda nada.
+        """
+        node = self._get(task_id)
+        if duracao is not None and duracao < 0:
+            raise ValueError("A duração não pode ser negativa")
+        new_deps = None
+        if dependencias is not None:
+            new_deps = _dependency_set(dependencias)
+            if new_deps == node.preds:
+                new_deps = None
+            else:
+                self._check_dependencies(node, new_deps)
+
+        if responsavel is not None:
+            node.responsavel = responsavel
+
+        forward = set()
+        backward = set()
+        if duracao is not None and float(duracao) != node.duracao:
+            node.duracao = float(duracao)
+            forward.update(node.succs)
+            backward.add(task_id)
+
+        if new_deps is not None:
+            old_preds = set(node.preds)
+            self._link(node, new_deps)
+            forward.add(task_id)
+            backward.update(old_preds | node.preds)
+
+        if forward or backward:
+            self._propagate(forward, backward)
+
+    def remove_task(self, task_id: str):
+        """Remove uma tarefa e suas arestas"""
+        node = self._get(task_id)
+        for pred in node.preds:
+            self.nodes[pred].succs.discard(task_id)
+        for succ in node.succs:
+            self.nodes[succ].preds.discard(task_id)
+        del self.nodes[task_id]
+        self._propagate(set(node.succs), set(node.preds))
+
+    def _get(self, task_id: str) -> _Node:
+        try:
+            return self.nodes[task_id]
+        except KeyError:
+            raise KeyError(f"Tarefa {task_id} não encontrada") from None
+
+    def _check_dependencies(self, node: _Node, dependencias: Set[str]):
+        """Levanta KeyError/CycleError se `dependencias` não puder ser aplicado a `node`"""
+        missing = [d for d in dependencias if d not in self.nodes and d != node.task_id]
+        if missing:
+            raise KeyError(f"Dependências inexistentes: {', '.join(map(str, missing))}")
+        if node.task_id in dependencias:
+            raise CycleError([node.task_id])
+        if dependencias and node.task_id in self.nodes:
+            # Ciclo se alguma dependência for um descendente da tarefa
+            cycle = dependencias & self._reachable([node.task_id], "succs")
+            if cycle:
+                raise CycleError([node.task_id] + sorted(cycle, key=str))
+
+    def _link(self, node: _Node, dependencias: Set[str]):
+        """Troca as arestas de entrada de `node` (já validadas com _check_dependencies)"""
+        for pred in node.preds - dependencias:
+            self.nodes[pred].succs.discard(node.task_id)
+        for pred in dependencias - node.preds:
+            self.nodes[pred].succs.add(node.task_id)
+        node.preds = set(dependencias)
+
+    def _reachable(self, seeds: Iterable[str], direction: str) -> Set[str]:
+        """Conjunto de nós alcançáveis a partir de `seeds` (incluindo-os)"""
+        seen = set(seeds)
+        stack = list(seen)
+        while stack:
+            for neighbor in getattr(self.nodes[stack.pop()], direction):
+                if neighbor not in seen:
+                    seen.add(neighbor)
+                    stack.append(neighbor)
+        return seen
+
+    def _ordered(self, subset: Set[str], direction: str) -> List[str]:
+        """Ordenação topológica (Kahn) restrita a `subset` no sentido indicado"""
+        reverse = "preds" if direction == "succs" else "succs"
+        degree = {n: sum(1 for p in getattr(self.nodes[n], reverse) if p in subset) for n in subset}
+        queue = deque(n for n, d in degree.items() if d == 0)
+        order = []
+        while queue:
+            current = queue.popleft()
+            order.append(current)
+            for neighbor in getattr(self.nodes[current], direction):
+                if neighbor in degree:
+                    degree[neighbor] -= 1
+                    if degree[neighbor] == 0:
+                        queue.append(neighbor)
+
+        if len(order) != len(subset):
+            raise CycleError(sorted((n for n, d in degree.items() if d > 0), key=str))
+        return order
+
+    def _propagate(self, forward: Set[str], backward: Set[str]):
+        """Recalcula início dos descendentes de `forward` e cauda dos ancestrais de `backward`"""
+        forward = {n for n in forward if n in self.nodes}
+        backward = {n for n in backward if n in self.nodes}
+
+        if forward:
+            for task_id in self._ordered(self._reachable(forward, "succs"), "succs"):
+                node = self.nodes[task_id]
+                node.inicio = max((self.nodes[p].inicio + self.nodes[p].duracao for p in node.preds), default=0.0)
+
+        if backward:
+            for task_id in self._ordered(self._reachable(backward, "preds"), "preds"):
+                node = self.nodes[task_id]
+                node.cauda = node.duracao + max((self.nodes[s].cauda for s in node.succs), default=0.0)
+
+        self._makespan = None
+
+    def recompute(self):
+        """Recalcula todo o grafo em O(V+E); levanta CycleError se houver ciclo"""
+        all_nodes = set(self.nodes)
+        self._propagate(all_nodes, all_nodes)
+
+    def topological_order(self) -> List[str]:
+        """Ordem em que as tarefas podem ser executadas"""
+        return self._ordered(set(self.nodes), "succs")
+
+    @property
+    def makespan(self) -> float:
+        """Duração total do projeto (maior término entre as tarefas)"""
+        if self._makespan is None:
+            self._makespan = max((n.inicio + n.duracao for n in self.nodes.values()), default=0.0)
+        return self._makespan
+
+    def slack(self, task_id: str) -> float:
+        """Folga total: quanto a tarefa pode atrasar sem atrasar o projeto"""
+        node = self._get(task_id)
+        return self.makespan - node.cauda - node.inicio
+
+    def critical_path(self) -> List[str]:
+        """Sequência de tarefas sem folga do início ao fim do projeto"""
+        makespan = self.makespan
+        current = next((n for n in self.nodes.values()
+                        if not n.preds and n.inicio == 0 and abs(n.cauda - makespan) < 1e-9), None)
+        path = []
+        while current is not None:
+            path.append(current.task_id)
+            fim = current.inicio + current.duracao
+            current = next((self.nodes[s] for s in current.succs
+                            if abs(self.nodes[s].inicio - fim) < 1e-9
+                            and abs(self.nodes[s].cauda + fim - makespan) < 1e-9), None)
+        return path
+
+    def schedule(self) -> List[Dict]:
+        """Cronograma em ordem topológica com início, término, folga e criticidade"""
+        makespan = self.makespan
+        result = []
+        for task_id in self.topological_order():
+            node = self.nodes[task_id]
+            folga = makespan - node.cauda - node.inicio
+            result.append({
+                "id": task_id,
+                "nome": node.nome,
+                "responsavel": node.responsavel,
+                "duracao": node.duracao,
+                "inicio": node.inicio,
+                "fim": node.inicio + node.duracao,
+                "folga": folga,
+                "critica": abs(folga) < 1e-9,
+                "dependencias": sorted(node.preds, key=str)
+            })
+        return result
+
+    @classmethod
+    def from_tasks(cls, tasks: Iterable) -> "TaskScheduler":
+        """
+        Monta o agendador a partir de DirexAgent.tasks. Itens dict (ou registros) usam as chaves
+        id/tarefa, duracao, dependencias, responsavel e fase; strings viram
+        tarefas independentes de 1 dia.
+        """
+        scheduler = cls()
+        pending = []
+        for item in tasks:
+            if isinstance(item, Mapping):
+                task_id = item.get("id", item.get("tarefa"))
+                pending.append((task_id, item))
+            else:
+                pending.append((item, {"tarefa": item}))
+
+        # Primeiro os nós, depois as arestas, e um único recálculo completo
+        for task_id, item in pending:
+            if task_id in scheduler.nodes:
+                raise ValueError(f"Tarefa {task_id} duplicada")
+            scheduler.nodes[task_id] = _Node(task_id, item.get("tarefa", str(task_id)),
+                                             float(item.get("duracao", 1)), item.get("responsavel"),
+                                             item.get("fase"))
+        for task_id, item in pending:
+            deps = _dependency_set(item.get("dependencias") or ())
+            missing = [d for d in deps if d not in scheduler.nodes]
+            if missing:
+                raise KeyError(f"Dependências inexistentes para {task_id}: {', '.join(map(str, missing))}")
+            node = scheduler.nodes[task_id]
+            node.preds = deps
+            for dep in deps:
+                scheduler.nodes[dep].succs.add(task_id)
+
+        scheduler.recompute()
+        return scheduler
+
+
+def align_with_roadmap(roadmap: List[Dict], scheduler: TaskScheduler) -> List[Dict]:
+    """
+    Distribui as tarefas agendadas pelas fases do roadmap conforme o dia de término
+    (durações em dias, dia 1 = início do roadmap). Retorna cópias das fases com
+    `entregas_agendadas` e `atrasos` (tarefas previstas para uma fase mas que só
+    terminam depois dela por causa das dependências). Fases sem 'Dias a - b' no
+    período não recebem entregas; as demais são consideradas pelo dia de término,
+    em qualquer ordem.
+    """
+    aligned = [dict(fase, entregas_agendadas=[], atrasos=[]) for fase in roadmap]
+    if not aligned:
+        return aligned
+
+    datadas = []
+    for i, fase in enumerate(roadmap):
+        match = PERIODO_PATTERN.search(fase.get("periodo", ""))
+        if match:
+            datadas.append((int(match.group(2)), i))
+    datadas.sort()
+    limites = [limite for limite, _ in datadas]
+    if not datadas:
+        # Nenhuma fase datada: tudo vai para a última
+        datadas = [(float("inf"), len(aligned) - 1)]
+        limites = [float("inf")]
+
+    index_by_name = {fase.get("fase"): i for i, fase in enumerate(roadmap)}
+    limite_por_fase = {i: limite for limite, i in datadas}
+    for item in scheduler.schedule():
+        posicao = datadas[min(bisect_left(limites, item["fim"]), len(datadas) - 1)][1]
+        aligned[posicao]["entregas_agendadas"].append(item["nome"])
+
+        desejada = index_by_name.get(scheduler.nodes[item["id"]].fase)
+        # Atraso: a fase prevista termina antes da fase em que a tarefa realmente cai
+        if desejada is not None and limite_por_fase.get(desejada, float("inf")) < limite_por_fase[posicao]:
+            aligned[desejada]["atrasos"].append({
+                "tarefa": item["nome"],
+                "fim_previsto": item["fim"],
+                "fase_real": aligned[posicao]["fase"]
+            })
+    return aligned
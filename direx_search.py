@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+DIREX - Busca Textual
+Índice invertido incremental sobre os snapshots salvos, com tokenização em português.
+"""
+
+import math
+import os
+import re
+import sqlite3
+from collections.abc import Mapping
+from contextlib import closing
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from direx_classifier import normalize
+from direx_diff import IDENTITY_FIELDS
+from direx_storage import BUSY_TIMEOUT, import_json
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Palavras muito frequentes em português que não ajudam na busca
+STOPWORDS = frozenset("""
+a ao aos as at ate com como da das de dela dele do dos e ela ele em entre era essa esse esta este
+eu foi for ha isso isto ja la lhe mais mas me mesmo meu minha muito na nas nem no nos nossa nosso
+num numa o os ou para pela pelas pelo pelos por qual quando que quem se sem ser seu sua sao so
+tambem te tem tu um uma umas uns voce
+""".split())
+
+# Parâmetros do ranking BM25
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def _stem(token: str) -> str:
+    """Redução leve de plurais (RSLP simplificado) para casar 'entregas' com 'entrega'"""
+    if len(token) <= 3 or not token.endswith("s"):
+        return token
+    for suffix, replacement in (("oes", "ao"), ("aes", "ao"), ("ais", "al"), ("eis", "el"),
+                                ("ois", "ol"), ("is", "il"), ("ns", "m"), ("res", "r"), ("zes", "z")):
+        if token.endswith(suffix) and len(token) - len(suffix) >= 2:
+            return token[:-len(suffix)] + replacement
+    return token[:-1]
+
+
+def tokenize(text: str) -> List[str]:
+    """Normaliza acentos/caixa, separa palavras, remove stopwords e reduz plurais"""
+    return [_stem(t) for t in TOKEN_PATTERN.findall(normalize(text)) if t not in STOPWORDS]
+
+
+def _identity(section: str, item, posicao: int) -> str:
+    """Identidade estável de um item (mesmos campos do diff); a posição só na falta deles"""
+    if isinstance(item, Mapping):
+        for field in IDENTITY_FIELDS[section]:
+            value = item.get(field)
+            if value is not None:
+                return str(value)
+        return str(posicao)
+    return str(item)
+
+
+def iter_fields(data: Dict) -> Iterator[Tuple[str, str]]:
+    """
+    Extrai (campo, texto) indexáveis de um snapshot. O campo identifica o item
+    pela identidade (objetivo, fase, id/tarefa) e não pela posição, então
+    reordenar ou inserir itens não cria documentos novos para textos iguais.
+    """
+    if data.get("business_objective"):
+        yield "business_objective", data["business_objective"]
+
+    for i, okr in enumerate(data.get("okrs") or []):
+        chave = _identity("okrs", okr, i)
+        if okr.get("objetivo"):
+            yield f"okrs[{chave}].objetivo", okr["objetivo"]
+        for kr in okr.get("resultados_chave") or []:
+            yield f"okrs[{chave}].resultados_chave", kr
+
+    for i, fase in enumerate(data.get("roadmap") or []):
+        chave = _identity("roadmap", fase, i)
+        for key in ("objetivos", "entregas", "marcos"):
+            for text in fase.get(key) or []:
+                yield f"roadmap[{chave}].{key}", text
+
+    for i, task in enumerate(data.get("tasks") or []):
+        text = task.get("tarefa") if isinstance(task, Mapping) else task
+        if text:
+            yield f"tasks[{_identity('tasks', task, i)}]", str(text)
+
+
+class SearchIndex:
+    """
+    Índice invertido persistido em SQLite.
+    Textos idênticos no mesmo campo são indexados uma única vez. As ocorrências
+    são intervalos de snapshots consecutivos: um texto que continua no snapshot
+    seguinte só estende o seu intervalo, então o índice cresce com as mudanças
+    do plano e não com o número de salvamentos.
+    """
+
+    SCHEMA_VERSION = 2
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS snapshots (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            ref TEXT NOT NULL UNIQUE,
+            timestamp TEXT
+        );
+        CREATE TABLE IF NOT EXISTS docs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            campo TEXT NOT NULL,
+            texto TEXT NOT NULL,
+            comprimento INTEGER NOT NULL,
+            UNIQUE (campo, texto)
+        );
+        CREATE TABLE IF NOT EXISTS postings (
+            termo TEXT NOT NULL,
+            doc_id INTEGER NOT NULL,
+            tf INTEGER NOT NULL,
+            PRIMARY KEY (termo, doc_id)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS occurrences (
+            doc_id INTEGER NOT NULL,
+            inicio INTEGER NOT NULL,
+            fim INTEGER NOT NULL,
+            PRIMARY KEY (doc_id, inicio)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS idx_occurrences_fim ON occurrences(doc_id, fim);
+        CREATE TABLE IF NOT EXISTS sources (
+            origem TEXT PRIMARY KEY,
+            ultimo_id INTEGER NOT NULL
+        );
+    """
+
+    def __init__(self, db_path: str = os.path.join("direx_data", "direx_search.db")):
+        self.db_path = db_path
+        self._schema_ready = False
+
+    def _connect(self) -> sqlite3.Connection:
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # Mesma espera pela trava do SQLiteStorage: vários workers indexam no mesmo banco
+        conn = sqlite3.connect(self.db_path, timeout=BUSY_TIMEOUT)
+        if not self._schema_ready:
+            conn.execute("PRAGMA journal_mode = WAL")
+            with conn:
+                self._migrate(conn)
+            self._schema_ready = True
+        return conn
+
+    def _migrate(self, conn: sqlite3.Connection):
+        """Cria o esquema; índices da versão 1 (uma ocorrência por snapshot) viram intervalos de um snapshot"""
+        if conn.execute("PRAGMA user_version").fetchone()[0] >= self.SCHEMA_VERSION:
+            return
+        colunas = {row[1] for row in conn.execute("PRAGMA table_info(occurrences)")}
+        if "snapshot_id" in colunas:
+            conn.execute("ALTER TABLE occurrences RENAME TO occurrences_v1")
+        conn.executescript(self.SCHEMA)
+        if "snapshot_id" in colunas:
+            conn.execute("INSERT INTO occurrences (doc_id, inicio, fim) "
+                         "SELECT doc_id, snapshot_id, snapshot_id FROM occurrences_v1")
+            conn.execute("DROP TABLE occurrences_v1")
+        conn.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+
+    def add_snapshot(self, ref: str, data: Dict) -> int:
+        """Indexa um snapshot; retorna quantos textos novos entraram no índice"""
+        with closing(self._connect()) as conn, conn:
+            return self._add(conn, ref, data)
+
+    def _add(self, conn: sqlite3.Connection, ref: str, data: Dict) -> int:
+        cursor = conn.execute("INSERT OR IGNORE INTO snapshots (ref, timestamp) VALUES (?, ?)",
+                              (ref, data.get("timestamp")))
+        if cursor.rowcount == 0:
+            return 0
+        snapshot_id = cursor.lastrowid
+        anterior = conn.execute("SELECT MAX(id) FROM snapshots WHERE id < ?", (snapshot_id,)).fetchone()[0]
+
+        novos = 0
+        doc_ids = set()
+        for campo, texto in iter_fields(data):
+            row = conn.execute("SELECT id FROM docs WHERE campo = ? AND texto = ?", (campo, texto)).fetchone()
+            if row is None:
+                tokens = tokenize(texto)
+                doc_id = conn.execute(
+                    "INSERT INTO docs (campo, texto, comprimento) VALUES (?, ?, ?)",
+                    (campo, texto, len(tokens))
+                ).lastrowid
+                freqs: Dict[str, int] = {}
+                for token in tokens:
+                    freqs[token] = freqs.get(token, 0) + 1
+                conn.executemany("INSERT INTO postings (termo, doc_id, tf) VALUES (?, ?, ?)",
+                                 ((termo, doc_id, tf) for termo, tf in freqs.items()))
+                novos += 1
+            else:
+                doc_id = row[0]
+            doc_ids.add(doc_id)
+
+        for doc_id in doc_ids:
+            # O texto já estava no snapshot anterior: estende o intervalo em vez de criar outra linha
+            estendido = anterior is not None and conn.execute(
+                "UPDATE occurrences SET fim = ? WHERE doc_id = ? AND fim = ?", (snapshot_id, doc_id, anterior)
+            ).rowcount
+            if not estendido:
+                conn.execute("INSERT INTO occurrences (doc_id, inicio, fim) VALUES (?, ?, ?)",
+                             (doc_id, snapshot_id, snapshot_id))
+        return novos
+
+    def search(self, query: str, limit: int = 10, snapshots_por_hit: int = 5) -> List[Dict]:
+        """Busca ranqueada (BM25) e retorna campo, texto e snapshots de cada hit"""
+        termos = list(dict.fromkeys(tokenize(query)))
+        if not termos or not os.path.exists(self.db_path):
+            return []
+
+        with closing(self._connect()) as conn:
+            total_docs, soma_comprimentos = conn.execute("SELECT COUNT(*), TOTAL(comprimento) FROM docs").fetchone()
+            if not total_docs:
+                return []
+            media = soma_comprimentos / total_docs or 1.0
+
+            scores: Dict[int, float] = {}
+            for termo in termos:
+                postings = conn.execute(
+                    "SELECT p.doc_id, p.tf, d.comprimento FROM postings p JOIN docs d ON d.id = p.doc_id "
+                    "WHERE p.termo = ?", (termo,)
+                ).fetchall()
+                if not postings:
+                    continue
+                idf = math.log(1 + (total_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, tf, comprimento in postings:
+                    norm = tf * (BM25_K1 + 1) / (tf + BM25_K1 * (1 - BM25_B + BM25_B * comprimento / media))
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * norm
+
+            ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:limit]
+            hits = []
+            for doc_id, score in ranked:
+                campo, texto = conn.execute("SELECT campo, texto FROM docs WHERE id = ?", (doc_id,)).fetchone()
+                snapshots = conn.execute(
+                    "SELECT s.ref, s.timestamp FROM occurrences o "
+                    "JOIN snapshots s ON s.id BETWEEN o.inicio AND o.fim "
+                    "WHERE o.doc_id = ? ORDER BY s.id DESC LIMIT ?", (doc_id, snapshots_por_hit)
+                ).fetchall()
+                ocorrencias = conn.execute(
+                    "SELECT COUNT(*) FROM occurrences o JOIN snapshots s ON s.id BETWEEN o.inicio AND o.fim "
+                    "WHERE o.doc_id = ?", (doc_id,)
+                ).fetchone()[0]
+                hits.append({
+                    "score": round(score, 4),
+                    "campo": campo,
+                    "texto": texto,
+                    "snapshots": [{"ref": ref, "timestamp": ts} for ref, ts in snapshots],
+                    "ocorrencias": ocorrencias
+                })
+        return hits
+
+    def index_storage(self, storage) -> int:
+        """
+        Indexa os snapshots de um SQLiteStorage salvos depois da última
+        indexação dele (a posição fica em `sources`); retorna quantos.
+        """
+        origem = storage.db_path
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT ultimo_id FROM sources WHERE origem = ?", (origem,)).fetchone()
+            if row is not None:
+                ultimo = row[0]
+            else:
+                # Índices anteriores a `sources`: parte do maior id já indexado deste banco
+                prefixo = f"{origem}#"
+                ids = [int(ref[len(prefixo):]) for (ref,) in
+                       conn.execute("SELECT ref FROM snapshots WHERE substr(ref, 1, ?) = ?",
+                                    (len(prefixo), prefixo))
+                       if ref[len(prefixo):].isdigit()]
+                ultimo = max(ids, default=0)
+
+        indexados = 0
+        for snapshot in reversed(storage.list_snapshots(limit=-1, since=ultimo)):
+            ref = f"{origem}#{snapshot['id']}"
+            data = storage.load(ref)
+            with closing(self._connect()) as conn, conn:
+                self._add(conn, ref, data)
+                conn.execute("INSERT OR REPLACE INTO sources (origem, ultimo_id) VALUES (?, ?)",
+                             (origem, snapshot["id"]))
+            indexados += 1
+        return indexados
+
+    def index_json_dir(self, data_dir: str) -> int:
+        """Indexa snapshots direx_data_*.json já existentes (histórico legado)"""
+        files = sorted(f for f in os.listdir(data_dir) if f.startswith("direx_data_") and f.endswith(".json"))
+        for name in files:
+            path = os.path.join(data_dir, name)
+            self.add_snapshot(path, import_json(path))
+        return len(files)
+
+
+def print_hits(hits: List[Dict]):
+    """Exibe os resultados da busca"""
+    if not hits:
+        print("❌ Nenhum resultado encontrado.")
+        return
+
+    for i, hit in enumerate(hits, 1):
+        print(f"\n{i}. {hit['texto']} (score {hit['score']})")
+        print(f"   📍 Campo: {hit['campo']} — {hit['ocorrencias']} snapshot(s)")
+        for snapshot in hit["snapshots"]:
+            print(f"   • {snapshot['ref']} ({snapshot['timestamp']})")
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+DIREX - Serializadores
+Formatos plugáveis para os snapshots (JSON compacto, orjson, msgpack) com
+compressão opcional (gzip/zstd) e detecção automática do formato na leitura.
+"""
+
+import gzip
+import importlib
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+from direx_metrics import record_bytes
+
+# Dependências opcionais (orjson, msgpack, zstandard), importadas só no primeiro uso;
+# sem elas restam o JSON da biblioteca padrão e o gzip
+_OPTIONAL_MODULES: Dict[str, object] = {}
+
+
+def _optional(name: str):
+    """Módulo opcional `name`, ou None se não estiver instalado"""
+    try:
+        return _OPTIONAL_MODULES[name]
+    except KeyError:
+        pass
+    try:
+        module = importlib.import_module(name)
+    except ImportError:
+        module = None
+    _OPTIONAL_MODULES[name] = module
+    return module
+
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+# Extensões de arquivos de snapshot lidos por read_snapshot
+SNAPSHOT_EXTENSIONS = tuple(base + suffix for base in (".json", ".msgpack") for suffix in ("", ".gz", ".zst"))
+
+
+class Serializer:
+    """Converte o estado (dict) em bytes e de volta"""
+
+    name = ""
+    extension = ""
+
+    def dumps(self, data: Dict) -> bytes:
+        raise NotImplementedError
+
+    def loads(self, raw: bytes) -> Dict:
+        raise NotImplementedError
+
+
+class JsonSerializer(Serializer):
+    """JSON da biblioteca padrão; compacto por padrão, indentado se `indent` for informado"""
+
+    extension = ".json"
+
+    def __init__(self, indent: Optional[int] = None):
+        self.indent = indent
+        self.name = "json" if indent is None else "json-indentado"
+
+    def dumps(self, data: Dict) -> bytes:
+        separators = (",", ":") if self.indent is None else None
+        return json.dumps(data, indent=self.indent, ensure_ascii=False, separators=separators).encode("utf-8")
+
+    def loads(self, raw: bytes) -> Dict:
+        return json.loads(raw)
+
+
+class OrjsonSerializer(Serializer):
+    """JSON compacto via orjson (requer o pacote orjson)"""
+
+    name = "orjson"
+    extension = ".json"
+
+    def dumps(self, data: Dict) -> bytes:
+        orjson = _optional("orjson")
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+
+    def loads(self, raw: bytes) -> Dict:
+        return _optional("orjson").loads(raw)
+
+
+class MsgpackSerializer(Serializer):
+    """MessagePack binário (requer o pacote msgpack)"""
+
+    name = "msgpack"
+    extension = ".msgpack"
+
+    def dumps(self, data: Dict) -> bytes:
+        return _optional("msgpack").packb(data, use_bin_type=True)
+
+    def loads(self, raw: bytes) -> Dict:
+        return _optional("msgpack").unpackb(raw, raw=False, strict_map_key=False)
+
+
+def available_serializers() -> Dict[str, Serializer]:
+    """Serializadores disponíveis no ambiente, do mais lento ao mais rápido"""
+    serializers = [JsonSerializer(indent=2), JsonSerializer()]
+    if _optional("orjson") is not None:
+        serializers.append(OrjsonSerializer())
+    if _optional("msgpack") is not None:
+        serializers.append(MsgpackSerializer())
+    return {s.name: s for s in serializers}
+
+
+def available_compressions() -> List[Optional[str]]:
+    """Compressões disponíveis (None = sem compressão)"""
+    return [None, "gzip"] + (["zstd"] if _optional("zstandard") is not None else [])
+
+
+def default_format() -> str:
+    """Formato mais rápido disponível que continua legível como JSON"""
+    return "orjson" if _optional("orjson") is not None else "json"
+
+
+def get_serializer(formato: str) -> Serializer:
+    """Retorna o serializador pelo nome; levanta ValueError se indisponível"""
+    serializers = available_serializers()
+    if formato not in serializers:
+        raise ValueError(f"Formato indisponível: {formato} (use {', '.join(serializers)})")
+    return serializers[formato]
+
+
+def compress(raw: bytes, compressao: Optional[str]) -> bytes:
+    if compressao is None:
+        return raw
+    if compressao == "gzip":
+        return gzip.compress(raw, compresslevel=6, mtime=0)
+    if compressao == "zstd":
+        zstandard = _optional("zstandard")
+        if zstandard is None:
+            raise ValueError("Compressão zstd requer o pacote zstandard")
+        return zstandard.ZstdCompressor(level=3).compress(raw)
+    raise ValueError(f"Compressão inválida: {compressao} (use {', '.join(map(str, available_compressions()))})")
+
+
+def decompress(raw: bytes) -> bytes:
+    """Remove a compressão identificada pelos bytes mágicos, se houver"""
+    if raw.startswith(GZIP_MAGIC):
+        return gzip.decompress(raw)
+    if raw.startswith(ZSTD_MAGIC):
+        zstandard = _optional("zstandard")
+        if zstandard is None:
+            raise ValueError("Snapshot comprimido com zstd: instale o pacote zstandard")
+        return zstandard.ZstdDecompressor().decompressobj().decompress(raw)
+    return raw
+
+
+def detect_format(raw: bytes) -> str:
+    """Identifica o formato de um conteúdo já descomprimido"""
+    head = raw.lstrip()[:1]
+    if head in (b"{", b"["):
+        return "json"
+    if head and (0x80 <= head[0] <= 0x8f or head[0] in (0xde, 0xdf)):
+        return "msgpack"
+    raise ValueError("Formato de snapshot não reconhecido")
+
+
+def encode(data: Dict, formato: str = "json", compressao: Optional[str] = None) -> bytes:
+    """Serializa e, opcionalmente, comprime o estado"""
+    return compress(get_serializer(formato).dumps(data), compressao)
+
+
+def decode(raw: bytes) -> Dict:
+    """Desserializa detectando compressão e formato automaticamente"""
+    raw = decompress(raw)
+    if detect_format(raw) == "msgpack":
+        if _optional("msgpack") is None:
+            raise ValueError("Snapshot em msgpack: instale o pacote msgpack")
+        return MsgpackSerializer().loads(raw)
+    # Qualquer JSON (compacto, indentado ou orjson) é lido pelo decodificador mais rápido
+    orjson = _optional("orjson")
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+
+def file_extension(formato: str, compressao: Optional[str] = None) -> str:
+    """Extensão sugerida para o par formato/compressão"""
+    extension = get_serializer(formato).extension
+    return extension + {None: "", "gzip": ".gz", "zstd": ".zst"}[compressao]
+
+
+def atomic_write(filename: str, payload: bytes):
+    """
+    Grava `payload` em um arquivo temporário oculto no mesmo diretório, faz fsync
+    e o renomeia sobre `filename`: leitores veem o arquivo antigo ou o novo
+    completo, nunca um arquivo truncado.
+    """
+    directory = os.path.dirname(filename) or "."
+    os.makedirs(directory, exist_ok=True)
+
+    tmp_path = os.path.join(directory, f".{os.path.basename(filename)}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, filename)
+        record_bytes("escrita", "arquivo", len(payload))
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    if hasattr(os, "O_DIRECTORY"):
+        # Persiste também a entrada do diretório (rename) em sistemas POSIX
+        fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+def write_snapshot(data: Dict, filename: str, formato: str = "json", compressao: Optional[str] = None) -> str:
+    """Grava o estado em `filename` (escrita atômica) com o formato/compressão escolhidos"""
+    atomic_write(filename, encode(data, formato, compressao))
+    return filename
+
+
+def read_snapshot(filename: str) -> Dict:
+    """Lê um snapshot em qualquer formato suportado"""
+    with open(filename, "rb") as f:
+        raw = f.read()
+    record_bytes("leitura", "arquivo", len(raw))
+    return decode(raw)
+
+
+def benchmark(data: Dict, repeat: int = 5) -> List[Dict]:
+    """
+    Mede tamanho em bytes e tempo médio de codificação/decodificação (ms) de
+    cada combinação formato x compressão disponível.
+    """
+    if repeat < 1:
+        raise ValueError("repeat deve ser maior que zero")
+    results = []
+    for formato, serializer in available_serializers().items():
+        for compressao in available_compressions():
+            encode_times = []
+            decode_times = []
+            for _ in range(repeat):
+                inicio = time.perf_counter()
+                raw = compress(serializer.dumps(data), compressao)
+                encode_times.append(time.perf_counter() - inicio)
+
+                inicio = time.perf_counter()
+                serializer.loads(decompress(raw))
+                decode_times.append(time.perf_counter() - inicio)
+
+            results.append({
+                "formato": formato,
+                "compressao": compressao or "-",
+                "bytes": len(raw),
+                "encode_ms": sum(encode_times) / repeat * 1000,
+                "decode_ms": sum(decode_times) / repeat * 1000
+            })
+    return results
+
+
+def print_benchmark(results: List[Dict]):
+    """Exibe o resultado do benchmark em tabela"""
+    print(f"{'Formato':<16} {'Compressão':<11} {'Bytes':>12} {'Encode (ms)':>12} {'Decode (ms)':>12}")
+    for row in results:
+        print(f"{row['formato']:<16} {row['compressao']:<11} {row['bytes']:>12,} "
+              f"{row['encode_ms']:>12.3f} {row['decode_ms']:>12.3f}")
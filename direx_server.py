@@ -0,0 +1,426 @@
+#!/usr/bin/env python3
+"""
+DIREX - Modo Serviço
+Servidor HTTP/JSON local em asyncio com uma sessão DirexAgent isolada por planejador.
+Os agentes das sessões vivem em um AgentPool: sessões pouco usadas saem da
+memória (salvas antes) e são reidratadas no próximo acesso.
+"""
+
+import asyncio
+import functools
+import json
+import os
+import re
+import time
+import uuid
+from typing import Dict, Optional, Tuple
+
+import direx_metrics
+from direx_agent import DirexAgent
+from direx_pool import DEFAULT_MEMORY_BUDGET, AgentPool
+from direx_priority import prioritize_batch
+
+SESSION_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+MAX_BODY_BYTES = 10 * 1024 * 1024
+
+# Horizonte aceito pelo endpoint de roadmap (dias)
+ROADMAP_MIN_DIAS = 1
+ROADMAP_MAX_DIAS = 3650
+
+STATUS_TEXT = {
+    200: "OK",
+    201: "Created",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+}
+
+
+class HTTPError(Exception):
+    """Erro que vira uma resposta HTTP com corpo JSON"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class Session:
+    """
+    Uma sessão de planejamento. O DirexAgent fica no pool do SessionManager e
+    `agent` só é preenchido enquanto uma requisição o usa; os handlers marcam
+    `dirty` (True/False) quando alteram ou salvam o estado.
+    """
+
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self.agent: Optional[DirexAgent] = None
+        self.lock = asyncio.Lock()
+        self.last_access = time.monotonic()
+        self.dirty: Optional[bool] = None
+
+    def touch(self):
+        self.last_access = time.monotonic()
+
+
+class SessionManager:
+    """
+    Mantém as sessões ativas e remove as que ficam ociosas.
+    Os agentes ficam em um AgentPool limitado por `memory_budget`; sessões com
+    alterações não salvas são persistidas antes de sair da memória.
+    """
+
+    def __init__(self, data_dir: str = "direx_data", idle_timeout: float = 900.0,
+                 memory_budget: int = DEFAULT_MEMORY_BUDGET, max_agents: Optional[int] = None):
+        self.data_dir = data_dir
+        self.idle_timeout = idle_timeout
+        self.sessions: Dict[str, Session] = {}
+        self.pool = AgentPool(os.path.join(data_dir, "sessions"), memory_budget, max_agents)
+
+    def session_dir(self, session_id: str) -> str:
+        return self.pool.agent_dir(session_id)
+
+    async def create(self, session_id: Optional[str] = None) -> Session:
+        """Cria (ou reabre) uma sessão; o agente só é montado na primeira ação"""
+        session_id = session_id or uuid.uuid4().hex
+        if not SESSION_ID_PATTERN.match(session_id):
+            raise HTTPError(400, "session_id inválido (use letras, números, '-' ou '_')")
+
+        session = self.sessions.setdefault(session_id, Session(session_id))
+        session.touch()
+        return session
+
+    async def get(self, session_id: str) -> Session:
+        """Sessão ativa ou, se tiver estado salvo, reaberta de forma transparente"""
+        session = self.sessions.get(session_id)
+        if session is None:
+            if not SESSION_ID_PATTERN.match(session_id):
+                raise HTTPError(404, f"Sessão {session_id} não encontrada")
+            # Consulta ao disco fora do laço de eventos
+            if not await asyncio.to_thread(self.pool.exists, session_id):
+                raise HTTPError(404, f"Sessão {session_id} não encontrada")
+            session = self.sessions.setdefault(session_id, Session(session_id))
+        session.touch()
+        return session
+
+    async def acquire(self, session: Session) -> DirexAgent:
+        """Fixa o agente da sessão no pool (reidratando-o se necessário); use com a trava da sessão"""
+        session.agent = await asyncio.to_thread(self.pool.acquire, session.session_id)
+        session.dirty = None
+        return session.agent
+
+    async def release(self, session: Session):
+        """Devolve o agente ao pool com a marca de alterações deixada pelos handlers"""
+        session.agent = None
+        await asyncio.to_thread(self.pool.release, session.session_id, session.dirty)
+
+    async def close(self, session_id: str, save: bool = True):
+        """Remove uma sessão, salvando antes se houver alterações pendentes"""
+        session = self.sessions.get(session_id)
+        if session is None:
+            return
+
+        async with session.lock:
+            await asyncio.to_thread(self.pool.discard, session_id, save)
+            # A sessão pode ter sido recriada enquanto salvávamos
+            if self.sessions.get(session_id) is session:
+                del self.sessions[session_id]
+
+    async def delete(self, session_id: str) -> bool:
+        """Encerra a sessão e apaga seu estado salvo; retorna se ela existia"""
+        if not SESSION_ID_PATTERN.match(session_id):
+            return False
+        active = session_id in self.sessions
+        session = self.sessions.setdefault(session_id, Session(session_id))
+        async with session.lock:
+            existed = await asyncio.to_thread(self.pool.delete, session_id) or active
+            if self.sessions.get(session_id) is session:
+                del self.sessions[session_id]
+        return existed
+
+    async def evict_idle(self) -> int:
+        """Remove as sessões ociosas há mais de idle_timeout segundos"""
+        deadline = time.monotonic() - self.idle_timeout
+        idle = [sid for sid, s in self.sessions.items() if s.last_access < deadline and not s.lock.locked()]
+        for session_id in idle:
+            await self.close(session_id)
+        return len(idle)
+
+    async def run_eviction(self, interval: Optional[float] = None):
+        """Laço de expiração executado em segundo plano pelo servidor"""
+        interval = interval or max(1.0, self.idle_timeout / 4)
+        while True:
+            await asyncio.sleep(interval)
+            await self.evict_idle()
+
+
+class DirexServer:
+    """
+    Servidor HTTP/1.1 mínimo que expõe o DirexAgent como endpoints JSON:
+
+        POST   /sessions                      {"session_id"?}
+        GET    /sessions/{id}                 estado completo
+        DELETE /sessions/{id}                 encerra e apaga o estado salvo
+        POST   /sessions/{id}/objective       {"objetivo"}
+        POST   /sessions/{id}/okrs            {"objetivo"?}
+        POST   /sessions/{id}/kpis
+        POST   /sessions/{id}/roadmap         {"periodo_dias"?}
+        POST   /sessions/{id}/weekly-plan
+        POST   /sessions/{id}/prioritize      {"tarefas": [{"tarefa", "impacto", "esforco"}], "top"?}
+        POST   /sessions/{id}/save
+        POST   /sessions/{id}/load            {"ref"?}
+        GET    /health
+        GET    /metrics                       texto Prometheus (/metrics.json em JSON)
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8080, data_dir: str = "direx_data",
+                 idle_timeout: float = 900.0, memory_budget: int = DEFAULT_MEMORY_BUDGET,
+                 max_agents: Optional[int] = None):
+        self.host = host
+        self.port = port
+        self.manager = SessionManager(data_dir, idle_timeout, memory_budget, max_agents)
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Atende requisições de uma conexão (com keep-alive)"""
+        try:
+            while True:
+                try:
+                    request = await self._read_request(reader)
+                except HTTPError as e:
+                    await self._write_response(writer, e.status, {"erro": str(e)}, keep_alive=False)
+                    break
+                if request is None:
+                    break
+
+                method, path, headers, body = request
+                keep_alive = headers.get("connection", "").lower() != "close"
+                try:
+                    status, payload = await self.dispatch(method, path, body)
+                except HTTPError as e:
+                    status, payload = e.status, {"erro": str(e)}
+                except (ValueError, KeyError, TypeError) as e:
+                    status, payload = 400, {"erro": str(e)}
+                except Exception as e:
+                    status, payload = 500, {"erro": f"Erro interno: {e}"}
+
+                await self._write_response(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> Optional[Tuple[str, str, Dict, bytes]]:
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except asyncio.IncompleteReadError:
+            return None
+        except asyncio.LimitOverrunError:
+            raise HTTPError(413, "Cabeçalhos muito grandes")
+
+        lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, path, _ = lines[0].split(" ", 2)
+        except ValueError:
+            raise HTTPError(400, "Linha de requisição inválida")
+
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                name, value = line.split(":", 1)
+                headers[name.strip().lower()] = value.strip()
+
+        try:
+            length = int(headers.get("content-length", "0") or 0)
+        except ValueError:
+            raise HTTPError(400, "Content-Length inválido")
+        if length < 0:
+            raise HTTPError(400, "Content-Length inválido")
+        if length > MAX_BODY_BYTES:
+            raise HTTPError(413, "Corpo da requisição muito grande")
+        body = await reader.readexactly(length) if length else b""
+        return method.upper(), path.split("?", 1)[0], headers, body
+
+    async def _write_response(self, writer: asyncio.StreamWriter, status: int, payload, keep_alive: bool):
+        if isinstance(payload, str):
+            body = payload.encode("utf-8")
+            content_type = "text/plain; version=0.0.4; charset=utf-8"
+        else:
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            content_type = "application/json; charset=utf-8"
+        head = (
+            f"HTTP/1.1 {status} {STATUS_TEXT.get(status, 'OK')}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+    async def dispatch(self, method: str, path: str, body: bytes):
+        """Roteia a requisição para o handler correspondente"""
+        try:
+            params = json.loads(body) if body else {}
+        except ValueError:
+            raise HTTPError(400, "Corpo não é um JSON válido")
+        if not isinstance(params, dict):
+            raise HTTPError(400, "Corpo deve ser um objeto JSON")
+
+        parts = [p for p in path.split("/") if p]
+        if parts == ["health"] and method == "GET":
+            return 200, {"status": "ok", "sessoes": len(self.manager.sessions), "pool": self.manager.pool.stats()}
+        if parts == ["metrics"] and method == "GET":
+            return 200, direx_metrics.REGISTRY.to_prometheus()
+        if parts == ["metrics.json"] and method == "GET":
+            return 200, direx_metrics.REGISTRY.to_json()
+
+        if not parts or parts[0] != "sessions":
+            raise HTTPError(404, f"Rota não encontrada: {path}")
+
+        if len(parts) == 1:
+            if method != "POST":
+                raise HTTPError(405, "Use POST para criar sessões")
+            session = await self.manager.create(params.get("session_id"))
+            return 201, {"session_id": session.session_id}
+
+        session_id = parts[1]
+        if len(parts) == 2:
+            if method == "DELETE":
+                if not await self.manager.delete(session_id):
+                    raise HTTPError(404, f"Sessão {session_id} não encontrada")
+                return 200, {"session_id": session_id, "status": "encerrada"}
+            if method == "GET":
+                session = await self.manager.get(session_id)
+                async with session.lock:
+                    agent = await self.manager.acquire(session)
+                    try:
+                        return 200, agent.to_dict()
+                    finally:
+                        await self.manager.release(session)
+            raise HTTPError(405, "Use GET ou DELETE")
+
+        action = "/".join(parts[2:])
+        handler = self.ACTIONS.get(action)
+        if handler is None:
+            raise HTTPError(404, f"Ação desconhecida: {action}")
+        if method != "POST":
+            raise HTTPError(405, "Use POST para executar ações")
+
+        session = await self.manager.get(session_id)
+        async with session.lock:
+            await self.manager.acquire(session)
+            try:
+                result = await handler(self, session, params)
+            finally:
+                await self.manager.release(session)
+        session.touch()
+        return 200, result
+
+    @staticmethod
+    async def _in_executor(fn, *args):
+        """Geração de plano (CPU) fora do loop: as demais sessões continuam sendo atendidas"""
+        return await asyncio.get_running_loop().run_in_executor(None, functools.partial(fn, *args))
+
+    @staticmethod
+    def _objective_param(params: Dict, default: Optional[str] = None) -> Optional[str]:
+        objective = params.get("objetivo", default)
+        if objective is not None and not isinstance(objective, str):
+            raise HTTPError(400, "objetivo deve ser um texto")
+        return objective
+
+    async def _objective(self, session: Session, params: Dict):
+        objective = session.agent.set_business_objective(self._objective_param(params, ""))
+        session.dirty = True
+        return {"business_objective": objective}
+
+    async def _okrs(self, session: Session, params: Dict):
+        agent = session.agent
+        objective = self._objective_param(params)
+        if objective:
+            agent.set_business_objective(objective)
+        if not agent.business_objective:
+            raise HTTPError(400, "Defina o objetivo do negócio antes de criar OKRs")
+        session.dirty = True
+        await self._in_executor(agent.create_okrs)
+        return {"okrs": agent.export_section("okrs")}
+
+    async def _kpis(self, session: Session, params: Dict):
+        session.dirty = True
+        await self._in_executor(session.agent.create_kpis)
+        return {"kpis": session.agent.export_section("kpis")}
+
+    async def _roadmap(self, session: Session, params: Dict):
+        agent = session.agent
+        if not agent.okrs and not agent.business_objective:
+            raise HTTPError(400, "Defina o objetivo do negócio antes de criar o roadmap")
+        periodo_dias = params.get("periodo_dias", 90)
+        if (isinstance(periodo_dias, bool) or not isinstance(periodo_dias, int)
+                or not ROADMAP_MIN_DIAS <= periodo_dias <= ROADMAP_MAX_DIAS):
+            raise HTTPError(400, f"periodo_dias deve ser um inteiro entre {ROADMAP_MIN_DIAS} e {ROADMAP_MAX_DIAS}")
+        session.dirty = True
+        await self._in_executor(agent.create_roadmap, periodo_dias)
+        return {"roadmap": agent.export_section("roadmap")}
+
+    async def _weekly_plan(self, session: Session, params: Dict):
+        session.dirty = True
+        await self._in_executor(session.agent.create_weekly_plan)
+        return {"weekly_plan": session.agent.export_section("weekly_plan")}
+
+    async def _prioritize(self, session: Session, params: Dict):
+        tarefas = params.get("tarefas") or []
+        rows = [(t["tarefa"], int(t["impacto"]), int(t["esforco"])) for t in tarefas]
+        prioritized = await self._in_executor(prioritize_batch, rows, params.get("top"))
+        return {"tarefas": [{"tarefa": t, "nivel": n, "score": s} for t, n, s in prioritized]}
+
+    async def _save(self, session: Session, params: Dict):
+        # Mesmo caminho de gravação do agente (inclui o índice de busca, quando ligado)
+        ref = await asyncio.to_thread(session.agent.save_data)
+        session.dirty = False
+        return {"ref": ref}
+
+    async def _load(self, session: Session, params: Dict):
+        storage = session.agent.storage
+        ref = params.get("ref") or await asyncio.to_thread(storage.latest_ref)
+        if ref is None:
+            raise HTTPError(404, "Nenhum snapshot salvo para esta sessão")
+        data = await asyncio.to_thread(storage.load, ref)
+        session.agent.apply_state(data)
+        session.dirty = False
+        return {"ref": ref, "estado": session.agent.to_dict()}
+
+    ACTIONS = {
+        "objective": _objective,
+        "okrs": _okrs,
+        "kpis": _kpis,
+        "roadmap": _roadmap,
+        "weekly-plan": _weekly_plan,
+        "prioritize": _prioritize,
+        "save": _save,
+        "load": _load,
+    }
+
+    async def serve_forever(self):
+        """Inicia o servidor e o laço de expiração de sessões"""
+        server = await asyncio.start_server(self.handle_connection, self.host, self.port)
+        eviction = asyncio.create_task(self.manager.run_eviction())
+        print(f"🌐 DIREX servindo em http://{self.host}:{self.port}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            eviction.cancel()
+            for session_id in list(self.manager.sessions):
+                await self.manager.close(session_id)
+            await asyncio.to_thread(self.manager.pool.close)
+
+
+def run_server(host: str = "127.0.0.1", port: int = 8080, data_dir: str = "direx_data",
+               idle_timeout: float = 900.0, memory_budget: int = DEFAULT_MEMORY_BUDGET,
+               max_agents: Optional[int] = None):
+    """Executa o servidor até ser interrompido"""
+    try:
+        asyncio.run(DirexServer(host, port, data_dir, idle_timeout, memory_budget, max_agents).serve_forever())
+    except KeyboardInterrupt:
+        print("\n👋 Servidor DIREX encerrado.")
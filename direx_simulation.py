@@ -0,0 +1,394 @@
+#!/usr/bin/env python3
+"""
+DIREX - Simulação Monte Carlo
+Responde "qual a chance de concluir a fase / bater a meta até o Mês 3?"
+sorteando durações das fases (ou das tarefas de cada fase) e taxas de
+crescimento mensais dos KPIs a partir de distribuições configuráveis.
+
+As tentativas rodam em lotes vetorizados com NumPy e podem ser divididas
+entre processos; sem NumPy, um laço em Python puro produz o mesmo resultado
+estatístico (bem mais devagar).
+"""
+
+import math
+import os
+import random
+import re
+import time
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # NumPy é opcional; sem ele usamos o laço em Python puro
+    np = None
+
+from direx_scheduler import PERIODO_PATTERN
+
+DIAS_POR_MES = 30
+PERCENTIS = (10, 50, 90)
+BATCH_SIZE = 65536
+
+# Multiplicador da duração planejada: atrasos são mais prováveis que adiantamentos
+DEFAULT_DURATION = {"tipo": "triangular", "min": 0.85, "moda": 1.0, "max": 1.6}
+# Crescimento mensal (composto) dos KPIs sem distribuição informada
+DEFAULT_GROWTH = {"tipo": "normal", "media": 0.05, "desvio": 0.03}
+
+DISTRIBUTIONS = {
+    "fixo": ("valor",),
+    "uniforme": ("min", "max"),
+    "triangular": ("min", "moda", "max"),
+    "normal": ("media", "desvio"),
+    "lognormal": ("media", "sigma"),
+}
+GROWTH_MODELS = ("composto", "linear")
+
+NUMBER_PATTERN = re.compile(r"-?\d+(?:\.\d+)*(?:,\d+)?")
+# Parte inteira com pontos de milhar: grupos de exatamente 3 dígitos após cada ponto
+THOUSANDS_PATTERN = re.compile(r"-?\d{1,3}(?:\.\d{3})+")
+
+
+def validate_distribution(spec: Mapping) -> Dict:
+    """Confere tipo e parâmetros de uma distribuição; levanta ValueError se inválida"""
+    tipo = spec.get("tipo")
+    if tipo not in DISTRIBUTIONS:
+        raise ValueError(f"Distribuição inválida: {tipo} (use {', '.join(DISTRIBUTIONS)})")
+    faltando = [p for p in DISTRIBUTIONS[tipo] if not isinstance(spec.get(p), (int, float))]
+    if faltando:
+        raise ValueError(f"Distribuição {tipo} requer os parâmetros numéricos: {', '.join(faltando)}")
+    if tipo in ("uniforme", "triangular") and spec["min"] > spec["max"]:
+        raise ValueError(f"Distribuição {tipo}: min maior que max")
+    if tipo == "triangular" and not spec["min"] <= spec["moda"] <= spec["max"]:
+        raise ValueError("Distribuição triangular: moda fora de [min, max]")
+    return {"tipo": tipo, **{p: float(spec[p]) for p in DISTRIBUTIONS[tipo]}}
+
+
+def parse_number(value) -> Optional[float]:
+    """
+    Número de um texto de KPI ('95%', '4.5', 'R$ 12.500,00'); None para
+    marcadores como 'R$ XX.XXX'. O ponto é separador de milhar quando há
+    vírgula decimal ou quando separa grupos de 3 dígitos ('1.000'); nos demais
+    casos é o ponto decimal.
+    """
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = NUMBER_PATTERN.search(str(value or ""))
+    if match is None:
+        return None
+    inteiro, _, decimal = match.group().partition(",")
+    if decimal or THOUSANDS_PATTERN.fullmatch(inteiro):
+        inteiro = inteiro.replace(".", "")
+    else:
+        # '4.5.6' não é milhar nem decimal válido: vale o primeiro ponto
+        inteiro = ".".join(inteiro.split(".")[:2])
+    return float(f"{inteiro}.{decimal}" if decimal else inteiro)
+
+
+class SimulationModel(NamedTuple):
+    """Entrada da simulação já normalizada (picklável para os workers)"""
+    fases: List[str]
+    fim_planejado: List[int]           # dia planejado de término de cada fase
+    duracao_fase: List[float]          # duração planejada de cada fase, em dias
+    itens: List[float]                 # duração nominal de cada item de trabalho
+    item_fase: List[int]               # fase de cada item
+    duracao: Dict                      # distribuição do multiplicador de duração
+    kpis: List[str]
+    atual: List[float]
+    meta: List[float]
+    crescimento: List[Dict]            # distribuição do crescimento mensal de cada KPI
+    modelo: List[str]                  # "composto" (taxa) ou "linear" (incremento absoluto)
+    ignorados: List[str]               # KPIs sem números utilizáveis
+
+
+def build_model(roadmap: Sequence[Mapping], kpis: Sequence[Mapping] = (), tasks: Sequence = (),
+                metas: Optional[Mapping[str, Mapping]] = None,
+                duracao: Optional[Mapping] = None) -> SimulationModel:
+    """
+    Monta o modelo a partir das seções do plano. Fases sem 'Dias a - b' no
+    período são ignoradas; as demais são ordenadas pelo dia de início. Tarefas com `fase` e `duracao` tornam-se os itens
+    de trabalho da fase (o desvio somado delas escala a duração planejada); as
+    demais fases variam como um item só. Cada KPI usa `metas[nome]`
+    ({"atual", "meta", "crescimento", "modelo"}) ou os números dos próprios
+    campos atual/meta; KPIs sem valores numéricos (ou com atual zero no
+    modelo composto, que nunca sai do zero) ficam de fora.
+    """
+    periodos = []
+    for fase in roadmap:
+        match = PERIODO_PATTERN.search(str(fase.get("periodo", "")))
+        if match is not None:
+            periodos.append((int(match.group(1)), int(match.group(2)), fase))
+
+    # As fases correm em sequência pela ordem de início; uma fase coberta pelas
+    # anteriores (sobreposta) dura ao menos 1 dia depois delas
+    fases, fim, duracao_fase = [], [], []
+    termino_anterior = 0
+    for inicio, termino, fase in sorted(periodos, key=lambda p: p[0]):
+        termino = max(termino, termino_anterior + 1)
+        fases.append(fase.get("fase") or f"Fase {len(fases) + 1}")
+        fim.append(termino)
+        duracao_fase.append(float(termino - max(inicio - 1, termino_anterior)))
+        termino_anterior = termino
+    if not fases:
+        raise ValueError("Roadmap sem fases com período 'Dias a - b' para simular")
+
+    posicao = {nome: i for i, nome in enumerate(fases)}
+    itens, item_fase = [], []
+    for task in tasks:
+        if not isinstance(task, Mapping) or task.get("fase") not in posicao:
+            continue
+        nominal = parse_number(task.get("duracao"))
+        if nominal and nominal > 0:
+            itens.append(nominal)
+            item_fase.append(posicao[task["fase"]])
+    for i in sorted(set(range(len(fases))) - set(item_fase)):
+        itens.append(duracao_fase[i])
+        item_fase.append(i)
+
+    metas = metas or {}
+    nomes, atual, meta, crescimento, modelo, ignorados = [], [], [], [], [], []
+    for kpi in kpis:
+        nome = kpi.get("nome")
+        override = metas.get(nome, {})
+        valor_atual = parse_number(override.get("atual", kpi.get("atual")))
+        valor_meta = parse_number(override.get("meta", kpi.get("meta")))
+        modo = override.get("modelo", "composto")
+        if modo not in GROWTH_MODELS:
+            raise ValueError(f"Modelo de crescimento inválido para {nome}: {modo} (use {', '.join(GROWTH_MODELS)})")
+        if valor_atual is None or valor_meta is None or (modo == "composto" and valor_atual <= 0):
+            ignorados.append(nome)
+            continue
+        nomes.append(nome)
+        atual.append(valor_atual)
+        meta.append(valor_meta)
+        crescimento.append(validate_distribution(override.get("crescimento", DEFAULT_GROWTH)))
+        modelo.append(modo)
+
+    return SimulationModel(fases, fim, duracao_fase, itens, item_fase,
+                           validate_distribution(duracao or DEFAULT_DURATION),
+                           nomes, atual, meta, crescimento, modelo, ignorados)
+
+
+def _sample_numpy(rng, spec: Dict, size):
+    tipo = spec["tipo"]
+    if tipo == "fixo":
+        return np.full(size, spec["valor"])
+    if tipo == "uniforme":
+        return rng.uniform(spec["min"], spec["max"], size)
+    if tipo == "triangular":
+        if spec["min"] == spec["max"]:
+            return np.full(size, spec["min"])
+        return rng.triangular(spec["min"], spec["moda"], spec["max"], size)
+    if tipo == "normal":
+        return rng.normal(spec["media"], spec["desvio"], size)
+    return rng.lognormal(spec["media"], spec["sigma"], size)
+
+
+def _sample_python(rnd: random.Random, spec: Dict) -> float:
+    tipo = spec["tipo"]
+    if tipo == "fixo":
+        return spec["valor"]
+    if tipo == "uniforme":
+        return rnd.uniform(spec["min"], spec["max"])
+    if tipo == "triangular":
+        return rnd.triangular(spec["min"], spec["max"], spec["moda"])
+    if tipo == "normal":
+        return rnd.gauss(spec["media"], spec["desvio"])
+    return rnd.lognormvariate(spec["media"], spec["sigma"])
+
+
+def _checkpoints(model: SimulationModel) -> List[float]:
+    """Momento (em meses) de término planejado de cada fase"""
+    return [fim / DIAS_POR_MES for fim in model.fim_planejado]
+
+
+def _batch_numpy(model: SimulationModel, rng, n: int):
+    """Uma rodada vetorizada: (conclusões n x fases, metas atingidas kpis x fases, valores finais n x kpis)"""
+    itens = np.asarray(model.itens)
+    membership = np.zeros((len(itens), len(model.fases)))
+    membership[np.arange(len(itens)), model.item_fase] = 1.0
+    nominal_fase = itens @ membership
+
+    amostras = _sample_numpy(rng, model.duracao, (n, len(itens))) * itens
+    duracoes = (amostras @ membership) / nominal_fase * np.asarray(model.duracao_fase)
+    conclusoes = np.cumsum(duracoes, axis=1)
+
+    checkpoints = np.asarray(_checkpoints(model))
+    meses = int(math.ceil(checkpoints.max()))
+    k = np.minimum(np.floor(checkpoints).astype(int), meses - 1)
+    frac = checkpoints - k
+
+    atingidas = np.zeros((len(model.kpis), len(model.fases)), dtype=np.int64)
+    finais = np.empty((n, len(model.kpis)), dtype=np.float32)
+    for j, (atual, meta, spec, modo) in enumerate(zip(model.atual, model.meta, model.crescimento, model.modelo)):
+        taxas = _sample_numpy(rng, spec, (n, meses))
+        passos = np.log1p(np.maximum(taxas, -0.99)) if modo == "composto" else taxas
+        acumulado = np.concatenate([np.zeros((n, 1)), np.cumsum(passos, axis=1)], axis=1)
+        # Interpolação entre meses inteiros para fases que terminam no meio do mês
+        no_checkpoint = acumulado[:, k] + frac * (acumulado[:, k + 1] - acumulado[:, k])
+        valores = atual * np.exp(no_checkpoint) if modo == "composto" else atual + no_checkpoint
+        atingidas[j] = (valores >= meta).sum(axis=0) if meta >= atual else (valores <= meta).sum(axis=0)
+        finais[:, j] = valores[:, -1]
+
+    return conclusoes.astype(np.float32), atingidas, finais
+
+
+def _batch_python(model: SimulationModel, rnd: random.Random, n: int):
+    """Mesma rodada em Python puro, usada sem NumPy"""
+    nominal_fase = [0.0] * len(model.fases)
+    for nominal, fase in zip(model.itens, model.item_fase):
+        nominal_fase[fase] += nominal
+    checkpoints = _checkpoints(model)
+    meses = int(math.ceil(max(checkpoints)))
+
+    conclusoes, finais = [], []
+    atingidas = [[0] * len(model.fases) for _ in model.kpis]
+    for _ in range(n):
+        trabalho = [0.0] * len(model.fases)
+        for nominal, fase in zip(model.itens, model.item_fase):
+            trabalho[fase] += nominal * _sample_python(rnd, model.duracao)
+        total, linha = 0.0, []
+        for i, planejada in enumerate(model.duracao_fase):
+            total += trabalho[i] / nominal_fase[i] * planejada
+            linha.append(total)
+        conclusoes.append(linha)
+
+        valores_finais = []
+        for j, (atual, meta, spec, modo) in enumerate(zip(model.atual, model.meta, model.crescimento, model.modelo)):
+            acumulado = [0.0]
+            for _ in range(meses):
+                taxa = _sample_python(rnd, spec)
+                acumulado.append(acumulado[-1] + (math.log1p(max(taxa, -0.99)) if modo == "composto" else taxa))
+            valor = atual
+            for i, t in enumerate(checkpoints):
+                k = min(int(t), meses - 1)
+                no_checkpoint = acumulado[k] + (t - k) * (acumulado[k + 1] - acumulado[k])
+                valor = atual * math.exp(no_checkpoint) if modo == "composto" else atual + no_checkpoint
+                if (valor >= meta) if meta >= atual else (valor <= meta):
+                    atingidas[j][i] += 1
+            valores_finais.append(valor)
+        finais.append(valores_finais)
+
+    return conclusoes, atingidas, finais
+
+
+def run_shard(model: SimulationModel, trials: int, seed, batch_size: int = BATCH_SIZE):
+    """Executa `trials` tentativas em lotes; roda em um worker quando a simulação é dividida"""
+    if np is None:
+        return _batch_python(model, random.Random(seed), trials)
+
+    rng = np.random.default_rng(seed)
+    conclusoes, finais = [], []
+    atingidas = np.zeros((len(model.kpis), len(model.fases)), dtype=np.int64)
+    for inicio in range(0, trials, batch_size):
+        c, a, f = _batch_numpy(model, rng, min(batch_size, trials - inicio))
+        conclusoes.append(c)
+        atingidas += a
+        finais.append(f)
+    return np.concatenate(conclusoes), atingidas, np.concatenate(finais)
+
+
+def _percentiles(columns) -> List[Dict[str, float]]:
+    """Média e percentis de cada coluna"""
+    if np is not None:
+        columns = np.asarray(columns, dtype=np.float64)
+        if columns.shape[0] == 0:
+            return []
+        valores = np.percentile(columns, PERCENTIS, axis=0)
+        medias = columns.mean(axis=0)
+        return [{"media": float(medias[i]), **{f"p{p}": float(valores[k, i]) for k, p in enumerate(PERCENTIS)}}
+                for i in range(columns.shape[1])]
+
+    resultado = []
+    for coluna in zip(*columns):
+        ordenada = sorted(coluna)
+        resultado.append({"media": sum(ordenada) / len(ordenada),
+                          **{f"p{p}": ordenada[min(len(ordenada) - 1, int(p / 100 * len(ordenada)))]
+                             for p in PERCENTIS}})
+    return resultado
+
+
+def simulate(model: SimulationModel, trials: int = 100_000, seed: Optional[int] = None,
+             workers: int = 1, batch_size: int = BATCH_SIZE) -> Dict:
+    """
+    Roda a simulação e devolve, por fase, a distribuição do dia de conclusão e
+    a probabilidade de terminar no prazo; por KPI, a probabilidade de atingir
+    a meta até o fim planejado de cada fase e os percentis do valor final.
+    Com workers > 1 as tentativas são divididas entre processos, cada um com
+    sua própria semente derivada de `seed`.
+    """
+    if trials < 1:
+        raise ValueError("O número de tentativas deve ser positivo")
+    inicio = time.perf_counter()
+    workers = max(1, min(workers or os.cpu_count() or 1, trials))
+
+    if np is not None:
+        seeds = np.random.SeedSequence(seed).spawn(workers)
+    else:
+        base = random.Random(seed)
+        seeds = [base.getrandbits(64) for _ in range(workers)]
+    shards = [trials // workers + (1 if i < trials % workers else 0) for i in range(workers)]
+
+    if workers == 1:
+        partes = [run_shard(model, trials, seeds[0], batch_size)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            partes = list(executor.map(run_shard, [model] * workers, shards, seeds, [batch_size] * workers))
+
+    if np is not None:
+        conclusoes = np.concatenate([p[0] for p in partes])
+        atingidas = sum(p[1] for p in partes).tolist()
+        finais = np.concatenate([p[2] for p in partes])
+        no_prazo = (conclusoes <= np.asarray(model.fim_planejado, dtype=np.float32)).mean(axis=0).tolist()
+    else:
+        conclusoes = [linha for p in partes for linha in p[0]]
+        atingidas = [[sum(p[1][j][i] for p in partes) for i in range(len(model.fases))]
+                     for j in range(len(model.kpis))]
+        finais = [linha for p in partes for linha in p[2]]
+        no_prazo = [sum(1 for linha in conclusoes if linha[i] <= fim) / trials
+                    for i, fim in enumerate(model.fim_planejado)]
+
+    fases = [
+        {"fase": nome, "fim_planejado": fim, "prob_no_prazo": prob, "conclusao": dist}
+        for nome, fim, prob, dist in zip(model.fases, model.fim_planejado, no_prazo, _percentiles(conclusoes))
+    ]
+    kpis = [
+        {
+            "nome": nome,
+            "atual": atual,
+            "meta": meta,
+            "prob_meta": {fase: contagem / trials for fase, contagem in zip(model.fases, atingidas[j])},
+            "valor_final": dist
+        }
+        for j, (nome, atual, meta, dist) in enumerate(zip(model.kpis, model.atual, model.meta,
+                                                          _percentiles(finais)))
+    ]
+    return {
+        "tentativas": trials,
+        "workers": workers,
+        "vetorizado": np is not None,
+        "segundos": round(time.perf_counter() - inicio, 3),
+        "fases": fases,
+        "kpis": kpis,
+        "kpis_ignorados": model.ignorados
+    }
+
+
+def print_simulation(result: Dict):
+    """Exibe o resultado da simulação"""
+    modo = "NumPy" if result["vetorizado"] else "Python puro"
+    print(f"🎲 {result['tentativas']:,} tentativas em {result['segundos']}s ({modo}, {result['workers']} worker(s))")
+
+    print(f"\n{'Fase':<16} {'Prazo':>6} {'No prazo':>9} {'P10':>7} {'P50':>7} {'P90':>7}")
+    for fase in result["fases"]:
+        c = fase["conclusao"]
+        print(f"{fase['fase']:<16} {fase['fim_planejado']:>6} {fase['prob_no_prazo']:>8.1%} "
+              f"{c['p10']:>7.1f} {c['p50']:>7.1f} {c['p90']:>7.1f}")
+
+    if result["kpis_ignorados"]:
+        print(f"\nℹ️ KPIs sem atual/meta simuláveis (informe-os em --targets): {', '.join(result['kpis_ignorados'])}")
+    for kpi in result["kpis"]:
+        print(f"\n📊 {kpi['nome']}: {kpi['atual']:g} → meta {kpi['meta']:g} "
+              f"(P50 final {kpi['valor_final']['p50']:.4g})")
+        for fase, prob in kpi["prob_meta"].items():
+            print(f"   • até {fase}: {prob:.1%}")
@@ -0,0 +1,1010 @@
+#!/usr/bin/env python3
+"""
+DIREX - Camada de Persistência
+Backends plugáveis para salvar e carregar o estado do DirexAgent.
+"""
+
+import json
+import os
+import sqlite3
+import struct
+import threading
+import time
+from collections.abc import Mapping
+from contextlib import closing
+from datetime import datetime
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+import direx_metrics
+from direx_metrics import instrumented, record_bytes
+from direx_serializers import (SNAPSHOT_EXTENSIONS, atomic_write, default_format, file_extension, read_snapshot,
+                               write_snapshot)
+
+if TYPE_CHECKING:  # concurrent.futures só é importado quando uma QueuedStorage é usada
+    from concurrent.futures import Future
+
+try:
+    import fcntl
+except ImportError:  # Windows: trava por arquivo criado com O_EXCL
+    fcntl = None
+
+# Seções de lista que compõem o estado do DirexAgent
+SECTIONS = ("okrs", "kpis", "roadmap", "weekly_plan", "tasks")
+
+# Espera pela trava de escrita dos bancos SQLite quando há vários processos/threads
+BUSY_TIMEOUT = 30.0
+
+# Métodos dos backends medidos quando as métricas estão ligadas (ver direx_metrics)
+PERSISTENCE_METHODS = ("save", "load", "load_latest", "latest_ref", "open_sections")
+
+
+def empty_state() -> Dict:
+    """Retorna um estado vazio no formato do snapshot JSON"""
+    state = {"business_objective": None}
+    for section in SECTIONS:
+        state[section] = []
+    return state
+
+
+def export_json(data: Dict, filename: str) -> str:
+    """Exporta o estado no formato de snapshot JSON do DIREX"""
+    atomic_write(filename, json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8"))
+    return filename
+
+
+def import_json(filename: str) -> Dict:
+    """Importa um snapshot do DIREX (JSON, msgpack ou comprimido; formato detectado pelo conteúdo)"""
+    data = read_snapshot(filename)
+
+    state = empty_state()
+    state["business_objective"] = data.get("business_objective")
+    for section in SECTIONS:
+        state[section] = data.get(section, [])
+    if "timestamp" in data:
+        state["timestamp"] = data["timestamp"]
+    return state
+
+
+class FileLock:
+    """
+    Trava consultiva entre processos sobre `path` (fcntl.flock quando disponível).
+    Uso: `with FileLock(caminho): ...`; shared=True permite vários leitores.
+    """
+
+    def __init__(self, path: str, shared: bool = False, timeout: float = 30.0):
+        self.path = path
+        self.shared = shared
+        self.timeout = timeout
+        self._fd: Optional[int] = None
+
+    def __enter__(self) -> "FileLock":
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        if fcntl is not None:
+            self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            fcntl.flock(self._fd, fcntl.LOCK_SH if self.shared else fcntl.LOCK_EX)
+            return self
+
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                self._fd = os.open(self.path + ".excl", os.O_CREAT | os.O_EXCL | os.O_RDWR)
+                return self
+            except FileExistsError:
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"Não foi possível obter a trava {self.path}")
+                time.sleep(0.01)
+
+    def __exit__(self, *exc):
+        if fcntl is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+        else:
+            os.close(self._fd)
+            os.remove(self.path + ".excl")
+        self._fd = None
+
+
+def next_snapshot_id(data_dir: str) -> str:
+    """
+    ID único e monotônico para um snapshot em `data_dir`: <timestamp>_<seq>, com
+    a sequência compartilhada por todos os processos via arquivo SEQ travado.
+    O timestamp é lido com a trava, então a ordem dos nomes segue a da sequência.
+    """
+    seq_path = os.path.join(data_dir, "SEQ")
+    with FileLock(os.path.join(data_dir, ".direx.lock")):
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        try:
+            with open(seq_path, "r", encoding="utf-8") as f:
+                seq = int(f.read().strip() or 0) + 1
+        except FileNotFoundError:
+            seq = 1
+        with open(seq_path + ".tmp", "w", encoding="utf-8") as f:
+            f.write(str(seq))
+        os.replace(seq_path + ".tmp", seq_path)
+    return f"{timestamp}_{seq:08d}"
+
+
+def _looks_complete(path: str) -> bool:
+    """Descarta arquivos vazios e JSON sem o fechamento final (gravações interrompidas)"""
+    try:
+        size = os.path.getsize(path)
+        if size == 0:
+            return False
+        if path.endswith(".json"):
+            with open(path, "rb") as f:
+                f.seek(max(0, size - 64))
+                return f.read().rstrip().endswith(b"}")
+        return True
+    except OSError:
+        return False
+
+
+class SnapshotSections:
+    """
+    Acesso por seção a um snapshot já carregado em memória.
+    Backends que conseguem ler seções isoladamente devolvem subclasses que só
+    desserializam a seção pedida.
+    """
+
+    def __init__(self, data: Dict):
+        self._data = data
+        self.header = {"business_objective": data.get("business_objective"),
+                       "timestamp": data.get("timestamp")}
+        self.counts = {section: len(data.get(section) or []) for section in SECTIONS}
+
+    def load_section(self, section: str) -> List:
+        """Retorna a lista de uma seção"""
+        return self._data.get(section) or []
+
+
+@instrumented(*PERSISTENCE_METHODS)
+class StorageBackend:
+    """
+    Interface comum dos backends de persistência.
+    Um backend recebe o estado como dict (mesmo formato do snapshot JSON)
+    e devolve uma referência textual que permite recarregá-lo depois.
+    """
+
+    def save(self, data: Dict) -> str:
+        """Persiste o estado e retorna a referência do snapshot"""
+        raise NotImplementedError
+
+    def load(self, ref: str) -> Dict:
+        """Carrega o snapshot identificado por `ref`"""
+        raise NotImplementedError
+
+    def latest_ref(self) -> Optional[str]:
+        """Retorna a referência do snapshot mais recente ou None se não houver"""
+        raise NotImplementedError
+
+    def load_latest(self) -> Optional[Dict]:
+        """Carrega o snapshot mais recente ou None se não houver"""
+        ref = self.latest_ref()
+        return self.load(ref) if ref is not None else None
+
+    def open_sections(self, ref: str) -> SnapshotSections:
+        """Abre o snapshot para leitura seção a seção (padrão: carrega tudo)"""
+        return SnapshotSections(self.load(ref))
+
+
+@instrumented(*PERSISTENCE_METHODS)
+class FileSnapshotStorage(StorageBackend):
+    """
+    Um arquivo direx_data_<timestamp><extensão> por salvamento, no formato e
+    compressão escolhidos (ver direx_serializers). A leitura detecta o formato
+    pelo conteúdo, então diretórios com formatos misturados continuam legíveis.
+    """
+
+    def __init__(self, data_dir: str = "direx_data", formato: Optional[str] = None,
+                 compressao: Optional[str] = None):
+        self.data_dir = data_dir
+        self.formato = formato or default_format()
+        self.compressao = compressao
+        self.extension = file_extension(self.formato, compressao)
+
+    def save(self, data: Dict) -> str:
+        # ID único mesmo com vários processos salvando no mesmo segundo
+        snapshot_id = next_snapshot_id(self.data_dir)
+        filename = os.path.join(self.data_dir, f"direx_data_{snapshot_id}{self.extension}")
+        return write_snapshot(data, filename, self.formato, self.compressao)
+
+    def load(self, ref: str) -> Dict:
+        return import_json(ref)
+
+    def latest_ref(self) -> Optional[str]:
+        if not os.path.isdir(self.data_dir):
+            return None
+
+        files = [f for f in os.listdir(self.data_dir)
+                 if f.startswith("direx_data_") and f.endswith(SNAPSHOT_EXTENSIONS)]
+        if not files:
+            return None
+
+        files.sort(reverse=True)
+        for name in files:
+            path = os.path.join(self.data_dir, name)
+            if _looks_complete(path):
+                return path
+        return None
+
+
+class JsonSnapshotStorage(FileSnapshotStorage):
+    """Backend original: um arquivo direx_data_<timestamp>.json indentado por salvamento"""
+
+    def __init__(self, data_dir: str = "direx_data"):
+        super().__init__(data_dir, formato="json-indentado")
+
+
+@instrumented(*PERSISTENCE_METHODS)
+class SQLiteStorage(StorageBackend):
+    """
+    Backend SQLite embarcado.
+    Cada salvamento vira uma linha em `snapshots` e as seções ficam em tabelas
+    próprias indexadas por (snapshot_id, posicao). Salvar escreve apenas o estado
+    atual e carregar o último snapshot é uma busca pela chave primária, então o
+    custo não cresce com o tamanho do histórico.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS snapshots (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_snapshots_timestamp ON snapshots(timestamp);
+
+        CREATE TABLE IF NOT EXISTS objectives (
+            snapshot_id INTEGER PRIMARY KEY REFERENCES snapshots(id) ON DELETE CASCADE,
+            texto TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_objectives_texto ON objectives(texto);
+
+        CREATE TABLE IF NOT EXISTS okrs (
+            snapshot_id INTEGER NOT NULL REFERENCES snapshots(id) ON DELETE CASCADE,
+            posicao INTEGER NOT NULL,
+            tipo TEXT,
+            objetivo TEXT,
+            periodo TEXT,
+            status TEXT,
+            dados TEXT NOT NULL,
+            PRIMARY KEY (snapshot_id, posicao)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS idx_okrs_status ON okrs(status);
+
+        CREATE TABLE IF NOT EXISTS kpis (
+            snapshot_id INTEGER NOT NULL REFERENCES snapshots(id) ON DELETE CASCADE,
+            posicao INTEGER NOT NULL,
+            nome TEXT,
+            categoria TEXT,
+            frequencia TEXT,
+            dados TEXT NOT NULL,
+            PRIMARY KEY (snapshot_id, posicao)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS idx_kpis_nome ON kpis(nome);
+
+        CREATE TABLE IF NOT EXISTS roadmap_phases (
+            snapshot_id INTEGER NOT NULL REFERENCES snapshots(id) ON DELETE CASCADE,
+            posicao INTEGER NOT NULL,
+            fase TEXT,
+            periodo TEXT,
+            status TEXT,
+            dados TEXT NOT NULL,
+            PRIMARY KEY (snapshot_id, posicao)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS idx_roadmap_phases_fase ON roadmap_phases(fase);
+
+        CREATE TABLE IF NOT EXISTS weekly_plans (
+            snapshot_id INTEGER NOT NULL REFERENCES snapshots(id) ON DELETE CASCADE,
+            posicao INTEGER NOT NULL,
+            dia TEXT,
+            foco TEXT,
+            status TEXT,
+            dados TEXT NOT NULL,
+            PRIMARY KEY (snapshot_id, posicao)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS idx_weekly_plans_dia ON weekly_plans(dia);
+
+        CREATE TABLE IF NOT EXISTS tasks (
+            snapshot_id INTEGER NOT NULL REFERENCES snapshots(id) ON DELETE CASCADE,
+            posicao INTEGER NOT NULL,
+            titulo TEXT,
+            dados TEXT NOT NULL,
+            PRIMARY KEY (snapshot_id, posicao)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS idx_tasks_titulo ON tasks(titulo);
+    """
+
+    # seção -> (tabela, colunas indexáveis extraídas de cada item)
+    TABLES = {
+        "okrs": ("okrs", ("tipo", "objetivo", "periodo", "status")),
+        "kpis": ("kpis", ("nome", "categoria", "frequencia")),
+        "roadmap": ("roadmap_phases", ("fase", "periodo", "status")),
+        "weekly_plan": ("weekly_plans", ("dia", "foco", "status")),
+        "tasks": ("tasks", ("titulo",)),
+    }
+
+    BUSY_TIMEOUT = BUSY_TIMEOUT
+
+    # PRAGMA user_version depois da importação dos snapshots JSON legados
+    SCHEMA_VERSION = 1
+
+    def __init__(self, db_path: str = os.path.join("direx_data", "direx.db"), import_legacy: bool = True):
+        self.db_path = db_path
+        # Na criação do banco, importa os direx_data_*.json deixados pelo backend JSON original
+        self.import_legacy = import_legacy
+        self._schema_ready = False
+
+    def _connect(self) -> sqlite3.Connection:
+        """Abre uma conexão (uma por operação, seguro entre threads)"""
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # Com vários processos no mesmo banco, espera a trava em vez de falhar com "database is locked"
+        conn = sqlite3.connect(self.db_path, timeout=self.BUSY_TIMEOUT)
+        conn.execute("PRAGMA foreign_keys = ON")
+        if not self._schema_ready:
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.executescript(self.SCHEMA)
+            if conn.execute("PRAGMA user_version").fetchone()[0] < self.SCHEMA_VERSION:
+                self._migrate(conn)
+            self._schema_ready = True
+        return conn
+
+    def _legacy_files(self) -> List[str]:
+        """Snapshots direx_data_* completos no diretório do banco, do mais antigo ao mais recente"""
+        directory = os.path.dirname(self.db_path) or "."
+        if not os.path.isdir(directory):
+            return []
+        names = sorted(f for f in os.listdir(directory)
+                       if f.startswith("direx_data_") and f.endswith(SNAPSHOT_EXTENSIONS))
+        return [path for path in (os.path.join(directory, name) for name in names) if _looks_complete(path)]
+
+    def _migrate(self, conn: sqlite3.Connection):
+        """
+        Primeira abertura do banco: importa os snapshots JSON legados (só se o
+        banco ainda não tiver snapshots, para não passá-los à frente de
+        salvamentos mais novos) e marca o banco como migrado. A transação
+        IMMEDIATE impede que dois processos importem em dobro.
+        """
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            if conn.execute("PRAGMA user_version").fetchone()[0] >= self.SCHEMA_VERSION:
+                return
+            if self.import_legacy and conn.execute("SELECT 1 FROM snapshots LIMIT 1").fetchone() is None:
+                for path in self._legacy_files():
+                    self._insert(conn, import_json(path))
+            conn.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+
+    @staticmethod
+    def _column_value(item, column: str):
+        """Extrai o valor de uma coluna indexável de um item da seção"""
+        if isinstance(item, Mapping):
+            value = item.get(column)
+            if column == "titulo" and value is None:
+                value = item.get("tarefa")
+        elif column == "titulo":
+            value = item
+        else:
+            value = None
+        return value if value is None or isinstance(value, (str, int, float)) else str(value)
+
+    def _rows(self, data: Dict) -> Dict[str, List[tuple]]:
+        """Linhas de cada tabela de seção: colunas indexáveis + item serializado"""
+        rows = {}
+        for section, (table, columns) in self.TABLES.items():
+            rows[section] = [
+                (*(self._column_value(item, c) for c in columns), json.dumps(item, ensure_ascii=False))
+                for item in data.get(section) or []
+            ]
+        if direx_metrics.enabled():
+            record_bytes("escrita", "sqlite", sum(len(row[-1]) for section_rows in rows.values()
+                                                  for row in section_rows))
+        return rows
+
+    def _insert(self, conn: sqlite3.Connection, data: Dict, rows: Optional[Dict[str, List[tuple]]] = None) -> int:
+        """Grava um snapshot na transação aberta em `conn` e retorna seu id"""
+        rows = rows if rows is not None else self._rows(data)
+        timestamp = data.get("timestamp") or datetime.now().strftime("%Y%m%d_%H%M%S")
+        cursor = conn.execute("INSERT INTO snapshots (timestamp) VALUES (?)", (timestamp,))
+        snapshot_id = cursor.lastrowid
+        conn.execute(
+            "INSERT INTO objectives (snapshot_id, texto) VALUES (?, ?)",
+            (snapshot_id, data.get("business_objective"))
+        )
+
+        for section, (table, columns) in self.TABLES.items():
+            if not rows[section]:
+                continue
+            placeholders = ", ".join("?" * (len(columns) + 3))
+            sql = f"INSERT INTO {table} (snapshot_id, posicao, {', '.join(columns)}, dados) VALUES ({placeholders})"
+            conn.executemany(sql, ((snapshot_id, posicao, *row) for posicao, row in enumerate(rows[section])))
+        return snapshot_id
+
+    def save(self, data: Dict) -> str:
+        # Serializa antes de abrir a transação para segurar a trava de escrita o mínimo possível
+        rows = self._rows(data)
+        with closing(self._connect()) as conn, conn:
+            conn.execute("BEGIN IMMEDIATE")
+            snapshot_id = self._insert(conn, data, rows)
+        return f"{self.db_path}#{snapshot_id}"
+
+    def _read_snapshot(self, conn: sqlite3.Connection, snapshot_id: int) -> Dict:
+        """Remonta o estado de um snapshot a partir das tabelas"""
+        row = conn.execute(
+            "SELECT s.timestamp, o.texto FROM snapshots s "
+            "LEFT JOIN objectives o ON o.snapshot_id = s.id WHERE s.id = ?",
+            (snapshot_id,)
+        ).fetchone()
+        if row is None:
+            raise KeyError(f"Snapshot {snapshot_id} não encontrado em {self.db_path}")
+
+        state = empty_state()
+        state["timestamp"], state["business_objective"] = row
+        for section, (table, _) in self.TABLES.items():
+            state[section] = self._read_section(conn, table, snapshot_id)
+        return state
+
+    @staticmethod
+    def _read_section(conn: sqlite3.Connection, table: str, snapshot_id: int) -> List:
+        cursor = conn.execute(f"SELECT dados FROM {table} WHERE snapshot_id = ? ORDER BY posicao", (snapshot_id,))
+        if not direx_metrics.enabled():
+            return [json.loads(dados) for (dados,) in cursor]
+
+        items = []
+        total = 0
+        for (dados,) in cursor:
+            total += len(dados)
+            items.append(json.loads(dados))
+        record_bytes("leitura", "sqlite", total)
+        return items
+
+    def load(self, ref: str) -> Dict:
+        _, _, snapshot_id = ref.rpartition("#")
+        with closing(self._connect()) as conn:
+            return self._read_snapshot(conn, int(snapshot_id))
+
+    def _exists(self) -> bool:
+        """Se há banco (ou snapshots legados que a primeira conexão vai importar)"""
+        return os.path.exists(self.db_path) or (self.import_legacy and bool(self._legacy_files()))
+
+    def latest_ref(self) -> Optional[str]:
+        if not self._exists():
+            return None
+
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT id FROM snapshots ORDER BY id DESC LIMIT 1").fetchone()
+        return f"{self.db_path}#{row[0]}" if row else None
+
+    def open_sections(self, ref: str) -> SnapshotSections:
+        """Lê cabeçalho e contagens; cada seção só é consultada quando pedida"""
+        return SQLiteSections(self, int(ref.rpartition("#")[2]))
+
+    def list_snapshots(self, limit: int = 20, since: int = 0) -> List[Dict]:
+        """Lista os snapshots mais recentes (id e timestamp), só os de id maior que `since`"""
+        if not self._exists():
+            return []
+
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT id, timestamp FROM snapshots WHERE id > ? ORDER BY id DESC LIMIT ?", (since, limit)
+            ).fetchall()
+        return [{"id": snapshot_id, "timestamp": timestamp} for snapshot_id, timestamp in rows]
+
+    def import_snapshots(self, source: str) -> int:
+        """
+        Importa um snapshot avulso (JSON ou outro formato de direx_serializers)
+        ou, se `source` for um diretório, os direx_data_* dele em ordem
+        cronológica, em uma única transação. Retorna quantos foram importados.
+        """
+        if os.path.isdir(source):
+            names = sorted(f for f in os.listdir(source)
+                           if f.startswith("direx_data_") and f.endswith(SNAPSHOT_EXTENSIONS))
+            files = [path for path in (os.path.join(source, name) for name in names) if _looks_complete(path)]
+        else:
+            files = [source]
+
+        snapshots = [import_json(path) for path in files]
+        with closing(self._connect()) as conn, conn:
+            conn.execute("BEGIN IMMEDIATE")
+            for data in snapshots:
+                self._insert(conn, data)
+        return len(snapshots)
+
+
+class SQLiteSections(SnapshotSections):
+    """Seções de um snapshot SQLite carregadas sob demanda"""
+
+    def __init__(self, storage: SQLiteStorage, snapshot_id: int):
+        self._storage = storage
+        self._snapshot_id = snapshot_id
+
+        with closing(storage._connect()) as conn:
+            row = conn.execute(
+                "SELECT s.timestamp, o.texto FROM snapshots s "
+                "LEFT JOIN objectives o ON o.snapshot_id = s.id WHERE s.id = ?",
+                (snapshot_id,)
+            ).fetchone()
+            if row is None:
+                raise KeyError(f"Snapshot {snapshot_id} não encontrado em {storage.db_path}")
+            self.header = {"timestamp": row[0], "business_objective": row[1]}
+            self.counts = {
+                section: conn.execute(f"SELECT COUNT(*) FROM {table} WHERE snapshot_id = ?",
+                                      (snapshot_id,)).fetchone()[0]
+                for section, (table, _) in storage.TABLES.items()
+            }
+
+    def load_section(self, section: str) -> List:
+        table, _ = self._storage.TABLES[section]
+        with closing(self._storage._connect()) as conn:
+            return self._storage._read_section(conn, table, self._snapshot_id)
+
+
+@instrumented(*PERSISTENCE_METHODS)
+class DeltaLogStorage(StorageBackend):
+    """
+    Backend incremental: um snapshot base mais um log de alterações append-only.
+    Cada salvamento grava apenas os campos que mudaram desde o salvamento anterior.
+    Quando o log passa de `compact_every` registros, uma thread em segundo plano
+    incorpora o log ao snapshot base.
+    """
+
+    BASE_FILE = "direx_base.json"
+    LOG_FILE = "direx_changes.log"
+
+    def __init__(self, data_dir: str = "direx_data", compact_every: int = 200):
+        self.data_dir = data_dir
+        self.base_path = os.path.join(data_dir, self.BASE_FILE)
+        self.log_path = os.path.join(data_dir, self.LOG_FILE)
+        self.compact_every = compact_every
+        self._lock = threading.Lock()
+        self._compactor: Optional[threading.Thread] = None
+        self._state: Optional[Dict] = None
+        self._encoded: Dict[str, List[str]] = {}
+        self._seq = 0
+        self._log_records = 0
+        self._log_valid_size = 0
+
+    @staticmethod
+    def _encode(item) -> str:
+        return json.dumps(item, ensure_ascii=False, sort_keys=True)
+
+    def _read_base(self) -> Dict:
+        """Lê o snapshot base (estado vazio com seq 0 se ainda não existir)"""
+        if not os.path.exists(self.base_path):
+            state = empty_state()
+            state["seq"] = 0
+            return state
+
+        with open(self.base_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _read_log(self):
+        """
+        Itera sobre os registros do log de alterações. A leitura para no
+        primeiro registro incompleto (sem a quebra de linha final ou com JSON
+        inválido); self._log_valid_size guarda onde termina o último completo.
+        """
+        self._log_valid_size = 0
+        if not os.path.exists(self.log_path):
+            return
+
+        with open(self.log_path, 'rb') as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    # Registro truncado por falha durante a escrita
+                    break
+                if line.strip():
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        break
+                    yield record
+                self._log_valid_size += len(line)
+
+    def _repair_log(self):
+        """
+        Corta do log o registro incompleto deixado por uma falha, para que o
+        próximo append comece em uma linha nova em vez de colar nele
+        """
+        if os.path.exists(self.log_path) and os.path.getsize(self.log_path) > self._log_valid_size:
+            with open(self.log_path, 'r+b') as f:
+                f.truncate(self._log_valid_size)
+
+    @staticmethod
+    def _apply_changes(state: Dict, changes: List[Dict]):
+        """Aplica uma lista de alterações ao estado, no lugar"""
+        for change in changes:
+            op = change["op"]
+            if op == "objective":
+                state["business_objective"] = change["value"]
+                continue
+
+            items = state.setdefault(change["section"], [])
+            if op == "truncate":
+                del items[change["length"]:]
+            elif op == "set":
+                index = change["index"]
+                if index < len(items):
+                    items[index] = change["item"]
+                else:
+                    items.append(change["item"])
+            elif op == "patch":
+                item = items[change["index"]]
+                item.update(change.get("fields", {}))
+                for key in change.get("removed", []):
+                    item.pop(key, None)
+
+    def _diff(self, data: Dict) -> List[Dict]:
+        """Calcula as alterações entre o último estado salvo e `data`"""
+        changes = []
+        if data.get("business_objective") != self._state.get("business_objective"):
+            changes.append({"op": "objective", "value": data.get("business_objective")})
+
+        for section in SECTIONS:
+            new_items = data.get(section) or []
+            old_items = self._state.get(section, [])
+            old_encoded = self._encoded.setdefault(section, [self._encode(i) for i in old_items])
+
+            for index, item in enumerate(new_items):
+                encoded = self._encode(item)
+                if index < len(old_encoded) and old_encoded[index] == encoded:
+                    continue
+
+                old = old_items[index] if index < len(old_items) else None
+                # Mesma normalização do estado salvo (tuplas viram listas), para não gerar patches espúrios
+                item = json.loads(json.dumps(item, ensure_ascii=False))
+                if isinstance(item, Mapping) and isinstance(old, Mapping):
+                    fields = {k: v for k, v in item.items() if k not in old or old[k] != v}
+                    removed = [k for k in old if k not in item]
+                    change = {"op": "patch", "section": section, "index": index, "fields": fields}
+                    if removed:
+                        change["removed"] = removed
+                    changes.append(change)
+                else:
+                    changes.append({"op": "set", "section": section, "index": index, "item": item})
+
+            if len(new_items) < len(old_items):
+                changes.append({"op": "truncate", "section": section, "length": len(new_items)})
+
+        return changes
+
+    def _ensure_loaded(self):
+        """Carrega base + log na primeira utilização"""
+        if self._state is not None:
+            return
+
+        state = self._read_base()
+        self._seq = state.pop("seq", 0)
+        self._log_records = 0
+        for record in self._read_log():
+            if record["seq"] <= self._seq:
+                continue
+            self._apply_changes(state, record["changes"])
+            self._seq = record["seq"]
+            self._log_records += 1
+        self._repair_log()
+        self._state = state
+        self._encoded = {}
+
+    def _remember(self, data: Dict):
+        """Guarda uma cópia do estado salvo para o próximo diff"""
+        copied = json.loads(json.dumps(data, ensure_ascii=False))
+        self._state = empty_state()
+        self._state["business_objective"] = copied.get("business_objective")
+        for section in SECTIONS:
+            self._state[section] = copied.get(section) or []
+        self._encoded = {section: [self._encode(i) for i in self._state[section]] for section in SECTIONS}
+
+    def save(self, data: Dict) -> str:
+        with self._lock:
+            self._ensure_loaded()
+            changes = self._diff(data)
+            if changes:
+                self._seq += 1
+                record = {
+                    "seq": self._seq,
+                    "timestamp": data.get("timestamp") or datetime.now().strftime("%Y%m%d_%H%M%S"),
+                    "changes": changes
+                }
+                os.makedirs(self.data_dir, exist_ok=True)
+                line = json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+                with open(self.log_path, 'a', encoding='utf-8') as f:
+                    f.write(line)
+                record_bytes("escrita", "delta_log", len(line))
+                self._log_records += 1
+                self._remember(data)
+            ref = f"{self.log_path}#{self._seq}"
+            should_compact = self._log_records >= self.compact_every
+
+        if should_compact:
+            self.compact(background=True)
+        return ref
+
+    def load(self, ref: str) -> Dict:
+        _, _, seq = ref.rpartition("#")
+        target = int(seq)
+
+        with self._lock:
+            state = self._read_base()
+            base_seq = state.pop("seq", 0)
+            if target < base_seq:
+                raise KeyError(f"Alteração {target} já foi compactada no snapshot base (seq {base_seq})")
+
+            for record in self._read_log():
+                if record["seq"] <= base_seq:
+                    continue
+                if record["seq"] > target:
+                    break
+                self._apply_changes(state, record["changes"])
+                state["timestamp"] = record["timestamp"]
+        return state
+
+    def latest_ref(self) -> Optional[str]:
+        with self._lock:
+            self._ensure_loaded()
+            if self._seq == 0 and not os.path.exists(self.base_path):
+                return None
+            return f"{self.log_path}#{self._seq}"
+
+    def compact(self, background: bool = False):
+        """Incorpora o log de alterações ao snapshot base"""
+        if background:
+            if self._compactor is not None and self._compactor.is_alive():
+                return
+            self._compactor = threading.Thread(target=self.compact, name="direx-compactor", daemon=True)
+            self._compactor.start()
+            return
+
+        with self._lock:
+            self._ensure_loaded()
+            base = json.loads(json.dumps(self._state, ensure_ascii=False))
+            base["seq"] = self._seq
+
+        # A escrita do novo base acontece fora do lock; salvamentos concorrentes
+        # continuam anexando ao log normalmente
+        tmp_path = self.base_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(base, f, ensure_ascii=False, separators=(",", ":"))
+            # O base precisa estar no disco antes do rename e do corte do log
+            f.flush()
+            os.fsync(f.fileno())
+
+        with self._lock:
+            pending = [r for r in self._read_log() if r["seq"] > base["seq"]]
+            os.replace(tmp_path, self.base_path)
+
+            tmp_log = self.log_path + ".tmp"
+            with open(tmp_log, 'w', encoding='utf-8') as f:
+                for record in pending:
+                    f.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_log, self.log_path)
+            self._log_records = len(pending)
+
+    def wait_for_compaction(self):
+        """Aguarda a compactação em segundo plano terminar"""
+        if self._compactor is not None:
+            self._compactor.join()
+
+
+# Formato .direx: MAGIC | tamanho do cabeçalho (uint32) | cabeçalho JSON | blobs das seções
+SECTIONED_MAGIC = b"DIREX\x01"
+_HEADER_LENGTH = struct.Struct("<I")
+
+
+def write_sectioned(data: Dict, filename: str) -> str:
+    """
+    Grava um snapshot em contêiner com tabela de offsets: o cabeçalho traz o
+    objetivo, o timestamp, as contagens e (offset, tamanho) de cada seção.
+    """
+    blobs = []
+    secoes = {}
+    offset = 0
+    for section in SECTIONS:
+        blob = json.dumps(data.get(section) or [], ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        secoes[section] = [offset, len(blob)]
+        offset += len(blob)
+        blobs.append(blob)
+
+    header = json.dumps({
+        "business_objective": data.get("business_objective"),
+        "timestamp": data.get("timestamp"),
+        "contagens": {section: len(data.get(section) or []) for section in SECTIONS},
+        "secoes": secoes
+    }, ensure_ascii=False).encode("utf-8")
+
+    atomic_write(filename, b"".join([SECTIONED_MAGIC, _HEADER_LENGTH.pack(len(header)), header, *blobs]))
+    return filename
+
+
+def _snapshot_seq(name: str) -> int:
+    """Sequência de um nome direx_snapshot_<timestamp>_<seq>.direx (0 se ausente)"""
+    stem = name.rsplit(".", 1)[0]
+    parts = stem.split("_")
+    return int(parts[-1]) if len(parts) >= 5 and parts[-1].isdigit() else 0
+
+
+class SectionedSnapshot(SnapshotSections):
+    """Leitor de contêiner .direx: lê só o cabeçalho e busca cada seção pelo offset"""
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        with open(filename, "rb") as f:
+            if f.read(len(SECTIONED_MAGIC)) != SECTIONED_MAGIC:
+                raise ValueError(f"{filename} não é um snapshot .direx")
+            (length,) = _HEADER_LENGTH.unpack(f.read(_HEADER_LENGTH.size))
+            meta = json.loads(f.read(length))
+
+        self._base = len(SECTIONED_MAGIC) + _HEADER_LENGTH.size + length
+        self._secoes = meta["secoes"]
+        self.header = {"business_objective": meta.get("business_objective"),
+                       "timestamp": meta.get("timestamp")}
+        self.counts = meta["contagens"]
+
+    def load_section(self, section: str) -> List:
+        offset, length = self._secoes[section]
+        with open(self.filename, "rb") as f:
+            f.seek(self._base + offset)
+            raw = f.read(length)
+        record_bytes("leitura", "arquivo", len(raw))
+        return json.loads(raw)
+
+    def load_all(self) -> Dict:
+        state = empty_state()
+        state.update(self.header)
+        for section in SECTIONS:
+            state[section] = self.load_section(section)
+        return state
+
+
+@instrumented(*PERSISTENCE_METHODS)
+class SectionedStorage(StorageBackend):
+    """
+    Backend de contêineres .direx com seções independentes.
+    O snapshot mais recente é apontado pelo arquivo LATEST, sem listar o diretório.
+    """
+
+    LATEST_FILE = "LATEST"
+
+    def __init__(self, data_dir: str = "direx_data"):
+        self.data_dir = data_dir
+
+    def save(self, data: Dict) -> str:
+        snapshot_id = next_snapshot_id(self.data_dir)
+        filename = os.path.join(self.data_dir, f"direx_snapshot_{snapshot_id}.direx")
+        write_sectioned(data, filename)
+
+        # LATEST só avança: um processo mais lento não volta o ponteiro para um snapshot anterior
+        latest = os.path.join(self.data_dir, self.LATEST_FILE)
+        name = os.path.basename(filename)
+        with FileLock(os.path.join(self.data_dir, ".direx.lock")):
+            try:
+                with open(latest, "r", encoding="utf-8") as f:
+                    current = f.read().strip()
+            except FileNotFoundError:
+                current = ""
+            if _snapshot_seq(name) > _snapshot_seq(current):
+                atomic_write(latest, name.encode("utf-8"))
+        return filename
+
+    def load(self, ref: str) -> Dict:
+        return SectionedSnapshot(ref).load_all()
+
+    def open_sections(self, ref: str) -> SnapshotSections:
+        return SectionedSnapshot(ref)
+
+    def latest_ref(self) -> Optional[str]:
+        try:
+            with open(os.path.join(self.data_dir, self.LATEST_FILE), "r", encoding="utf-8") as f:
+                return os.path.join(self.data_dir, f.read().strip())
+        except FileNotFoundError:
+            return None
+
+
+@instrumented(*PERSISTENCE_METHODS)
+class QueuedStorage(StorageBackend):
+    """
+    Fila de escrita na frente de outro backend.
+    Salvamentos que chegam em rajada (dentro de `delay` segundos) viram uma
+    única escrita do estado mais recente; todos os chamadores recebem a
+    referência dessa escrita. save_async() retorna um Future sem bloquear.
+    A thread de escrita termina depois de `idle` segundos sem salvamentos e
+    volta no próximo, então não é preciso chamar close() para liberá-la.
+    """
+
+    def __init__(self, backend: StorageBackend, delay: float = 0.05, idle: float = 5.0):
+        self.backend = backend
+        self.delay = delay
+        self.idle = idle
+        self.writes = 0
+        self.requests = 0
+        self._cond = threading.Condition()
+        self._pending: Optional[Dict] = None
+        self._waiters: List["Future"] = []
+        self._last: Optional["Future"] = None
+        self._worker: Optional[threading.Thread] = None
+        self._closed = False
+
+    @staticmethod
+    def _freeze(data: Dict) -> Dict:
+        """Cópia rasa por item para que alterações posteriores não corram com a escrita"""
+        frozen = dict(data)
+        for section in SECTIONS:
+            frozen[section] = [dict(item) if isinstance(item, Mapping) else item for item in data.get(section) or []]
+        return frozen
+
+    def save_async(self, data: Dict) -> "Future":
+        """Enfileira o estado; o Future resolve com a referência gravada"""
+        from concurrent.futures import Future
+
+        future = Future()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("QueuedStorage já foi fechado")
+            self._pending = self._freeze(data)
+            self._waiters.append(future)
+            self._last = future
+            self.requests += 1
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="direx-writer", daemon=True)
+                self._worker.start()
+            self._cond.notify()
+        return future
+
+    def save(self, data: Dict) -> str:
+        return self.save_async(data).result()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending is not None or self._closed, self.idle)
+                if self._pending is None:
+                    # Ocioso ou fechado: o próximo save_async cria outra thread
+                    self._worker = None
+                    return
+
+            # Janela de coalescência: salvamentos nesse intervalo substituem o pendente
+            time.sleep(self.delay)
+            with self._cond:
+                data, waiters = self._pending, self._waiters
+                self._pending, self._waiters = None, []
+
+            try:
+                ref = self.backend.save(data)
+            except Exception as e:
+                for waiter in waiters:
+                    waiter.set_exception(e)
+            else:
+                self.writes += 1
+                for waiter in waiters:
+                    waiter.set_result(ref)
+
+    def flush(self):
+        """Aguarda a gravação de tudo o que já foi enfileirado"""
+        last = self._last
+        if last is not None:
+            last.result()
+
+    def close(self):
+        """Grava o pendente e encerra a thread de escrita"""
+        self.flush()
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+            worker = self._worker
+        if worker is not None:
+            worker.join()
+
+    def load(self, ref: str) -> Dict:
+        return self.backend.load(ref)
+
+    def latest_ref(self) -> Optional[str]:
+        self.flush()
+        return self.backend.latest_ref()
+
+    def open_sections(self, ref: str) -> SnapshotSections:
+        return self.backend.open_sections(ref)
@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+DIREX - Registro de Templates
+Templates de planejamento carregados uma única vez, imutáveis e compartilhados.
+"""
+
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, List, Mapping, NamedTuple, Tuple
+
+from direx_classifier import ObjectiveClassifier
+
+# Dias da semana usados no plano semanal
+DIAS_SEMANA = ("Segunda", "Terça", "Quarta", "Quinta", "Sexta", "Sábado", "Domingo")
+
+# Resultados-chave do OKR principal por categoria de objetivo
+KEY_RESULTS: Mapping[str, Tuple[str, ...]] = MappingProxyType({
+    "receita": (
+        "Aumentar receita mensal em 30%",
+        "Adquirir 50 novos clientes pagantes",
+        "Elevar ticket médio em 20%",
+        "Reduzir churn para menos de 5%"
+    ),
+    "produto": (
+        "Completar desenvolvimento do MVP",
+        "Validar produto com 100 usuários beta",
+        "Alcançar 95% de satisfação dos primeiros usuários",
+        "Definir pricing e modelo de negócio"
+    ),
+    "presenca_digital": (
+        "Aumentar seguidores em 200%",
+        "Gerar 50 menções em mídias relevantes",
+        "Criar 24 conteúdos de autoridade",
+        "Estabelecer parcerias estratégicas"
+    ),
+    "geral": (
+        "Definir 3 métricas principais de sucesso",
+        "Implementar processos para acompanhar progresso",
+        "Identificar e remover 2 maiores obstáculos",
+        "Construir base sólida para crescimento"
+    )
+})
+
+FASE_OBJECTIVES: Mapping[str, Tuple[str, ...]] = MappingProxyType({
+    "Semana 1": (
+        "Definir escopo e requisitos claros",
+        "Configurar ferramentas e processos básicos",
+        "Realizar pesquisa inicial de mercado"
+    ),
+    "Semana 2": (
+        "Desenvolver primeira versão do produto/serviço",
+        "Testar com usuários iniciais",
+        "Ajustar baseado em feedback"
+    ),
+    "Mês 1": (
+        "Completar planejamento estratégico detalhado",
+        "Configurar infraestrutura básica",
+        "Iniciar desenvolvimento do core product"
+    ),
+    "Mês 2": (
+        "Lançar MVP e coletar feedback",
+        "Otimizar processos internos",
+        "Expandir equipe se necessário"
+    ),
+    "Mês 3": (
+        "Escalar operações baseado em métricas",
+        "Implementar melhorias identificadas",
+        "Planejar próximos passos de crescimento"
+    )
+})
+
+FASE_DELIVERABLES: Mapping[str, Tuple[str, ...]] = MappingProxyType({
+    "Semana 1": (
+        "Documento de requisitos",
+        "Plano de ação inicial",
+        "Pesquisa de mercado básica"
+    ),
+    "Semana 2": (
+        "Protótipo funcional",
+        "Relatório de testes iniciais",
+        "Lista de melhorias prioritárias"
+    ),
+    "Mês 1": (
+        "Estratégia completa documentada",
+        "Sistema básico operacional",
+        "Equipe alinhada com objetivos"
+    ),
+    "Mês 2": (
+        "Produto mínimo viável lançado",
+        "Processos otimizados",
+        "Métricas de sucesso definidas"
+    ),
+    "Mês 3": (
+        "Operações em escala",
+        "Relatório de performance",
+        "Plano de crescimento futuro"
+    )
+})
+
+FASE_MILESTONES: Mapping[str, Tuple[str, ...]] = MappingProxyType({
+    "Semana 1": (
+        "Reunião de alinhamento da equipe",
+        "Definição clara de escopo",
+        "Setup completo do ambiente"
+    ),
+    "Semana 2": (
+        "Primeiro feedback de usuários",
+        "Iteração baseada em testes",
+        "Decisões sobre próximos passos"
+    ),
+    "Mês 1": (
+        "Aprovação da estratégia completa",
+        "Primeiras funcionalidades core",
+        "Contratações estratégicas"
+    ),
+    "Mês 2": (
+        "Lançamento público do MVP",
+        "Alcance das primeiras metas",
+        "Identificação de padrões de uso"
+    ),
+    "Mês 3": (
+        "Estabilidade operacional",
+        "Crescimento sustentável",
+        "Preparação para expansão"
+    )
+})
+
+DAILY_TASKS: Mapping[str, Tuple[str, ...]] = MappingProxyType({
+    "Segunda": (
+        "Revisar objetivos da semana",
+        "Priorizar tarefas críticas",
+        "Reunião de alinhamento da equipe",
+        "Definir métricas diárias"
+    ),
+    "Terça": (
+        "Executar tarefas de alto impacto",
+        "Revisar progresso dos OKRs",
+        "Reuniões com stakeholders",
+        "Atualizar dashboards"
+    ),
+    "Quarta": (
+        "Foco em desenvolvimento/produto",
+        "Análise de dados e métricas",
+        "Brainstorming de ideias",
+        "Revisão de processos"
+    ),
+    "Quinta": (
+        "Execução de tarefas estratégicas",
+        "Preparação para entregas",
+        "Reuniões de acompanhamento",
+        "Planejamento da próxima semana"
+    ),
+    "Sexta": (
+        "Finalizar entregas da semana",
+        "Revisar conquistas e aprendizados",
+        "Feedback da equipe",
+        "Planejamento pessoal/profissional"
+    ),
+    "Sábado": (
+        "Atividades de crescimento pessoal",
+        "Leitura e aprendizado",
+        "Reflexão estratégica",
+        "Tempo com família/amigos"
+    ),
+    "Domingo": (
+        "Preparação para a semana",
+        "Revisão de hábitos e rotinas",
+        "Planejamento de lazer",
+        "Recarregar energias"
+    )
+})
+
+DAILY_FOCUS: Mapping[str, str] = MappingProxyType({
+    "Segunda": "Alinhamento e planejamento",
+    "Terça": "Execução estratégica",
+    "Quarta": "Análise e otimização",
+    "Quinta": "Entregas e progresso",
+    "Sexta": "Conclusão e reflexão",
+    "Sábado": "Crescimento pessoal",
+    "Domingo": "Recuperação e preparação"
+})
+
+DAILY_METRICS: Mapping[str, Tuple[str, ...]] = MappingProxyType({
+    "Segunda": ("Tarefas prioritárias definidas", "Equipe alinhada", "Objetivos claros"),
+    "Terça": ("Progresso nos OKRs", "Reuniões produtivas", "Bloqueadores removidos"),
+    "Quarta": ("Insights gerados", "Processos otimizados", "Ideias inovadoras"),
+    "Quinta": ("Entregas completadas", "Qualidade mantida", "Feedback coletado"),
+    "Sexta": ("Semana concluída", "Aprendizados documentados", "Próxima semana planejada"),
+    "Sábado": ("Habilidades desenvolvidas", "Conhecimento adquirido", "Bem-estar mantido"),
+    "Domingo": ("Energia recarregada", "Semana preparada", "Foco renovado")
+})
+
+# Palavras-chave de cada categoria, em ordem de prioridade
+CATEGORY_KEYWORDS: Tuple[Tuple[str, Tuple[str, ...]], ...] = (
+    ("receita", ("receita", "vendas")),
+    ("produto", ("produto", "lançar")),
+    ("presenca_digital", ("presença digital", "autoridade")),
+)
+
+# Classificador padrão, compilado uma vez na importação
+OBJECTIVE_CLASSIFIER = ObjectiveClassifier(CATEGORY_KEYWORDS, KEY_RESULTS)
+
+# Valores usados quando a fase ou o dia não tem template próprio
+DEFAULT_FASE_OBJECTIVES = ("Definir objetivos específicos da fase",)
+DEFAULT_FASE_DELIVERABLES = ("Entregas específicas da fase",)
+DEFAULT_FASE_MILESTONES = ("Marcos importantes da fase",)
+DEFAULT_DAILY_TASKS = ("Tarefas específicas do dia",)
+DEFAULT_DAILY_FOCUS = "Foco específico do dia"
+DEFAULT_DAILY_METRICS = ("Métricas específicas do dia",)
+
+
+class PlanTemplate(NamedTuple):
+    """Plano memoizado para uma combinação (categoria do objetivo, período)"""
+    categoria: str
+    periodo_dias: int
+    roadmap: Tuple[Mapping, ...]
+    weekly_plan: Tuple[Mapping, ...]
+
+
+def classify_objective(objective: str) -> str:
+    """Classifica o objetivo do negócio em uma categoria de KEY_RESULTS"""
+    return OBJECTIVE_CLASSIFIER.classify(objective)
+
+
+def key_results_for(objective: str) -> Tuple[str, ...]:
+    """Resultados-chave do OKR principal para o objetivo"""
+    return tuple(OBJECTIVE_CLASSIFIER.key_results_for(objective))
+
+
+def set_objective_classifier(classifier: ObjectiveClassifier):
+    """Substitui o classificador padrão (ex.: ObjectiveClassifier.from_json) e limpa o cache de planos"""
+    global OBJECTIVE_CLASSIFIER
+    OBJECTIVE_CLASSIFIER = classifier
+    plan_template.cache_clear()
+
+
+def fase_objectives(fase: str) -> Tuple[str, ...]:
+    return FASE_OBJECTIVES.get(fase, DEFAULT_FASE_OBJECTIVES)
+
+
+def fase_deliverables(fase: str) -> Tuple[str, ...]:
+    return FASE_DELIVERABLES.get(fase, DEFAULT_FASE_DELIVERABLES)
+
+
+def fase_milestones(fase: str) -> Tuple[str, ...]:
+    return FASE_MILESTONES.get(fase, DEFAULT_FASE_MILESTONES)
+
+
+def daily_tasks(dia: str) -> Tuple[str, ...]:
+    return DAILY_TASKS.get(dia, DEFAULT_DAILY_TASKS)
+
+
+def daily_focus(dia: str) -> str:
+    return DAILY_FOCUS.get(dia, DEFAULT_DAILY_FOCUS)
+
+
+def daily_metrics(dia: str) -> Tuple[str, ...]:
+    return DAILY_METRICS.get(dia, DEFAULT_DAILY_METRICS)
+
+
+def roadmap_fases(periodo_dias: int) -> Tuple[str, ...]:
+    """Divide o período nas fases do roadmap"""
+    if periodo_dias <= 7:
+        return ("Semana 1",)
+    elif periodo_dias <= 15:
+        return ("Semana 1", "Semana 2")
+    elif periodo_dias <= 30:
+        return ("Semana 1-2", "Semana 3-4")
+    return ("Mês 1", "Mês 2", "Mês 3")
+
+
+@lru_cache(maxsize=256)
+def roadmap_template(periodo_dias: int) -> Tuple[Mapping, ...]:
+    """Fases do roadmap para o período, calculadas uma vez e compartilhadas"""
+    fases = roadmap_fases(periodo_dias)
+    return tuple(
+        MappingProxyType({
+            "fase": fase,
+            "periodo": f"Dias {(i * periodo_dias // len(fases)) + 1} - {(i + 1) * periodo_dias // len(fases)}",
+            "objetivos": fase_objectives(fase),
+            "entregas": fase_deliverables(fase),
+            "marcos": fase_milestones(fase),
+            "status": "pendente"
+        })
+        for i, fase in enumerate(fases)
+    )
+
+
+@lru_cache(maxsize=1)
+def weekly_plan_template() -> Tuple[Mapping, ...]:
+    """Plano semanal padrão, calculado uma vez e compartilhado"""
+    return tuple(
+        MappingProxyType({
+            "dia": dia,
+            "tarefas_principais": daily_tasks(dia),
+            "foco": daily_focus(dia),
+            "metricas": daily_metrics(dia),
+            "status": "pendente"
+        })
+        for dia in DIAS_SEMANA
+    )
+
+
+@lru_cache(maxsize=1024)
+def plan_template(categoria: str, periodo_dias: int) -> PlanTemplate:
+    """Plano memoizado por (categoria do objetivo, período em dias)"""
+    return PlanTemplate(
+        categoria=categoria,
+        periodo_dias=periodo_dias,
+        roadmap=roadmap_template(periodo_dias),
+        weekly_plan=weekly_plan_template()
+    )
+
+
+def materialize(items: Tuple[Mapping, ...]) -> List[Dict]:
+    """
+    Cria dicts novos a partir de templates compartilhados, com as tuplas de
+    textos copiadas para listas. Os textos continuam compartilhados; os
+    templates em cache nunca são alterados por quem recebe a cópia.
+    """
+    return [{key: list(value) if isinstance(value, tuple) else value for key, value in item.items()}
+            for item in items]
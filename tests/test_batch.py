@@ -0,0 +1,37 @@
+import io
+import json
+
+from direx_batch import read_objectives, run_batch
+
+
+def test_read_objectives_accepts_objects_and_plain_text():
+    feed = io.StringIO('{"objetivo": "Aumentar vendas", "periodo_dias": 7}\n\n"Lançar produto"\nCrescer\n')
+    assert list(read_objectives(feed)) == [
+        (0, {"objetivo": "Aumentar vendas", "periodo_dias": 7}),
+        (2, {"objetivo": "Lançar produto"}),
+        (3, {"objetivo": "Crescer"}),
+    ]
+
+
+def test_run_batch_writes_one_record_per_objective():
+    linhas = [json.dumps({"objetivo": f"Aumentar receita {i}", "periodo_dias": 30}) for i in range(5)]
+    linhas.append(json.dumps({"objetivo": "Prazo inválido", "periodo_dias": "x"}))
+    out = io.StringIO()
+
+    report = run_batch(io.StringIO("\n".join(linhas)), out, workers=2, chunk_size=2, progress=None)
+    registros = sorted((json.loads(l) for l in out.getvalue().splitlines()), key=lambda r: r["indice"])
+
+    assert report["processados"] == 6 and report["erros"] == 1
+    assert [r["indice"] for r in registros] == list(range(6))
+    assert all("okrs" in r and len(r["roadmap"]) == 2 for r in registros[:5])
+    assert "erro" in registros[5]
+
+
+def test_non_object_json_lines_become_error_records():
+    out = io.StringIO()
+    report = run_batch(io.StringIO('"ok objetivo"\n42\n[1]\n'), out, workers=1, chunk_size=8, progress=None)
+    registros = sorted((json.loads(l) for l in out.getvalue().splitlines()), key=lambda r: r["indice"])
+
+    assert report["processados"] == 3 and report["erros"] == 2
+    assert registros[0]["objetivo"] == "ok objetivo" and "okrs" in registros[0]
+    assert [r.get("erro") for r in registros[1:]] == ["registro inválido"] * 2
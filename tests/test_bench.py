@@ -0,0 +1,40 @@
+import pytest
+
+from direx_agent import main
+from direx_bench import BenchCase, compare, measure, print_comparison
+
+
+def _result(**casos):
+    return {"resultados": {nome: {"tempo_mediano_s": t, "alocado_pico_bytes": 1000}
+                           for nome, t in casos.items()}}
+
+
+def test_compare_reports_cases_missing_on_either_side(capsys):
+    baseline = _result(a=1.0, b=1.0, removido=1.0)
+    current = _result(a=1.1, b=2.0, novo=1.0)
+
+    linhas = {linha["caso"]: linha for linha in compare(baseline, current, threshold=0.25)}
+    assert linhas["a"]["regressao"] is False and linhas["a"]["ausente"] is None
+    assert linhas["b"]["regressao"] is True
+    assert linhas["novo"]["ausente"] == "baseline"
+    assert linhas["removido"]["ausente"] == "atual"
+
+    print_comparison(list(linhas.values()))
+    out = capsys.readouterr().out
+    assert "1 regressão(ões) em 2 casos comparados" in out
+    assert "1 caso(s) sem baseline, 1 caso(s) do baseline não executado(s)" in out
+
+
+def test_measure_reports_time_and_allocations():
+    resultado = measure(BenchCase("lista", lambda d: lambda: [0] * 10000), repeat=2)
+    assert resultado["tempo_mediano_s"] >= 0
+    assert resultado["alocado_pico_bytes"] >= 80000
+    assert "rss_delta_kb" not in resultado
+
+
+def test_zero_repeat_is_rejected(capsys):
+    with pytest.raises(ValueError, match="repeat"):
+        measure(BenchCase("lista", lambda d: lambda: None), repeat=0)
+    with pytest.raises(SystemExit):
+        main(["bench", "--repeat", "0"])
+    assert "maior que zero" in capsys.readouterr().err
@@ -0,0 +1,52 @@
+import time
+
+import pytest
+
+from direx_agent import DirexAgent
+from direx_capacity import build_capacity_plan
+
+EFFORTS = [4.5, 7, 3, 6.5, 5, 7, 4.5, 6.5, 3, 5, 7, 4.5]
+CAPACITY = {"Segunda": 8, "Terça": 8}
+TEAM = ["A", "B", "C", "D", "E"]
+
+
+def _tasks():
+    return [{"tarefa": f"t{i}", "esforco": e, "score": i % 3} for i, e in enumerate(EFFORTS)]
+
+
+def test_first_fit_respects_capacity_and_owner():
+    tarefas = [{"tarefa": "x", "esforco": 6, "responsavel": "B"}, {"tarefa": "y", "esforco": 6},
+               {"tarefa": "z", "esforco": 20}]
+    plan = build_capacity_plan(tarefas, {"Segunda": 8}, ["A", "B"])
+    assert plan.dias[0]["alocacoes"] == {"A": ["y"], "B": ["x"]}
+    assert [t["tarefa"] for t in plan.nao_alocadas] == ["z"]
+
+
+def test_exact_is_fast_and_never_worse_than_first_fit():
+    inicio = time.perf_counter()
+    exact = build_capacity_plan(_tasks(), CAPACITY, TEAM, exact=True)
+    assert time.perf_counter() - inicio < 2.0
+
+    heuristic = build_capacity_plan(_tasks(), CAPACITY, TEAM)
+    assert exact.utilizacao >= heuristic.utilizacao
+    for dia in exact.dias:
+        assert dia["carga_horas"] <= dia["capacidade_horas"]
+
+
+def test_exact_finds_optimum_first_fit_misses():
+    # Pela prioridade o first-fit junta 5 e 4 e sobra o último 5; o ótimo é 5+5 e 4+6
+    tarefas = [{"tarefa": n, "esforco": e, "score": s}
+               for n, e, s in (("a", 5, 3), ("b", 4, 2), ("c", 6, 1), ("d", 5, 0))]
+    heuristic = build_capacity_plan(tarefas, {"Segunda": 10, "Terça": 10})
+    assert [t["tarefa"] for t in heuristic.nao_alocadas] == ["d"]
+
+    plan = build_capacity_plan(tarefas, {"Segunda": 10, "Terça": 10}, exact=True)
+    assert plan.nao_alocadas == []
+    assert plan.utilizacao == pytest.approx(1.0)
+
+
+def test_weekly_plan_with_large_team_stays_fast():
+    agent = DirexAgent(verbose=False, index_search=False)
+    inicio = time.perf_counter()
+    agent.create_weekly_plan(_tasks(), capacidade=CAPACITY, membros=TEAM, exact=True)
+    assert time.perf_counter() - inicio < 2.0
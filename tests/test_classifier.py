@@ -0,0 +1,27 @@
+from direx_classifier import AhoCorasick, ObjectiveClassifier, normalize
+from direx_templates import classify_objective
+
+
+def test_normalize_strips_accents_case_and_spaces():
+    assert normalize("  Presença   DIGITAL ") == "presenca digital"
+
+
+def test_automaton_finds_overlapping_patterns():
+    automaton = AhoCorasick(["he", "she", "hers"])
+    assert sorted(automaton.iter_matches("ushers")) == [(3, 0), (3, 1), (5, 2)]
+
+
+def test_default_classifier_keeps_precedence_and_accepts_unaccented():
+    assert classify_objective("Lançar produto para aumentar receita") == "receita"
+    assert classify_objective("lancar app") == "produto"
+    assert classify_objective("Ganhar autoridade e presenca digital") == "presenca_digital"
+    assert classify_objective("Reduzir rotatividade") == "geral"
+
+
+def test_classifier_from_config():
+    classifier = ObjectiveClassifier.from_config({
+        "padrao": "outros",
+        "categorias": [{"nome": "custos", "palavras": ["custo", "economia"], "resultados_chave": ["Cortar 10%"]}]
+    })
+    assert classifier.classify_many(["Reduzir custos", "Crescer"]) == ["custos", "outros"]
+    assert list(classifier.key_results_for("economia de energia")) == ["Cortar 10%"]
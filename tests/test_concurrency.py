@@ -0,0 +1,113 @@
+import os
+import threading
+import time
+
+import pytest
+
+import direx_serializers
+from direx_serializers import atomic_write
+import direx_storage
+from direx_pool import AgentPool
+from direx_storage import (DeltaLogStorage, FileSnapshotStorage, QueuedStorage, SectionedStorage, SQLiteStorage,
+                          empty_state)
+
+
+def _state(i):
+    data = empty_state()
+    data.update(business_objective=f"Objetivo {i}", timestamp="20240101_100000")
+    return data
+
+
+def _in_threads(n, target):
+    threads = [threading.Thread(target=target, args=(i,)) for i in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+
+def test_concurrent_sectioned_saves_never_overwrite(tmp_path):
+    storage = SectionedStorage(str(tmp_path))
+    refs = []
+    _in_threads(8, lambda i: refs.extend(storage.save(_state(i)) for _ in range(5)))
+
+    assert len(set(refs)) == 40
+    assert storage.latest_ref() == max(refs)
+
+
+def test_concurrent_sqlite_saves_are_all_kept(tmp_path):
+    storage = SQLiteStorage(str(tmp_path / "direx.db"))
+    _in_threads(8, lambda i: [storage.save(_state(i)) for _ in range(5)])
+    assert len(storage.list_snapshots(limit=100)) == 40
+
+
+def test_queued_storage_coalesces_bursts(tmp_path):
+    storage = QueuedStorage(SQLiteStorage(str(tmp_path / "direx.db")), delay=0.2)
+    futures = [storage.save_async(_state(i)) for i in range(20)]
+    refs = {f.result() for f in futures}
+
+    assert len(refs) == 1 and storage.writes < storage.requests
+    assert storage.backend.load(refs.pop())["business_objective"] == "Objetivo 19"
+
+
+def test_atomic_write_keeps_old_file_on_failure(tmp_path, monkeypatch):
+    path = str(tmp_path / "snapshot.json")
+    atomic_write(path, b'{"v": 1}')
+
+    def broken_replace(src, dst):
+        raise OSError("falha no rename")
+    monkeypatch.setattr(direx_serializers.os, "replace", broken_replace)
+    with pytest.raises(OSError):
+        atomic_write(path, b'{"v": 2}')
+
+    with open(path, "rb") as f:
+        assert f.read() == b'{"v": 1}'
+    assert os.listdir(tmp_path) == ["snapshot.json"]
+
+
+def test_snapshot_names_follow_save_order_not_state_timestamp(tmp_path):
+    storage = FileSnapshotStorage(str(tmp_path), formato="json")
+    first = _state(1)
+    first["timestamp"] = "29991231_235959"
+    storage.save(first)
+    second = storage.save(_state(2))
+
+    assert storage.latest_ref() == second
+    assert storage.load(storage.latest_ref())["business_objective"] == "Objetivo 2"
+
+
+def test_queued_writer_thread_exits_when_idle(tmp_path):
+    storage = QueuedStorage(SQLiteStorage(str(tmp_path / "direx.db")), delay=0, idle=0.05)
+    storage.save(_state(1))
+    deadline = time.monotonic() + 2
+    while storage._worker is not None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert storage._worker is None
+
+    ref = storage.save(_state(2))
+    assert storage.load(ref)["business_objective"] == "Objetivo 2"
+
+
+def test_pool_agents_save_through_the_writer_queue(tmp_path):
+    pool = AgentPool(str(tmp_path))
+    agent = pool.get("s1")
+    assert isinstance(agent.storage, QueuedStorage)
+
+    agent.set_business_objective("Fila")
+    ref = agent.save_data()
+    assert agent.storage.load(ref)["business_objective"] == "Fila"
+
+
+def test_delta_compaction_syncs_the_new_base_before_renaming(tmp_path, monkeypatch):
+    storage = DeltaLogStorage(str(tmp_path))
+    storage.save(_state(1))
+
+    events = []
+    real_fsync, real_replace = os.fsync, os.replace
+    monkeypatch.setattr(direx_storage.os, "fsync", lambda fd: events.append("fsync") or real_fsync(fd))
+    monkeypatch.setattr(direx_storage.os, "replace",
+                        lambda src, dst: events.append(("replace", os.path.basename(dst))) or real_replace(src, dst))
+    storage.compact()
+
+    base = events.index(("replace", DeltaLogStorage.BASE_FILE))
+    assert "fsync" in events[:base]
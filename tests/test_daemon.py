@@ -0,0 +1,56 @@
+import json
+import os
+import threading
+import time
+
+import direx_daemon
+import direx_metrics
+
+
+def test_execute_runs_in_client_cwd(tmp_path):
+    codigo, out, err = direx_daemon.execute(["okrs", "--objective", "Aumentar receita", "--save"],
+                                            cwd=str(tmp_path), env={})
+    assert codigo == 0, err
+    assert json.loads(out)
+    assert os.path.exists(tmp_path / "direx_data" / "direx.db")
+    assert os.getcwd() != str(tmp_path)
+
+
+def test_execute_blocks_long_running_commands():
+    for argv in (["bench"], ["retention", "--every", "60"], ["prioritize", "-", "--stream"], ["serve"]):
+        codigo, _, err = direx_daemon.execute(argv)
+        assert codigo == 2 and "não suportado" in err, argv
+
+
+def test_metrics_are_scoped_to_the_request(tmp_path):
+    metrics_file = str(tmp_path / "m.json")
+    codigo, _, err = direx_daemon.execute(["--metrics", metrics_file, "okrs", "--objective", "Crescer"],
+                                          cwd=str(tmp_path), env={})
+    assert codigo == 0, err
+    assert os.path.exists(metrics_file)
+    assert not direx_metrics.enabled()
+    assert direx_metrics.REGISTRY.to_json()["chamadas"] == {}
+
+    # DIREX_METRICS do cliente também vale só para o comando
+    direx_daemon.execute(["okrs", "--objective", "Crescer"], cwd=str(tmp_path), env={"DIREX_METRICS": "1"})
+    assert not direx_metrics.enabled()
+    assert "DIREX_METRICS" not in os.environ
+
+
+def test_client_sends_cwd_to_daemon(tmp_path, monkeypatch):
+    socket_path = str(tmp_path / "d.sock")
+    server = threading.Thread(target=direx_daemon.serve, args=(socket_path,), daemon=True)
+    monkeypatch.setattr(direx_daemon, "_warm_up", lambda: None)
+    monkeypatch.setattr(direx_daemon.signal, "signal", lambda *a: None)
+    server.start()
+    for _ in range(100):
+        if os.path.exists(socket_path):
+            break
+        time.sleep(0.02)
+
+    work = tmp_path / "cliente"
+    work.mkdir()
+    monkeypatch.chdir(work)
+    codigo, out, err = direx_daemon.call(socket_path, ["okrs", "--objective", "Crescer", "--save"], timeout=30)
+    assert codigo == 0, err
+    assert os.path.exists(work / "direx_data" / "direx.db")
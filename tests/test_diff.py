@@ -0,0 +1,35 @@
+from direx_diff import diff_plans, diff_section, merge_plans
+
+
+def _kpi(nome, meta="10"):
+    return {"nome": nome, "meta": meta}
+
+
+def test_diff_section_reports_changes_and_moves():
+    old = [_kpi("a"), _kpi("b"), _kpi("c"), _kpi("d")]
+    new = [_kpi("b"), _kpi("a", meta="20"), _kpi("c"), _kpi("e")]
+
+    diff = diff_section("kpis", old, new)
+    assert diff["adicionados"] == [_kpi("e")]
+    assert diff["removidos"] == [_kpi("d")]
+    assert diff["alterados"] == [{"id": "a", "campos": {"meta": ("10", "20")}}]
+    assert len(diff["movidos"]) == 1
+
+
+def test_diff_treats_tuples_and_lists_alike():
+    old = {"business_objective": "X", "okrs": [{"objetivo": "O", "resultados_chave": ("a", "b")}]}
+    new = {"business_objective": "X", "okrs": [{"objetivo": "O", "resultados_chave": ["a", "b"]}]}
+    assert diff_plans(old, new) == {}
+
+
+def test_three_way_merge_combines_edits_and_flags_conflicts():
+    base = {"business_objective": "X", "kpis": [_kpi("a"), _kpi("b")], "tasks": ["t1"]}
+    ours = {"business_objective": "X", "kpis": [_kpi("a", "11"), _kpi("b")], "tasks": ["t1", "t2"]}
+    theirs = {"business_objective": "Y", "kpis": [_kpi("a", "12"), _kpi("n"), _kpi("b", "30")],
+              "tasks": ["t1"]}
+
+    dados, conflitos = merge_plans(base, ours, theirs)
+    assert dados["business_objective"] == "Y"
+    assert dados["kpis"] == [_kpi("a", "11"), _kpi("n"), _kpi("b", "30")]
+    assert dados["tasks"] == ["t1", "t2"]
+    assert conflitos == [{"secao": "kpis", "id": "a", "campo": "meta", "base": "10", "nosso": "11", "deles": "12"}]
@@ -0,0 +1,63 @@
+from array import array
+from datetime import datetime
+
+import pytest
+
+from direx_kpi_store import KPISeries, KPIStore
+
+
+def test_aggregates_and_period_over_period(tmp_path):
+    store = KPIStore(str(tmp_path))
+    for quando, valor in ((datetime(2024, 1, 1), 10), (datetime(2024, 1, 15), 20), (datetime(2024, 2, 9), 60)):
+        store.record("Receita Mensal", valor, quando)
+    series = store.series("Receita Mensal")
+
+    mensal = series.aggregates("mensal")
+    assert [(p["periodo"], p["contagem"], p["media"]) for p in mensal] == [("2024-01", 2, 15.0), ("2024-02", 1, 60.0)]
+    assert series.period_over_period("mensal") == pytest.approx(300.0)
+    assert series.latest() == 60.0
+
+    reopened = KPIStore(str(tmp_path)).series("Receita Mensal")
+    assert len(reopened) == 3
+    assert reopened.aggregates("mensal") == mensal
+
+
+def test_torn_append_is_repaired_on_load(tmp_path):
+    path = str(tmp_path / "nps")
+    series = KPISeries("NPS", path)
+    series.append(10, datetime(2024, 1, 1))
+    series.append(20, datetime(2024, 1, 2))
+    # Falha entre as duas gravações: timestamp gravado, valor não
+    with open(path + ".ts", "ab") as f:
+        array("d", [datetime(2024, 1, 3).timestamp()]).tofile(f)
+
+    reopened = KPISeries("NPS", path)
+    assert len(reopened) == 2
+    reopened.append(40, datetime(2024, 1, 4))
+
+    final = KPISeries("NPS", path)
+    assert list(final.valores) == [10, 20, 40]
+    assert datetime.fromtimestamp(final.timestamps[-1]) == datetime(2024, 1, 4)
+
+
+def test_names_with_the_same_slug_keep_separate_series(tmp_path):
+    store = KPIStore(str(tmp_path))
+    store.record("Receita (R$)", 10, datetime(2024, 1, 1))
+    store.record("Receita R$", 99, datetime(2024, 1, 1))
+
+    reopened = KPIStore(str(tmp_path))
+    assert list(reopened.series("Receita (R$)").valores) == [10]
+    assert list(reopened.series("Receita R$").valores) == [99]
+
+
+def test_legacy_slug_files_are_adopted(tmp_path):
+    KPISeries("NPS", str(tmp_path / "nps")).append(42, datetime(2024, 1, 1))
+    assert list(KPIStore(str(tmp_path)).series("NPS").valores) == [42]
+    assert not (tmp_path / "nps.ts").exists()
+
+
+def test_unknown_resolution_is_a_value_error(tmp_path):
+    series = KPIStore(str(tmp_path)).record("NPS", 1, datetime(2024, 1, 1))
+    for metodo in (series.rolling, series.period_over_period, series.aggregates):
+        with pytest.raises(ValueError, match="diaria, semanal, mensal, trimestral"):
+            metodo("anual")
@@ -0,0 +1,41 @@
+import json
+
+import pytest
+
+from direx_agent import DirexAgent
+from direx_storage import SectionedStorage, SQLiteStorage
+
+
+def _saved_agent(storage):
+    agent = DirexAgent(storage=storage, verbose=False, index_search=False)
+    agent.set_business_objective("Aumentar receita")
+    agent.create_okrs()
+    agent.create_kpis()
+    agent.create_roadmap(30)
+    agent.tasks = ["A", "B", "C"]
+    agent.save_data()
+    return agent
+
+
+@pytest.mark.parametrize("backend", ["sectioned", "sqlite"])
+def test_lazy_load_reads_only_accessed_sections(tmp_path, backend):
+    storage = (SectionedStorage(str(tmp_path)) if backend == "sectioned"
+               else SQLiteStorage(str(tmp_path / "direx.db")))
+    original = _saved_agent(storage)
+
+    agent = DirexAgent(storage=storage, verbose=False, index_search=False)
+    assert agent.load_data(lazy=True)
+    lidas = []
+    load_section = agent._lazy_sections.load_section
+    agent._lazy_sections.load_section = lambda section: lidas.append(section) or load_section(section)
+
+    assert agent.business_objective == "Aumentar receita"
+    assert agent.section_count("tasks") == 3
+    assert agent.section_count("roadmap") == len(original.roadmap)
+    assert lidas == []
+
+    assert agent.okrs == json.loads(json.dumps(original.okrs))
+    assert agent.okrs is agent.okrs
+    assert lidas == ["okrs"]
+    assert agent.to_dict()["kpis"] == original.kpis
+    assert sorted(lidas) == ["kpis", "okrs", "roadmap", "tasks", "weekly_plan"]
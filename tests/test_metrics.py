@@ -0,0 +1,65 @@
+import json
+
+import pytest
+
+import direx_metrics
+from direx_agent import DirexAgent, main
+
+
+@pytest.fixture
+def metrics():
+    direx_metrics.enable()
+    direx_metrics.REGISTRY.reset()
+    yield direx_metrics.REGISTRY
+    direx_metrics.disable()
+    direx_metrics.REGISTRY.reset()
+
+
+def test_instrumented_methods_are_counted_only_while_enabled(metrics):
+    agent = DirexAgent(data_dir="unused", verbose=False, index_search=False)
+    agent.set_business_objective("Aumentar receita")
+    agent.create_okrs()
+    assert metrics.to_json()["chamadas"]["DirexAgent.create_okrs"]["contagem"] == 1
+
+    direx_metrics.disable()
+    agent.create_okrs()
+    assert metrics.to_json()["chamadas"]["DirexAgent.create_okrs"]["contagem"] == 1
+    assert DirexAgent.create_okrs.__name__ == "create_okrs" and not hasattr(DirexAgent.create_okrs, "__wrapped__")
+
+
+def test_errors_and_prometheus_export(metrics):
+    agent = DirexAgent(data_dir="unused", verbose=False, index_search=False)
+    with pytest.raises(ValueError):
+        agent.simulate()
+
+    texto = metrics.to_prometheus()
+    assert 'direx_errors_total{funcao="DirexAgent.simulate",tipo="ValueError"} 1' in texto
+    assert 'direx_call_duration_seconds_count{funcao="DirexAgent.simulate"} 1' in texto
+
+
+def test_cli_metrics_and_profile(tmp_path, capsys):
+    metrics_file = tmp_path / "metrics.json"
+    main(["--metrics", str(metrics_file), "--profile", str(tmp_path / "perfis"),
+          "okrs", "--objective", "Crescer"])
+    capsys.readouterr()
+
+    dados = json.loads(metrics_file.read_text(encoding="utf-8"))
+    assert "cli.okrs" in dados["chamadas"]
+    assert any(name.endswith(".prof") for name in (p.name for p in (tmp_path / "perfis").iterdir()))
+    direx_metrics.disable()
+    direx_metrics.configure_profiling(None)
+    direx_metrics.REGISTRY.reset()
+
+
+def test_cli_import_does_not_load_heavy_modules():
+    import os
+    import subprocess
+    import sys
+
+    raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    codigo = ("import sys, direx_agent; direx_agent.build_parser(); "
+              "print(sorted(m for m in sys.modules if m in {'sqlite3', 'pyinstrument', 'direx_storage', "
+              "'direx_templates', 'direx_capacity', 'direx_kpi_store', 'direx_okr_progress', "
+              "'direx_roadmap', 'direx_scheduler'}))")
+    saida = subprocess.run([sys.executable, "-c", codigo], cwd=raiz, capture_output=True, text=True, check=True)
+    assert saida.stdout.strip() == "[]"
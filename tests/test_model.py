@@ -0,0 +1,76 @@
+import json
+
+from direx_agent import DirexAgent
+from direx_model import KPI, OKR, Frequencia, Status, TaskRecord, compact_section, expand_section
+from direx_scheduler import TaskScheduler
+
+
+def test_missing_fields_are_not_keys():
+    record = TaskRecord.from_dict({"id": "t1", "nome": "x"})
+    assert record.to_dict() == {"id": "t1", "nome": "x"}
+    assert "tarefa" not in record
+    assert record.get("tarefa", "padrão") == "padrão"
+    try:
+        record["tarefa"]
+    except KeyError:
+        pass
+    else:
+        raise AssertionError("campo ausente deveria levantar KeyError")
+
+
+def test_compact_round_trip_keeps_keys_and_values():
+    items = [
+        {"tipo": "principal", "objetivo": "Crescer", "resultados_chave": ["A", "B"], "periodo": "Q1",
+         "status": "ativo", "progresso": None},
+        {"objetivo": "Sem tipo", "extra": 1},
+    ]
+    assert expand_section(compact_section("okrs", items)) == items
+
+    record = OKR.from_dict(items[1])
+    del record["objetivo"]
+    assert record.to_dict() == {"extra": 1}
+
+
+def test_enum_fields_format_as_values():
+    kpi = KPI.from_dict({"nome": "Receita", "frequencia": "Mensal"})
+    assert kpi["frequencia"] is Frequencia.MENSAL
+    assert str(kpi["frequencia"]) == "Mensal"
+    assert f"{kpi['frequencia']}" == "Mensal"
+    assert f"{Status.ATIVO:>7}" == "  ativo"
+    assert kpi["frequencia"] == "Mensal"
+
+
+def test_scheduler_from_compact_tasks_uses_real_names():
+    agent = DirexAgent(data_dir="unused", verbose=False, index_search=False, compact=True)
+    agent.tasks = [{"id": "t1", "tarefa": "Planejar", "duracao": 2},
+                   {"id": "t2", "duracao": 1, "dependencias": ["t1"]}]
+
+    scheduler = TaskScheduler.from_tasks(agent.tasks)
+    assert scheduler.nodes["t1"].nome == "Planejar"
+    assert scheduler.nodes["t2"].nome == "t2"
+
+
+def test_records_compare_equal_to_their_source_dict():
+    source = {"tipo": "principal", "objetivo": "Crescer", "resultados_chave": ["A", "B"], "status": "ativo"}
+    record = OKR.from_dict(source)
+    assert record == source and source == record
+    assert record == OKR.from_dict(dict(source))
+    assert record != {**source, "status": "concluido"}
+
+
+def test_compact_agent_capacity_plan_and_json_export(tmp_path):
+    agent = DirexAgent(data_dir=str(tmp_path), verbose=False, index_search=False, compact=True)
+    agent.set_business_objective("Aumentar vendas")
+    agent.create_okrs()
+    agent.tasks = [{"id": "t1", "tarefa": "Planejar", "esforco": 4, "responsavel": "Ana"},
+                   {"id": "t2", "tarefa": "Executar", "esforco": 6}]
+
+    plano = agent.create_weekly_plan(agent.tasks, membros=["Ana", "Bia"])
+    alocadas = [t for dia in plano for tarefas in (dia.get("alocacoes") or {}).values() for t in tarefas]
+    assert sorted(alocadas) == ["Executar", "Planejar"]
+
+    destino = tmp_path / "export.json"
+    agent.export_data(str(destino))
+    data = json.loads(destino.read_text(encoding="utf-8"))
+    assert data["tasks"] == expand_section(agent.tasks)
+    assert data["okrs"] == agent.okrs
@@ -0,0 +1,58 @@
+import random
+
+import pytest
+
+from direx_agent import DirexAgent
+from direx_okr_progress import ProgressTree, progress_from_values
+
+
+def test_incremental_rollup_matches_full_recompute():
+    rnd = random.Random(3)
+    tree = ProgressTree()
+    tree.add_portfolio("p")
+    pesos = {}
+    for o in range(4):
+        tree.add_objective(f"o{o}", "p", peso=o + 1)
+        for k in range(3):
+            pesos[(o, k)] = rnd.choice([1, 2, 5])
+            tree.add_key_result(f"o{o}/k{k}", f"o{o}", peso=pesos[(o, k)])
+
+    valores = {key: 0.0 for key in pesos}
+    for _ in range(200):
+        key = rnd.choice(list(pesos))
+        valores[key] = rnd.random()
+        tree.update(f"o{key[0]}/k{key[1]}", valores[key])
+
+    objetivos = [sum(pesos[(o, k)] * valores[(o, k)] for k in range(3)) / sum(pesos[(o, k)] for k in range(3))
+                 for o in range(4)]
+    for o in range(4):
+        assert tree.progress(f"o{o}") == pytest.approx(objetivos[o])
+    assert tree.progress("p") == pytest.approx(sum((o + 1) * objetivos[o] for o in range(4)) / 10)
+
+
+def test_tree_rejects_invalid_updates():
+    tree = ProgressTree()
+    tree.add_objective("o")
+    tree.add_key_result("o/k", "o")
+    with pytest.raises(ValueError):
+        tree.update("o", 0.5)
+    with pytest.raises(KeyError):
+        tree.update("x", 0.5)
+    assert tree.update("o/k", 2.0) == 1.0
+    assert progress_from_values(50, 100) == 0.5
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_agent_persists_key_result_progress(compact):
+    agent = DirexAgent(data_dir="unused", verbose=False, index_search=False, compact=compact)
+    agent.set_business_objective("Aumentar receita")
+    agent.create_okrs()
+
+    total = len(agent.okrs[0]["resultados_chave"])
+    assert agent.update_key_result(0, 0, 1.0) == pytest.approx(1 / total)
+    assert agent.okrs[0]["progresso_chave"][0] == 1.0
+
+    # A árvore é reconstruída a partir do progresso salvo
+    restored = DirexAgent(data_dir="unused", verbose=False, index_search=False)
+    restored.okrs = agent.export_section("okrs")
+    assert restored.okr_completion() == pytest.approx(agent.okr_completion())
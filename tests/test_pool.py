@@ -0,0 +1,65 @@
+import sys
+import threading
+
+from direx_pool import AgentPool, estimate_size
+
+
+def test_estimate_counts_texts_inside_records(tmp_path):
+    pool = AgentPool(str(tmp_path))
+    agent = pool.get("t1")
+    textos = [f"resultado chave {i} " * 20 for i in range(50)]
+    agent.okrs = [{"objetivo": "Crescer", "resultados_chave": textos}]
+
+    assert estimate_size(agent) > sum(sys.getsizeof(t) for t in textos)
+
+
+def test_eviction_save_error_stays_with_its_tenant(tmp_path, capsys):
+    pool = AgentPool(str(tmp_path), max_agents=1)
+    with pool.lease("a") as agent:
+        agent.set_business_objective("Objetivo A")
+
+    def broken_save(data):
+        raise OSError("disco cheio")
+    agent.storage.save = broken_save
+
+    # A remoção de "a" falha, mas quem pediu "b" recebe o agente normalmente
+    assert pool.acquire("b") is not None
+    pool.release("b", dirty=False)
+    assert "a" in pool and pool.stats()["erros_gravacao"] >= 1
+    assert "disco cheio" in capsys.readouterr().err
+
+    # Com o disco de volta, a próxima remoção grava as alterações de "a"
+    del agent.storage.save
+    pool.get("c")
+    assert "a" not in pool
+    assert pool.get("a").business_objective == "Objetivo A"
+
+
+def test_loading_one_key_does_not_block_others(tmp_path):
+    pool = AgentPool(str(tmp_path))
+    original_load = pool._load
+    started, proceed = threading.Event(), threading.Event()
+    loads = []
+
+    def slow_load(key):
+        loads.append(key)
+        if key == "lento":
+            started.set()
+            proceed.wait(5)
+        return original_load(key)
+    pool._load = slow_load
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(pool.get("lento"))) for _ in range(2)]
+    for t in threads:
+        t.start()
+    assert started.wait(5)
+
+    # Outra chave é atendida enquanto "lento" ainda carrega
+    assert pool.get("rapido") is not None
+    proceed.set()
+    for t in threads:
+        t.join(5)
+
+    assert loads.count("lento") == 1
+    assert results[0] is results[1]
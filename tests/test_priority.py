@@ -0,0 +1,83 @@
+import io
+
+import pytest
+
+from direx_priority import (StreamingPrioritizer, prioritize_batch, priority_level, read_tasks,
+                            stream_prioritize)
+
+
+def test_prioritize_batch_orders_by_score_then_input():
+    ranking = prioritize_batch([("a", 5, 5), ("b", 9, 1), ("c", 5, 5)])
+    assert ranking == [("b", "CRÍTICA", 17), ("a", "MÉDIA", 5), ("c", "MÉDIA", 5)]
+    assert prioritize_batch([("a", 5, 5), ("b", 9, 1)], top_k=1) == [("b", "CRÍTICA", 17)]
+
+
+def test_priority_levels():
+    assert [priority_level(s) for s in (15, 10, 5, 4)] == ["CRÍTICA", "ALTA", "MÉDIA", "BAIXA"]
+
+
+def test_stream_skips_malformed_csv_rows():
+    feed = io.StringIO("tarefa,impacto,esforco\na,5,3\nb,x,3\nc,9,1\nd,4\n")
+    tasks = read_tasks(feed, "csv")
+    prioritizer = StreamingPrioritizer(10)
+    rankings = list(stream_prioritize(tasks, 10, every=1, prioritizer=prioritizer))
+
+    assert rankings[-1][1] == [("c", "CRÍTICA", 17), ("a", "MÉDIA", 7)]
+    assert tasks.malformadas == 2
+
+
+def test_stream_counts_out_of_range_and_bad_json():
+    feed = io.StringIO('{"tarefa": "a", "impacto": 5, "esforco": 3}\n{oops\n'
+                       '{"tarefa": "b", "impacto": 11, "esforco": 1}\n{"impacto": 2, "esforco": 1}\n')
+    tasks = read_tasks(feed, "jsonl")
+    prioritizer = StreamingPrioritizer(5)
+    *_, (processadas, ranking) = stream_prioritize(tasks, 5, prioritizer=prioritizer)
+
+    assert ranking == [("a", "MÉDIA", 7)]
+    assert tasks.malformadas == 2
+    assert prioritizer.rejeitadas == 1
+
+
+def test_strict_reader_reports_line():
+    with pytest.raises(ValueError, match="Linha 3"):
+        list(read_tasks(io.StringIO("tarefa,impacto,esforco\na,5,3\nb,x,3\n"), strict=True))
+
+
+def test_prioritize_batch_python_fallback_matches_numpy(monkeypatch):
+    import random
+    import direx_priority
+
+    rnd = random.Random(7)
+    tasks = [(f"t{i}", rnd.randint(1, 10), rnd.randint(1, 10)) for i in range(500)]
+    vetorizado = prioritize_batch(tasks, top_k=50)
+
+    monkeypatch.setattr(direx_priority, "_numpy", lambda: None)
+    assert prioritize_batch(tasks, top_k=50) == vetorizado
+    assert prioritize_batch(tasks) == sorted(prioritize_batch(tasks), key=lambda t: -t[2])
+
+
+def test_prioritize_batch_rejects_out_of_range():
+    with pytest.raises(ValueError):
+        prioritize_batch([("a", 11, 1)])
+
+
+def test_stream_counts_only_accepted_rows_and_reports_real_lines():
+    feed = io.StringIO('{"tarefa": "a", "impacto": 5, "esforco": 3}\n{oops\n'
+                       '{"tarefa": "b", "impacto": 11, "esforco": 1}\n{"tarefa": "c", "impacto": 9, "esforco": 1}\n')
+    tasks = read_tasks(feed, "jsonl")
+    prioritizer = StreamingPrioritizer(5)
+    rankings = list(stream_prioritize(tasks, 5, every=2, prioritizer=prioritizer))
+
+    assert [n for n, _ in rankings] == [2]
+    assert (prioritizer.processadas, prioritizer.rejeitadas, prioritizer.lidas) == (2, 1, 3)
+
+    with pytest.raises(ValueError, match="Linha 7"):
+        StreamingPrioritizer(1).push("x", 0, 1, linha=7)
+
+
+def test_cli_rejects_non_positive_top(capsys):
+    from direx_agent import main
+
+    with pytest.raises(SystemExit):
+        main(["prioritize", "-", "--top", "0"])
+    assert "maior que zero" in capsys.readouterr().err
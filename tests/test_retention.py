@@ -0,0 +1,128 @@
+import os
+from datetime import datetime
+
+import direx_storage
+from direx_retention import RetentionManager, RetentionPolicy
+from direx_storage import SQLiteStorage, SectionedStorage, empty_state
+
+
+def _state(timestamp, objective):
+    data = empty_state()
+    data.update(business_objective=objective, timestamp=timestamp, tasks=[f"Tarefa {objective}" * 50])
+    return data
+
+
+def test_retention_archives_and_deletes_sqlite_rows(tmp_path):
+    data_dir = str(tmp_path / "direx_data")
+    storage = SQLiteStorage(os.path.join(data_dir, "direx.db"))
+    for day in range(1, 6):
+        storage.save(_state(f"2024010{day}_120000", f"dia {day}"))
+
+    manager = RetentionManager(data_dir, RetentionPolicy(keep_last=2, hourly=0, daily=4, weekly=0))
+    assert manager.run(dry_run=True) == {"mantidos": 2, "arquivados": 2, "descartados": 1,
+                                         "bytes_gravados": 0, "bytes_liberados": 0}
+
+    resumo = manager.run()
+    assert (resumo["mantidos"], resumo["arquivados"], resumo["descartados"]) == (2, 2, 1)
+    assert [s["timestamp"] for s in storage.list_snapshots()] == ["20240105_120000", "20240104_120000"]
+    assert storage.load_latest()["business_objective"] == "dia 5"
+
+    # Os arquivados continuam recuperáveis pelo timestamp; o descartado não
+    assert manager.fetch("20240103_235959")["business_objective"] == "dia 3"
+    assert manager.fetch("20240101_235959") is None
+
+    # Uma segunda passada não muda nada
+    resumo = manager.run()
+    assert (resumo["arquivados"], resumo["descartados"]) == (0, 0)
+
+
+class _Clock:
+    """Relógio fixo para os nomes de arquivo, que levam o horário do salvamento"""
+    now_value = None
+
+    @classmethod
+    def now(cls):
+        return cls.now_value
+
+
+def test_retention_covers_sectioned_files(tmp_path, monkeypatch):
+    data_dir = str(tmp_path / "direx_data")
+    storage = SectionedStorage(data_dir)
+    monkeypatch.setattr(direx_storage, "datetime", _Clock)
+    paths = []
+    for day in range(1, 4):
+        _Clock.now_value = datetime(2024, 1, day, 12)
+        paths.append(storage.save(_state(f"2024010{day}_120000", f"dia {day}")))
+
+    manager = RetentionManager(data_dir, RetentionPolicy(keep_last=1, hourly=0, daily=2, weekly=0))
+    resumo = manager.run()
+    assert (resumo["arquivados"], resumo["descartados"]) == (1, 1)
+    assert [os.path.exists(p) for p in paths] == [False, False, True]
+    assert storage.load(storage.latest_ref())["business_objective"] == "dia 3"
+    assert manager.fetch("20240102_235959")["business_objective"] == "dia 2"
+
+
+def test_garbage_collection_commits_before_touching_old_segment(tmp_path, monkeypatch):
+    import sqlite3
+
+    import direx_retention
+    from direx_retention import SnapshotArchive
+
+    archive = SnapshotArchive(str(tmp_path / "archive"))
+    for day in range(1, 4):
+        archive.add(_state(f"2024010{day}_120000", f"dia {day}"))
+    archive.remove(["20240101_120000", "20240102_120000"])
+    antigo = archive._segment_path(1)
+
+    # Falha no commit: o segmento antigo e os offsets continuam válidos
+    real_connect = archive._connect
+
+    class FailingCommit:
+        def __init__(self, conn):
+            self.conn = conn
+
+        def __getattr__(self, name):
+            return getattr(self.conn, name)
+
+        def __enter__(self):
+            return self.conn.__enter__()
+
+        def __exit__(self, *exc):
+            self.conn.rollback()
+            raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(archive, "_connect", lambda: FailingCommit(real_connect()))
+    try:
+        archive.collect_garbage(min_garbage=0.1)
+    except sqlite3.OperationalError:
+        pass
+    monkeypatch.undo()
+    assert os.path.exists(antigo)
+    assert archive.fetch("20240103_120000", exact=True)["business_objective"] == "dia 3"
+
+    # A coleta seguinte grava um segmento novo, remove o antigo e o órfão da tentativa anterior
+    assert archive.collect_garbage(min_garbage=0.1) > 0
+    assert not os.path.exists(antigo)
+    assert sorted(archive._segment_files()) == [3]
+    assert archive.fetch("20240103_120000", exact=True)["business_objective"] == "dia 3"
+
+
+def test_background_loop_survives_database_errors(tmp_path, monkeypatch, capsys):
+    import sqlite3
+    import time
+
+    manager = RetentionManager(str(tmp_path))
+    calls = []
+
+    def failing_run():
+        calls.append(1)
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(manager, "run", failing_run)
+    manager.start(interval=0.01)
+    deadline = time.monotonic() + 2
+    while len(calls) < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    manager.stop()
+    assert len(calls) >= 2
+    assert "Retenção falhou" in capsys.readouterr().err
@@ -0,0 +1,37 @@
+import pytest
+
+from direx_agent import DirexAgent
+from direx_batch import build_plan
+from direx_roadmap import RoadmapEngine, auto_granularity
+
+
+def _agent():
+    agent = DirexAgent(verbose=False, index_search=False)
+    agent.set_business_objective("Aumentar receita em 30%")
+    return agent
+
+
+def test_engine_phases_cover_horizon():
+    engine = RoadmapEngine(100, "mensal")
+    assert len(engine) == 4
+    assert engine[-1]["periodo"] == "Dias 91 - 100"
+    assert [p["fase"] for p in engine.page(2, 3)] == ["Mês 4"]
+    with pytest.raises(IndexError):
+        engine.phase(4)
+
+
+def test_auto_granularity():
+    assert [auto_granularity(d) for d in (30, 360, 1080)] == ["semanal", "mensal", "trimestral"]
+
+
+def test_long_horizons_default_to_monthly_phases():
+    assert len(_agent().create_roadmap(90)) == 3
+    roadmap = _agent().create_roadmap(360)
+    assert len(roadmap) == 12
+    assert roadmap[-1]["periodo"] == "Dias 331 - 360"
+    assert len(_agent().create_roadmap(360, "trimestral")) == 4
+
+
+def test_batch_uses_same_roadmap_as_agent():
+    plan = build_plan({"objetivo": "Aumentar receita em 30%", "periodo_dias": 360})
+    assert plan["roadmap"] == _agent().create_roadmap(360)
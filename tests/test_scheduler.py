@@ -0,0 +1,76 @@
+import pytest
+
+from direx_scheduler import CycleError, TaskScheduler, align_with_roadmap
+
+
+def _chain():
+    scheduler = TaskScheduler()
+    scheduler.add_task("a", 2)
+    scheduler.add_task("b", 3, ["a"])
+    scheduler.add_task("c", 1, ["a"])
+    scheduler.add_task("d", 4, ["b", "c"])
+    return scheduler
+
+
+def test_critical_path_and_slack():
+    scheduler = _chain()
+    assert scheduler.makespan == 9
+    assert scheduler.critical_path() == ["a", "b", "d"]
+    assert scheduler.slack("c") == 2
+
+
+def test_incremental_update_matches_full_recompute():
+    scheduler = _chain()
+    scheduler.update_task("c", duracao=5)
+    incremental = scheduler.schedule()
+    scheduler.recompute()
+    assert scheduler.schedule() == incremental
+    assert scheduler.makespan == 11
+    assert scheduler.critical_path() == ["a", "c", "d"]
+
+
+def test_rejected_update_leaves_task_unchanged():
+    scheduler = _chain()
+    before = scheduler.schedule()
+    with pytest.raises(CycleError):
+        scheduler.update_task("a", duracao=10, dependencias=["d"])
+    with pytest.raises(KeyError):
+        scheduler.update_task("b", duracao=10, dependencias=["x"])
+    with pytest.raises(CycleError):
+        scheduler.update_task("b", dependencias=["b"])
+    assert scheduler.schedule() == before
+
+
+def test_string_dependencies_are_rejected():
+    scheduler = _chain()
+    with pytest.raises(TypeError):
+        scheduler.update_task("d", dependencias="bc")
+    with pytest.raises(TypeError):
+        scheduler.add_task("e", 1, "a")
+    assert "e" not in scheduler.nodes
+
+
+def test_from_tasks_and_roadmap_alignment():
+    tasks = [{"id": "t1", "tarefa": "Pesquisa", "duracao": 20, "fase": "Mês 1"},
+             {"id": "t2", "tarefa": "Protótipo", "duracao": 20, "dependencias": ["t1"], "fase": "Mês 1"},
+             "Avulsa"]
+    scheduler = TaskScheduler.from_tasks(tasks)
+    roadmap = [{"fase": "Mês 1", "periodo": "Dias 1 - 30"}, {"fase": "Mês 2", "periodo": "Dias 31 - 60"}]
+    aligned = align_with_roadmap(roadmap, scheduler)
+
+    assert aligned[1]["entregas_agendadas"] == ["Protótipo"]
+    assert aligned[0]["atrasos"] == [{"tarefa": "Protótipo", "fim_previsto": 40.0, "fase_real": "Mês 2"}]
+
+
+def test_alignment_skips_undated_phases_and_handles_any_order():
+    tasks = [{"id": "t1", "tarefa": "Pesquisa", "duracao": 10, "fase": "Mês 1"},
+             {"id": "t2", "tarefa": "Lançamento", "duracao": 30, "dependencias": ["t1"], "fase": "Mês 1"}]
+    scheduler = TaskScheduler.from_tasks(tasks)
+    roadmap = [{"fase": "Mês 2", "periodo": "Dias 31 - 60"}, {"fase": "Backlog", "periodo": "Contínuo"},
+               {"fase": "Mês 1", "periodo": "Dias 1 - 30"}]
+    aligned = align_with_roadmap(roadmap, scheduler)
+
+    assert aligned[2]["entregas_agendadas"] == ["Pesquisa"]
+    assert aligned[0]["entregas_agendadas"] == ["Lançamento"]
+    assert aligned[1]["entregas_agendadas"] == []
+    assert aligned[2]["atrasos"] == [{"tarefa": "Lançamento", "fim_previsto": 40.0, "fase_real": "Mês 2"}]
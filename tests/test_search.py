@@ -0,0 +1,76 @@
+import os
+import sqlite3
+from contextlib import closing
+
+from direx_agent import DirexAgent, main
+from direx_search import SearchIndex, iter_fields
+
+
+class _BrokenIndex:
+    def add_snapshot(self, ref, data):
+        raise sqlite3.OperationalError("database is locked")
+
+
+def test_search_finds_saved_snapshot(tmp_path):
+    data_dir = str(tmp_path / "direx_data")
+    agent = DirexAgent(data_dir=data_dir, verbose=False, index_search=True)
+    agent.set_business_objective("Aumentar as entregas trimestrais")
+    ref = agent.save_data()
+
+    hits = agent.search_index.search("entrega")
+    assert hits and hits[0]["campo"] == "business_objective"
+    assert hits[0]["snapshots"][0]["ref"] == ref
+
+
+def test_indexing_failure_does_not_fail_save(tmp_path, capsys):
+    data_dir = str(tmp_path / "direx_data")
+    agent = DirexAgent(data_dir=data_dir, verbose=False, index_search=True)
+    agent.search_index = _BrokenIndex()
+    agent.set_business_objective("Reduzir custos")
+
+    ref = agent.save_data()
+    assert "não indexado" in capsys.readouterr().err
+    assert agent.storage.load(ref)["business_objective"] == "Reduzir custos"
+
+    # O snapshot que ficou fora do índice é recuperado pelo reindex
+    index = SearchIndex(os.path.join(data_dir, "direx_search.db"))
+    assert index.index_storage(agent.storage) == 1
+    assert index.index_storage(agent.storage) == 0
+    assert index.search("custos")[0]["snapshots"][0]["ref"] == ref
+
+
+def test_saves_do_not_index_and_search_catches_up(tmp_path, capsys):
+    data_dir = str(tmp_path / "direx_data")
+    agent = DirexAgent(data_dir=data_dir, verbose=False)
+    agent.set_business_objective("Expandir a logística regional")
+    agent.save_data()
+    assert not os.path.exists(os.path.join(data_dir, "direx_search.db"))
+
+    main(["search", "logistica", "--data-dir", data_dir])
+    out = capsys.readouterr().out
+    assert "1 snapshot(s) novo(s) indexado(s)" in out and "Expandir a logística regional" in out
+
+    agent.save_data()
+    index = SearchIndex(os.path.join(data_dir, "direx_search.db"))
+    assert index.index_storage(agent.storage) == 1
+    assert index.index_storage(agent.storage) == 0
+
+
+def test_fields_are_keyed_by_identity_not_position():
+    tasks = [{"id": "t1", "tarefa": "Mapear fornecedores"}, {"id": "t2", "tarefa": "Negociar contratos"}]
+    antes = set(iter_fields({"tasks": tasks}))
+    depois = set(iter_fields({"tasks": [{"id": "t0", "tarefa": "Nova"}] + tasks}))
+    assert antes < depois
+    assert ("tasks[t1]", "Mapear fornecedores") in antes
+
+
+def test_unchanged_texts_do_not_grow_occurrences(tmp_path):
+    index = SearchIndex(str(tmp_path / "direx_search.db"))
+    data = {"business_objective": "Reduzir custos", "tasks": ["Revisar contratos", "Cortar desperdícios"]}
+    for i in range(50):
+        index.add_snapshot(f"snap#{i}", data)
+
+    with closing(sqlite3.connect(index.db_path)) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM occurrences").fetchone()[0] == 3
+    hit = index.search("contratos")[0]
+    assert hit["ocorrencias"] == 50 and hit["snapshots"][0]["ref"] == "snap#49"
@@ -0,0 +1,37 @@
+import pytest
+
+from direx_serializers import (available_compressions, available_serializers, decode, encode, read_snapshot,
+                               write_snapshot)
+
+DATA = {"business_objective": "Aumentar receita", "okrs": [{"objetivo": "Crescer", "resultados_chave": ["á", "b"]}],
+        "kpis": [], "roadmap": [], "weekly_plan": [], "tasks": ["A"], "timestamp": "20240101_100000"}
+
+
+@pytest.mark.parametrize("formato", list(available_serializers()))
+@pytest.mark.parametrize("compressao", available_compressions())
+def test_round_trip_detects_format_and_compression(tmp_path, formato, compressao):
+    assert decode(encode(DATA, formato, compressao)) == DATA
+
+    path = write_snapshot(DATA, str(tmp_path / "snapshot.bin"), formato, compressao)
+    assert read_snapshot(path) == DATA
+
+
+def test_invalid_inputs_raise_value_error():
+    with pytest.raises(ValueError):
+        encode(DATA, "yaml")
+    with pytest.raises(ValueError):
+        encode(DATA, "json", "bzip2")
+    with pytest.raises(ValueError):
+        decode(b"not a snapshot")
+
+
+def test_benchmark_requires_at_least_one_repeat(capsys):
+    from direx_agent import main
+    from direx_serializers import benchmark
+
+    assert benchmark(DATA, repeat=1)
+    with pytest.raises(ValueError, match="repeat"):
+        benchmark(DATA, repeat=0)
+    with pytest.raises(SystemExit):
+        main(["formats", "--repeat", "0"])
+    assert "maior que zero" in capsys.readouterr().err
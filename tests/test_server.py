@@ -0,0 +1,100 @@
+import asyncio
+
+import pytest
+
+from direx_server import DirexServer, HTTPError
+
+
+def _request(server, method, path, body=b""):
+    return asyncio.run(server.dispatch(method, path, body))
+
+
+def _read(server, raw: bytes):
+    async def read():
+        reader = asyncio.StreamReader()
+        reader.feed_data(raw)
+        reader.feed_eof()
+        return await server._read_request(reader)
+    return asyncio.run(read())
+
+
+@pytest.fixture
+def server(tmp_path):
+    return DirexServer(data_dir=str(tmp_path))
+
+
+def test_session_flow(server):
+    status, payload = _request(server, "POST", "/sessions", b'{"session_id": "s1"}')
+    assert (status, payload) == (201, {"session_id": "s1"})
+    _request(server, "POST", "/sessions/s1/objective", b'{"objetivo": "Aumentar receita"}')
+    status, payload = _request(server, "POST", "/sessions/s1/okrs")
+    assert status == 200 and payload["okrs"]
+    status, state = _request(server, "GET", "/sessions/s1")
+    assert state["business_objective"] == "Aumentar receita"
+
+
+@pytest.mark.parametrize("length", [b"abc", b"-5"])
+def test_invalid_content_length_is_400(server, length):
+    with pytest.raises(HTTPError) as error:
+        _read(server, b"POST /sessions HTTP/1.1\r\nContent-Length: " + length + b"\r\n\r\n")
+    assert error.value.status == 400
+
+
+def test_delete_discards_saved_state(server):
+    _request(server, "POST", "/sessions", b'{"session_id": "s1"}')
+    _request(server, "POST", "/sessions/s1/objective", b'{"objetivo": "X"}')
+    _request(server, "POST", "/sessions/s1/save")
+
+    assert _request(server, "DELETE", "/sessions/s1")[0] == 200
+    with pytest.raises(HTTPError) as error:
+        _request(server, "GET", "/sessions/s1")
+    assert error.value.status == 404
+    with pytest.raises(HTTPError):
+        _request(server, "DELETE", "/sessions/s1")
+
+
+def test_idle_session_is_reopened_from_disk(server):
+    _request(server, "POST", "/sessions", b'{"session_id": "s1"}')
+    _request(server, "POST", "/sessions/s1/objective", b'{"objetivo": "X"}')
+    asyncio.run(server.manager.close("s1"))
+
+    status, state = _request(server, "GET", "/sessions/s1")
+    assert state["business_objective"] == "X"
+
+
+def test_roadmap_endpoint_uses_monthly_phases_for_long_horizons(server):
+    _request(server, "POST", "/sessions", b'{"session_id": "s1"}')
+    _request(server, "POST", "/sessions/s1/objective", b'{"objetivo": "X"}')
+    status, payload = _request(server, "POST", "/sessions/s1/roadmap", b'{"periodo_dias": 360}')
+    assert len(payload["roadmap"]) == 12
+
+
+@pytest.mark.parametrize("body", [b'{"periodo_dias": 10000000}', b'{"periodo_dias": 0}',
+                                  b'{"periodo_dias": "30"}', b'{"periodo_dias": true}'])
+def test_roadmap_rejects_out_of_range_horizons(server, body):
+    _request(server, "POST", "/sessions", b'{"session_id": "s1"}')
+    _request(server, "POST", "/sessions/s1/objective", b'{"objetivo": "X"}')
+    with pytest.raises(HTTPError) as e:
+        _request(server, "POST", "/sessions/s1/roadmap", body)
+    assert e.value.status == 400
+
+
+def test_objective_must_be_text(server):
+    _request(server, "POST", "/sessions", b'{"session_id": "s1"}')
+    for action in ("objective", "okrs"):
+        with pytest.raises(HTTPError) as e:
+            _request(server, "POST", f"/sessions/s1/{action}", b'{"objetivo": 42}')
+        assert e.value.status == 400
+
+
+def test_save_goes_through_the_agent(server, monkeypatch):
+    from direx_agent import DirexAgent
+
+    chamadas = []
+    original = DirexAgent.save_data
+    monkeypatch.setattr(DirexAgent, "save_data", lambda self: chamadas.append(self) or original(self))
+    _request(server, "POST", "/sessions", b'{"session_id": "s1"}')
+    _request(server, "POST", "/sessions/s1/objective", b'{"objetivo": "X"}')
+    status, payload = _request(server, "POST", "/sessions/s1/save")
+    assert status == 200 and len(chamadas) == 1
+    assert chamadas[0].storage.load(payload["ref"])["business_objective"] == "X"
@@ -0,0 +1,53 @@
+import pytest
+
+from direx_simulation import build_model, parse_number, simulate
+
+
+@pytest.mark.parametrize("texto, esperado", [
+    ("4.5", 4.5),
+    ("1.000", 1000.0),
+    ("R$ 12.500,00", 12500.0),
+    ("95%", 95.0),
+    ("4,5 pontos", 4.5),
+    ("1.234.567", 1234567.0),
+    ("NPS 72.25", 72.25),
+    ("-3.5%", -3.5),
+    ("R$ XX.XXX", None),
+    (12, 12.0),
+])
+def test_parse_number(texto, esperado):
+    assert parse_number(texto) == esperado
+
+
+def test_simulation_reports_phases_and_kpis():
+    roadmap = [{"fase": "Fase 1", "periodo": "Dias 1 - 30"}, {"fase": "Fase 2", "periodo": "Dias 31 - 60"}]
+    kpis = [{"nome": "NPS", "atual": "40.5", "meta": "60"}]
+    metas = {"NPS": {"crescimento": {"tipo": "normal", "media": 0.3, "desvio": 0.05}}}
+    model = build_model(roadmap, kpis, metas=metas)
+    assert model.atual == [40.5] and model.meta == [60.0]
+
+    result = simulate(model, trials=2000, seed=1)
+    assert [f["fase"] for f in result["fases"]] == ["Fase 1", "Fase 2"]
+    assert 0.0 <= result["fases"][0]["prob_no_prazo"] <= 1.0
+    assert result["kpis"][0]["prob_meta"]["Fase 2"] > 0.5
+
+
+def test_overlapping_phases_keep_a_positive_duration():
+    roadmap = [{"fase": "A", "periodo": "Dias 1 - 30"}, {"fase": "B", "periodo": "Dias 15 - 30"}]
+    model = build_model(roadmap)
+    assert model.duracao_fase == [30.0, 1.0] and model.fim_planejado == [30, 31]
+
+    result = simulate(model, trials=500, seed=1)
+    for fase in result["fases"]:
+        assert fase["conclusao"]["p50"] == fase["conclusao"]["p50"]  # não é NaN
+        assert 0.0 <= fase["prob_no_prazo"] <= 1.0
+
+
+def test_out_of_order_phases_are_sorted_by_start():
+    roadmap = [{"fase": "Depois", "periodo": "Dias 31 - 60"}, {"fase": "Antes", "periodo": "Dias 1 - 30"}]
+    model = build_model(roadmap)
+    assert model.fases == ["Antes", "Depois"] and model.duracao_fase == [30.0, 30.0]
+
+    result = simulate(model, trials=2000, seed=1)
+    assert all(f["conclusao"]["p10"] > 0 for f in result["fases"])
+    assert result["fases"][1]["prob_no_prazo"] < 1.0
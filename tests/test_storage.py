@@ -0,0 +1,137 @@
+import json
+import os
+
+import direx_storage
+from direx_agent import DirexAgent, main
+from direx_storage import DeltaLogStorage, SQLiteStorage
+
+
+def _legacy_snapshot(data_dir, timestamp, objective):
+    """Snapshot no formato gravado pelo backend JSON original"""
+    os.makedirs(data_dir, exist_ok=True)
+    data = {"business_objective": objective, "okrs": [{"objetivo": objective}], "kpis": [], "roadmap": [],
+            "weekly_plan": [], "tasks": ["Tarefa A"], "timestamp": timestamp}
+    path = os.path.join(data_dir, f"direx_data_{timestamp}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    return path
+
+
+def test_legacy_json_is_imported_on_first_load(tmp_path):
+    data_dir = str(tmp_path / "direx_data")
+    _legacy_snapshot(data_dir, "20240101_100000", "Antigo")
+    _legacy_snapshot(data_dir, "20240102_100000", "Mais recente")
+
+    agent = DirexAgent(data_dir=data_dir, verbose=False, index_search=False)
+    assert agent.load_data() is True
+    assert agent.business_objective == "Mais recente"
+    assert agent.tasks == ["Tarefa A"]
+    assert len(agent.storage.list_snapshots()) == 2
+
+    # A importação acontece uma única vez por banco
+    again = SQLiteStorage(os.path.join(data_dir, "direx.db"))
+    assert len(again.list_snapshots()) == 2
+
+
+def test_legacy_json_does_not_override_newer_saves(tmp_path):
+    data_dir = str(tmp_path / "direx_data")
+    agent = DirexAgent(data_dir=data_dir, verbose=False, index_search=False)
+    agent.set_business_objective("Novo")
+    agent.save_data()
+    _legacy_snapshot(data_dir, "20240101_100000", "Antigo")
+
+    fresh = DirexAgent(data_dir=data_dir, verbose=False, index_search=False)
+    assert fresh.load_data() is True
+    assert fresh.business_objective == "Novo"
+
+
+def test_import_command(tmp_path, capsys):
+    legacy_dir = str(tmp_path / "legado")
+    _legacy_snapshot(legacy_dir, "20240101_100000", "A")
+    single = _legacy_snapshot(str(tmp_path / "avulso"), "20240105_100000", "B")
+    data_dir = str(tmp_path / "direx_data")
+
+    main(["import", legacy_dir, single, "--data-dir", data_dir])
+    assert "2 snapshot(s)" in capsys.readouterr().out
+
+    storage = SQLiteStorage(os.path.join(data_dir, "direx.db"))
+    assert storage.load_latest()["business_objective"] == "B"
+    assert [s["timestamp"] for s in storage.list_snapshots()] == ["20240105_100000", "20240101_100000"]
+
+
+def test_sqlite_round_trip(tmp_path):
+    storage = SQLiteStorage(str(tmp_path / "direx.db"))
+    assert storage.latest_ref() is None
+    data = {"business_objective": "X", "okrs": [{"tipo": "principal", "objetivo": "X"}], "kpis": [],
+            "roadmap": [], "weekly_plan": [], "tasks": ["t"], "timestamp": "20240101_000000"}
+    ref = storage.save(data)
+    assert storage.latest_ref() == ref
+    assert storage.load(ref) == data
+
+
+def _plan(objective, tasks):
+    return {"business_objective": objective, "okrs": [{"objetivo": objective, "resultados_chave": ("a", "b")}],
+            "kpis": [], "roadmap": [], "weekly_plan": [], "tasks": list(tasks)}
+
+
+def test_delta_log_round_trip_and_compaction(tmp_path):
+    storage = DeltaLogStorage(str(tmp_path), compact_every=1000)
+    storage.save(_plan("A", ["t1"]))
+    ref = storage.save(_plan("B", ["t1", "t2"]))
+    storage.compact()
+    reopened = DeltaLogStorage(str(tmp_path))
+    state = reopened.load(reopened.latest_ref())
+    assert reopened.latest_ref() == ref
+    assert state["business_objective"] == "B"
+    assert state["tasks"] == ["t1", "t2"]
+
+
+def test_delta_log_patch_ignores_tuple_vs_list(tmp_path):
+    storage = DeltaLogStorage(str(tmp_path))
+    storage.save(_plan("A", []))
+    changed = _plan("A", [])
+    changed["okrs"][0]["status"] = "ativo"
+    storage.save(changed)
+
+    with open(storage.log_path, encoding="utf-8") as f:
+        last = json.loads(f.read().splitlines()[-1])
+    # resultados_chave em tupla não mudou: o patch traz só o campo novo
+    assert last["changes"] == [{"op": "patch", "section": "okrs", "index": 0, "fields": {"status": "ativo"}}]
+
+
+def test_delta_log_recovers_from_torn_record(tmp_path):
+    storage = DeltaLogStorage(str(tmp_path))
+    storage.save(_plan("A", ["t1"]))
+    with open(storage.log_path, "a", encoding="utf-8") as f:
+        f.write('{"seq":2,"timestamp":"x","chan')  # gravação interrompida
+
+    reopened = DeltaLogStorage(str(tmp_path))
+    reopened.save(_plan("B", ["t1", "t2"]))
+    ref = reopened.save(_plan("C", ["t1", "t2", "t3"]))
+
+    state = DeltaLogStorage(str(tmp_path)).load(ref)
+    assert state["business_objective"] == "C"
+    assert state["tasks"] == ["t1", "t2", "t3"]
+
+
+def test_save_cost_does_not_grow_with_history(tmp_path, monkeypatch):
+    statements = []
+    connect = SQLiteStorage._connect
+
+    def traced(self):
+        conn = connect(self)
+        conn.set_trace_callback(statements.append)
+        return conn
+    monkeypatch.setattr(direx_storage.SQLiteStorage, "_connect", traced)
+
+    agent = DirexAgent(data_dir=str(tmp_path / "direx_data"), verbose=False, index_search=False)
+    agent.set_business_objective("Crescer")
+    agent.tasks = ["Tarefa A", "Tarefa B"]
+
+    custos = []
+    for _ in range(60):
+        statements.clear()
+        agent.save_data()
+        custos.append(len(statements))
+    # Depois do primeiro save (criação do esquema), cada save executa o mesmo número de comandos
+    assert custos[-1] > 0 and len(set(custos[1:])) == 1
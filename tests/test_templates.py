@@ -0,0 +1,36 @@
+from direx_agent import DirexAgent
+from direx_templates import plan_template, roadmap_template
+
+
+def test_plan_template_is_memoized():
+    assert plan_template("receita", 30) is plan_template("receita", 30)
+    assert roadmap_template(90) is plan_template("geral", 90).roadmap
+
+
+def test_roadmap_items_are_fresh_dicts_sharing_texts():
+    agent = DirexAgent(data_dir="unused", verbose=False, index_search=False)
+    agent.set_business_objective("Aumentar vendas")
+    primeiro = agent.create_roadmap(30)
+    primeiro[0]["status"] = "concluido"
+    primeiro[0]["entregas"] = ["Outra entrega"]
+
+    segundo = agent.create_roadmap(30)
+    assert segundo[0]["status"] == "pendente"
+    assert segundo[0]["entregas"] == list(roadmap_template(30)[0]["entregas"])
+    assert isinstance(segundo[0]["objetivos"], list)
+    assert segundo[0]["objetivos"][0] is roadmap_template(30)[0]["objetivos"][0]
+    assert [f["periodo"] for f in segundo] == ["Dias 1 - 15", "Dias 16 - 30"]
+
+
+def test_agent_returns_plain_lists():
+    agent = DirexAgent(data_dir="unused", verbose=False, index_search=False)
+    agent.set_business_objective("Aumentar vendas")
+    okrs = agent.create_okrs()
+    agent.create_roadmap(30)[0]["objetivos"].append("Nova meta")
+    agent.create_weekly_plan()[0]["tarefas_principais"].append("Nova tarefa")
+
+    assert type(okrs[0]["resultados_chave"]) is list
+    assert type(agent._generate_fase_objectives("Semana 1")) is list
+    assert type(agent._generate_daily_metrics("Segunda-feira")) is list
+    assert "Nova meta" not in roadmap_template(30)[0]["objetivos"]
+    assert all(type(dia) is dict for dia in agent.weekly_plan)